@@ -23,6 +23,7 @@ class OCRType(Enum):
     EASYOCR = "easyocr"
     TESSERACT = "tesseract"
     TRANSFORMERS = "transformers"
+    PLATE_CRNN = "plate_crnn"
 
 class PreprocessingType(Enum):
     CLAHE = "clahe"
@@ -52,6 +53,26 @@ class OCRConfig:
     fallback_order: List[OCRType] = field(default_factory=lambda: [
         OCRType.PADDLEOCR, OCRType.EASYOCR, OCRType.TESSERACT
     ])
+    batch_recognition: bool = True
+    recognition_height: Optional[int] = None
+    plate_mode: bool = False
+    plate_min_confidence: float = 0.85
+    ocr_workers: int = 0
+    ocr_queue_size: int = 16
+    ocr_timeout: float = 10.0
+    crop_cache: bool = False
+    crop_cache_size: int = 2048
+    crop_cache_max_distance: int = 6
+    quality_gate: bool = False
+    gate_min_height: int = 12
+    gate_min_sharpness: float = 30.0
+    gate_max_clipped_fraction: float = 0.6
+    gate_min_contrast: float = 25.0
+    cascade_min_confidence: float = 0.6
+    cascade_plate_grammar: bool = True
+    plate_model_path: Optional[str] = None
+    plate_model_batch_size: int = 64
+    plate_model_threads: Optional[int] = None
 
 @dataclass
 class PreprocessingConfig:
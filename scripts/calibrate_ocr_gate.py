@@ -0,0 +1,53 @@
+
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+import cv2
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from vision.ocr.crop_quality import calibrate_quality_gate
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+def load_crops(directory: str):
+    crops = []
+    for path in sorted(Path(directory).iterdir()):
+        if path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        crop = cv2.imread(str(path))
+        if crop is not None:
+            crops.append(crop)
+    return crops
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibração do filtro de qualidade de recortes OCR")
+    parser.add_argument("readable", help="Diretório com recortes lidos corretamente")
+    parser.add_argument("unreadable", help="Diretório com recortes lidos incorretamente")
+    parser.add_argument("--keep-ratio", type=float, default=0.95,
+                        help="Fração dos recortes legíveis que deve passar pelo filtro")
+    parser.add_argument("--output", type=str, help="Arquivo JSON para salvar os limites")
+    
+    args = parser.parse_args()
+    
+    readable = load_crops(args.readable)
+    unreadable = load_crops(args.unreadable)
+    if not readable:
+        print(f"❌ Nenhum recorte encontrado em {args.readable}")
+        sys.exit(1)
+    
+    report = calibrate_quality_gate(readable, unreadable, keep_ratio=args.keep_ratio)
+    
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"Legíveis mantidos: {report['readable_kept']:.1%} | Ilegíveis descartados: {report['unreadable_rejected']:.1%}")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report['thresholds'], f, indent=2)
+        print(f"✅ Limites salvos em {args.output}")
+
+if __name__ == "__main__":
+    main()
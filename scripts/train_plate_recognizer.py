@@ -0,0 +1,249 @@
+
+
+import sys
+import json
+import yaml
+import random
+from pathlib import Path
+from typing import List, Tuple, Dict, Any
+import logging
+import argparse
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+try:
+    import torch
+    import torch.nn as nn
+except ImportError:
+    print("❌ PyTorch não encontrado. Instale com: pip install torch")
+    sys.exit(1)
+
+from vision.ocr.plate_grammar import is_valid_plate, normalize_plate
+from vision.ocr.plate_recognizer import (
+    PLATE_ALPHABET, PLATE_INPUT_SIZE, encode_plate, preprocess_plates, constrained_ctc_decode
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Placas em duas linhas não cabem no formato de entrada de uma linha do CRNN
+TWO_LINE_PLATE_CLASSES = {"mercosul_motorcycle_plate", "motorcycle_plate"}
+
+class PlateCRNN(nn.Module):
+    """CRNN compacto: convoluções reduzem a altura a 1 e a largura a 1/4; BiGRU + CTC"""
+
+    def __init__(self, num_classes: int = len(PLATE_ALPHABET) + 1, hidden_size: int = 96):
+        super().__init__()
+
+        def block(in_channels, out_channels, pool):
+            return nn.Sequential(
+                nn.Conv2d(in_channels, out_channels, 3, padding=1, bias=False),
+                nn.BatchNorm2d(out_channels),
+                nn.ReLU(inplace=True),
+                nn.MaxPool2d(pool)
+            )
+
+        self.features = nn.Sequential(
+            block(1, 32, (2, 2)),
+            block(32, 64, (2, 2)),
+            block(64, 128, (2, 1)),
+            block(128, 128, (2, 1)),
+            block(128, 192, (2, 1))
+        )
+        self.rnn = nn.GRU(192, hidden_size, bidirectional=True, batch_first=True)
+        self.classifier = nn.Linear(2 * hidden_size, num_classes)
+
+    def forward(self, x):
+        features = self.features(x).squeeze(2).permute(0, 2, 1)
+        sequence, _ = self.rnn(features)
+        return self.classifier(sequence).log_softmax(-1)
+
+class PlateCropDataset(torch.utils.data.Dataset):
+    """Recortes de placa de datasets/vehicle_plates com os textos de labels_text/
+
+    labels_text/<split>/<imagem>.txt tem uma linha por caixa de placa do rótulo
+    YOLO correspondente, na mesma ordem. Placas de motocicleta (duas linhas)
+    são descartadas: o modelo lê uma única linha de 7 caracteres, e o recorte
+    achatado para 128x32 seria ruído de rótulo.
+    """
+
+    def __init__(self, dataset_dir: Path, split: str, augment: bool = False, margin: float = 0.05):
+        self.augment = augment
+        self.samples: List[Tuple[np.ndarray, str]] = []
+
+        with open(dataset_dir / "dataset.yaml", 'r') as f:
+            names = yaml.safe_load(f)["names"]
+        plate_classes = {index for index, name in enumerate(names) if name.endswith("_plate")}
+        single_line_classes = {index for index in plate_classes if names[index] not in TWO_LINE_PLATE_CLASSES}
+
+        for label_path in sorted((dataset_dir / "labels" / split).glob("*.txt")):
+            text_path = dataset_dir / "labels_text" / split / label_path.name
+            image_path = next((dataset_dir / "images" / split).glob(f"{label_path.stem}.*"), None)
+            if not text_path.exists() or image_path is None:
+                continue
+
+            image = cv2.imread(str(image_path))
+            if image is None:
+                continue
+
+            # Textos alinhados a todas as caixas de placa; as de duas linhas são puladas depois
+            boxes = [
+                (int(line.split()[0]), [float(value) for value in line.split()[1:5]])
+                for line in label_path.read_text().splitlines()
+                if line.strip() and int(line.split()[0]) in plate_classes
+            ]
+            texts = [normalize_plate(line) for line in text_path.read_text().splitlines() if line.strip()]
+
+            for (class_id, (cx, cy, w, h)), text in zip(boxes, texts):
+                if class_id not in single_line_classes or not is_valid_plate(text):
+                    continue
+                crop = self._crop(image, cx, cy, w * (1 + 2 * margin), h * (1 + 2 * margin))
+                if crop is not None:
+                    self.samples.append((crop, text))
+
+    @staticmethod
+    def _crop(image: np.ndarray, cx: float, cy: float, w: float, h: float):
+        height, width = image.shape[:2]
+        x1, x2 = int((cx - w / 2) * width), int((cx + w / 2) * width)
+        y1, y2 = int((cy - h / 2) * height), int((cy + h / 2) * height)
+        crop = image[max(y1, 0):y2, max(x1, 0):x2]
+        return crop if crop.size else None
+
+    @staticmethod
+    def _augment(crop: np.ndarray) -> np.ndarray:
+        h, w = crop.shape[:2]
+        angle = random.uniform(-4, 4)
+        scale = random.uniform(0.92, 1.05)
+        matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, scale)
+        crop = cv2.warpAffine(crop, matrix, (w, h), borderMode=cv2.BORDER_REPLICATE)
+        if random.random() < 0.3:
+            crop = cv2.GaussianBlur(crop, (3, 3), 0)
+        return cv2.convertScaleAbs(crop, alpha=random.uniform(0.7, 1.3), beta=random.uniform(-30, 30))
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __getitem__(self, index):
+        crop, text = self.samples[index]
+        if self.augment:
+            crop = self._augment(crop)
+        return torch.from_numpy(preprocess_plates([crop])[0]), torch.tensor(encode_plate(text)), text
+
+def collate(batch):
+    images, targets, texts = zip(*batch)
+    return (
+        torch.stack(images),
+        torch.cat(targets),
+        torch.tensor([len(target) for target in targets]),
+        list(texts)
+    )
+
+class PlateRecognizerTrainer:
+
+    def __init__(self, dataset_dir: str = "datasets/vehicle_plates", output: str = "models/plate_crnn.onnx",
+                 device: str = "auto"):
+        self.dataset_dir = Path(dataset_dir)
+        self.output = Path(output)
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+
+        if device == "auto":
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = torch.device(device)
+        self.model = PlateCRNN().to(self.device)
+
+    def train(self, epochs: int = 60, batch_size: int = 64, learning_rate: float = 1e-3) -> Dict[str, Any]:
+        train_set = PlateCropDataset(self.dataset_dir, "train", augment=True)
+        val_set = PlateCropDataset(self.dataset_dir, "val")
+        if not len(train_set):
+            raise RuntimeError(f"Nenhum recorte de placa com texto em {self.dataset_dir / 'labels_text' / 'train'}")
+        logger.info(f"📊 {len(train_set)} recortes de treino, {len(val_set)} de validação")
+
+        loader = torch.utils.data.DataLoader(train_set, batch_size=batch_size, shuffle=True, collate_fn=collate)
+        optimizer = torch.optim.AdamW(self.model.parameters(), lr=learning_rate, weight_decay=1e-4)
+        scheduler = torch.optim.lr_scheduler.OneCycleLR(optimizer, max_lr=learning_rate,
+                                                        total_steps=epochs * len(loader))
+        criterion = nn.CTCLoss(blank=0, zero_infinity=True)
+
+        best_accuracy = -1.0
+        for epoch in range(epochs):
+            self.model.train()
+            total_loss = 0.0
+            for images, targets, target_lengths, _ in loader:
+                log_probs = self.model(images.to(self.device)).permute(1, 0, 2)
+                input_lengths = torch.full((images.shape[0],), log_probs.shape[0], dtype=torch.long)
+                loss = criterion(log_probs, targets, input_lengths, target_lengths)
+
+                optimizer.zero_grad()
+                loss.backward()
+                nn.utils.clip_grad_norm_(self.model.parameters(), 5.0)
+                optimizer.step()
+                scheduler.step()
+                total_loss += loss.item()
+
+            accuracy = self.evaluate(val_set) if len(val_set) else 0.0
+            logger.info(f"Época {epoch + 1}/{epochs} - perda {total_loss / len(loader):.4f} - acerto {accuracy:.2%}")
+            if accuracy >= best_accuracy:
+                best_accuracy = accuracy
+                self.export()
+
+        return {
+            'model_path': str(self.output),
+            'train_samples': len(train_set),
+            'val_samples': len(val_set),
+            'val_accuracy': best_accuracy
+        }
+
+    @torch.no_grad()
+    def evaluate(self, dataset: PlateCropDataset) -> float:
+        """Fração de placas lidas exatamente com o decodificador restrito"""
+        self.model.eval()
+        loader = torch.utils.data.DataLoader(dataset, batch_size=128, collate_fn=collate)
+        correct = 0
+        for images, _, _, texts in loader:
+            log_probs = self.model(images.to(self.device)).cpu().numpy()
+            decoded = constrained_ctc_decode(log_probs)
+            correct += sum(normalize_plate(text) == expected for (text, _), expected in zip(decoded, texts))
+        return correct / len(dataset)
+
+    def export(self):
+        """Exporta para ONNX com lote dinâmico e saída (lote, passos, classes) em log-probabilidades"""
+        self.model.eval()
+        width, height = PLATE_INPUT_SIZE
+        dummy = torch.zeros(1, 1, height, width, device=self.device)
+        torch.onnx.export(
+            self.model, dummy, str(self.output),
+            input_names=["image"], output_names=["log_probs"],
+            dynamic_axes={"image": {0: "batch"}, "log_probs": {0: "batch"}},
+            opset_version=17
+        )
+        logger.info(f"💾 Modelo exportado: {self.output}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Treinador do Reconhecedor de Placas CRNN/CTC")
+    parser.add_argument("--dataset", default="datasets/vehicle_plates", help="Diretório do dataset de placas")
+    parser.add_argument("--output", default="models/plate_crnn.onnx", help="Arquivo ONNX de saída")
+    parser.add_argument("--epochs", type=int, default=60, help="Número de épocas")
+    parser.add_argument("--batch-size", type=int, default=64, help="Tamanho do batch")
+    parser.add_argument("--lr", type=float, default=1e-3, help="Taxa de aprendizado máxima")
+    parser.add_argument("--device", default="auto", help="Dispositivo para treinamento")
+
+    args = parser.parse_args()
+
+    print("🚀 Treinador do Reconhecedor de Placas CRNN/CTC")
+    print("=" * 50)
+
+    trainer = PlateRecognizerTrainer(args.dataset, args.output, args.device)
+    try:
+        report = trainer.train(args.epochs, args.batch_size, args.lr)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(json.dumps(report, indent=2))
+    print("✅ Treinamento concluído com sucesso!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+
+
+import pytest
+import time
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from vision.geo.gps import GPSTrack, find_sidecar
+from vision.geo.spatial_index import PotholeSpatialIndex, distance_meters
+
+GPX_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1">
+  <trk><trkseg>
+    <trkpt lat="-23.5500" lon="-46.6300"><time>2024-05-01T10:00:00Z</time></trkpt>
+    <trkpt lat="-23.5510" lon="-46.6300"><time>2024-05-01T10:00:10Z</time></trkpt>
+  </trkseg></trk>
+</gpx>
+"""
+
+class TestGPSTrack:
+
+    def test_gpx_sidecar_is_interpolated_at_video_time(self, tmp_path):
+        video = tmp_path / "run.mp4"
+        video.write_bytes(b"")
+        (tmp_path / "run.gpx").write_text(GPX_TEMPLATE)
+
+        track = GPSTrack.from_file(find_sidecar(video), max_gap=1.0)
+
+        latitude, longitude = track.position_at(5.0)
+        assert latitude == pytest.approx(-23.5505)
+        assert longitude == pytest.approx(-46.63)
+        assert track.position_at(12.0) is None
+
+    def test_csv_with_relative_seconds_and_offset(self, tmp_path):
+        path = tmp_path / "run.csv"
+        path.write_text("time,lat,lon\n0,-23.55,-46.63\n10,-23.55,-46.62\n")
+
+        track = GPSTrack.from_file(path, time_offset=5.0)
+
+        assert track.position_at(0.0)[1] == pytest.approx(-46.625)
+
+class TestPotholeSpatialIndex:
+
+    def test_nearby_observations_merge_across_runs(self, tmp_path):
+        index = PotholeSpatialIndex(merge_radius=5.0)
+        first, merged = index.add_observation(-23.55, -46.63, source='run_a.mp4', severity_level='medium')
+        assert not merged
+
+        # ~2 m ao norte, em outra passagem
+        second, merged = index.add_observation(-23.549982, -46.63, source='run_b.mp4', severity_level='high')
+        assert merged and second.pothole_id == first.pothole_id
+        assert second.severity_level == 'high'
+        assert second.sources == {'run_a.mp4': 1, 'run_b.mp4': 1}
+
+        # ~20 m a leste: outro buraco
+        _, merged = index.add_observation(-23.55, -46.6298, source='run_b.mp4')
+        assert not merged and len(index) == 2
+
+        index.save(str(tmp_path / "index.json"))
+        restored = PotholeSpatialIndex.load(str(tmp_path / "index.json"))
+        assert restored.nearest(-23.55001, -46.63)[0].observations == 2
+
+    def test_lookup_scales_to_city_size_index(self):
+        index = PotholeSpatialIndex(merge_radius=5.0)
+        # Grade de 300 x 300 buracos espaçados de ~20 m (~6 km x 6 km)
+        step = 20.0 / 111320.0
+        for row in range(300):
+            for column in range(300):
+                index.add_observation(-23.6 + row * step, -46.7 + column * step)
+        assert len(index) == 90000
+
+        start = time.perf_counter()
+        for i in range(1000):
+            index.nearest(-23.6 + (i % 300) * step, -46.7 + (i * 7 % 300) * step)
+        assert (time.perf_counter() - start) / 1000 < 1e-3
+
+        pothole, distance = index.nearest(-23.6 + 10 * step + 1e-6, -46.7 + 10 * step)
+        assert distance == pytest.approx(distance_meters(-23.6 + 10 * step + 1e-6, -46.7 + 10 * step,
+                                                         pothole.latitude, pothole.longitude))
+
+    def test_locked_updates_from_concurrent_jobs_are_not_lost(self, tmp_path):
+        path = str(tmp_path / "index.json")
+
+        def job(column):
+            with PotholeSpatialIndex.locked(path, merge_radius=5.0) as index:
+                time.sleep(0.02)
+                index.add_observation(-23.55, -46.63 + column * 0.001, source=f"run_{column}.mp4")
+
+        threads = [threading.Thread(target=job, args=(column,)) for column in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(PotholeSpatialIndex.load(path)) == 4
@@ -0,0 +1,110 @@
+
+
+import pytest
+import random
+import string
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from vision.ocr.plate_classifier import PlateClassifier, PlaceTrie, MERCOSUL_TYPE, CONVENTIONAL_TYPE, UNKNOWN_TYPE
+from vision.ocr.plate_hotlist import PlateHotlistIndex, PlateHotlist, canonical_plate
+
+@pytest.fixture
+def classifier():
+    return PlateClassifier()
+
+class TestPlateNormalizer:
+
+    def test_batch_corrects_confusions_by_slot(self, classifier):
+        results = classifier.normalize_batch(["ABC1D23", "hqw 5678", "0BC1D2O", "A8C-I234", "BR FJB4E12", "INVALID"])
+
+        assert [r.number for r in results] == ["ABC1D23", "HQW-5678", "OBC1D20", "ABC-1234", "FJB4E12", None]
+        assert [r.type for r in results] == [MERCOSUL_TYPE, CONVENTIONAL_TYPE, MERCOSUL_TYPE,
+                                             CONVENTIONAL_TYPE, MERCOSUL_TYPE, UNKNOWN_TYPE]
+        assert [r.corrections for r in results[:4]] == [0, 0, 2, 2]
+        assert results[0].pattern_match and not results[2].pattern_match
+
+    def test_corrections_lower_confidence(self, classifier):
+        exact, corrected = classifier.normalize_batch(["FJB4E12", "FJ84E12"], [0.9, 0.9])
+
+        assert exact.confidence == pytest.approx(0.9)
+        assert corrected.number == "FJB4E12"
+        assert corrected.confidence < exact.confidence
+
+    def test_classify_plate_uses_context(self, classifier):
+        plate_info = classifier.classify_plate([
+            {"text": "MS CAMPO GRANDE", "confidence": 0.85},
+            {"text": "HQW-5678", "confidence": 0.92},
+            {"text": "HQW 5G78", "confidence": 0.88}
+        ])
+
+        assert plate_info.number == "HQW-5678"
+        assert (plate_info.state, plate_info.city) == ("MS", "CAMPO GRANDE")
+        assert classifier.get_plate_details(plate_info)['estado'] == "MS (Mato Grosso do Sul)"
+
+    def test_place_trie_matches_whole_words(self):
+        trie = PlaceTrie()
+        trie.insert("SP", ("SP", None))
+        trie.insert("SAO PAULO", ("SP", "SAO PAULO"))
+        trie.insert("SANTOS", ("SP", "SANTOS"))
+
+        assert trie.find_all("SP SAO PAULO SANTOSX") == [("SP", None), ("SP", "SAO PAULO")]
+        assert trie.find_all("SPX") == []
+
+def _random_plate(rng):
+    letters, digits = string.ascii_uppercase, string.digits
+    return ''.join(rng.choice(letters) for _ in range(3)) + rng.choice(digits) + rng.choice(letters) + \
+        rng.choice(digits) + rng.choice(digits)
+
+class TestPlateHotlist:
+
+    def test_matches_agree_with_linear_scan(self):
+        rng = random.Random(7)
+        plates = [_random_plate(rng) for _ in range(3000)]
+        index = PlateHotlistIndex((plate, '') for plate in plates)
+        queries = [plate[:2] + rng.choice("08") + plate[3:6] + rng.choice("19") for plate in plates[:200]]
+
+        for query in queries:
+            expected = sorted(
+                (sum(a != b for a, b in zip(query, plate)), plate) for plate in set(plates)
+                if sum(a != b for a, b in zip(query, plate)) <= 2
+            )
+            assert sorted((m.distance, m.plate) for m in index.match(query)) == expected
+
+    def test_legacy_entry_matches_converted_plate(self):
+        index = PlateHotlistIndex([("ABC-1234", "roubo"), ("FJB4E12", "furto"), ("INVALIDA", "")])
+
+        assert canonical_plate("ABC-1234") == "ABC1C34"
+        assert [(m.plate, m.distance, m.info) for m in index.match("ABC1C34")] == [("ABC-1234", 0, "roubo")]
+        assert index.match("F J8 4E1Z", max_distance=2)[0].plate == "FJB4E12"
+        assert index.match("FJ84E1Z", max_distance=1) == []
+        assert index.invalid == 1 and "ABC1234" in index
+
+    def test_reload_swaps_index_only_when_file_changes(self, tmp_path):
+        path = tmp_path / "hotlist.csv"
+        path.write_text("# placas\nABC1D23;furto\n")
+        hotlist = PlateHotlist(str(path))
+        old_index = hotlist.index
+
+        assert hotlist.reload() is False
+        path.write_text("# placas\nABC1D23;furto\nBRA2E19;roubo\n")
+
+        assert hotlist.reload(wait=True) is True
+        assert hotlist.index is not old_index
+        assert hotlist.match("BRA2E18")[0].info == "roubo"
+        assert old_index.match("BRA2E18") == []
+        assert hotlist.get_stats()['plates'] == 2
+
+    def test_batch_queries_are_counted_in_stats(self, tmp_path):
+        path = tmp_path / "hotlist.csv"
+        path.write_text("ABC1D23;furto\n")
+        hotlist = PlateHotlist(str(path))
+
+        hotlist.match("ABC1D23")
+        results = hotlist.match_batch(["ABC1D28", "XYZ9W99", "QQQ0Q00"])
+
+        assert [bool(matches) for matches in results] == [True, False, False]
+        stats = hotlist.get_stats()
+        assert (stats['queries'], stats['hits']) == (4, 2)
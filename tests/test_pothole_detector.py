@@ -0,0 +1,335 @@
+
+import pytest
+import numpy as np
+import cv2
+import sys
+from pathlib import Path
+from collections import deque
+from unittest.mock import patch, Mock
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from vision.detection.pothole_detector import (
+    PotholeDetector, PotholeDetection, PotholeTrack, InvalidRangeError, SEVERITY_SCORES,
+    VideoAnalysisAggregates
+)
+from vision.tracking.interpolation import INTERPOLATED
+from vision.geo.spatial_index import PotholeSpatialIndex
+
+@pytest.fixture
+def make_detector():
+    def make(**video_config):
+        with patch('vision.detection.pothole_detector.YOLO_AVAILABLE', True), \
+                patch('vision.detection.pothole_detector.YOLO'):
+            detector = PotholeDetector({'video_analysis': video_config})
+        detector.model = None
+        return detector
+    return make
+
+def _write_video(path, frame_count=40, fps=10.0, size=(64, 48)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), fps, size)
+    for index in range(frame_count):
+        writer.write(np.full((size[1], size[0], 3), 5 * index, dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+class TestProcessVideoRange:
+
+    def test_only_frames_inside_range_are_processed(self, make_detector, tmp_path):
+        video_path = _write_video(tmp_path / "clip.avi")
+        detector = make_detector()
+
+        with patch.object(detector, '_analyze_frame', wraps=detector._analyze_frame) as analyze_frame:
+            report = detector.process_video(video_path, start=1.0, end=2.5)
+
+        processed = [call.args[1] for call in analyze_frame.call_args_list]
+        assert processed == list(range(10, 25))
+        assert report['video_info']['analyzed_range']['start_frame'] == 10
+        assert report['video_info']['analyzed_range']['end_frame'] == 25
+
+    def test_range_outside_video_is_rejected(self, make_detector, tmp_path):
+        video_path = _write_video(tmp_path / "clip.avi")
+
+        with pytest.raises(InvalidRangeError):
+            make_detector().process_video(video_path, start=10.0)
+
+    def test_capture_is_released_when_output_cannot_be_opened(self, make_detector, tmp_path):
+        video_path = _write_video(tmp_path / "clip.avi")
+        (tmp_path / "not_a_dir").write_text("")
+        detector = make_detector(output_mode='full')
+        captures = []
+
+        def open_video(*args, **kwargs):
+            opened = PotholeDetector._open_video(detector, *args, **kwargs)
+            captures.append(Mock(wraps=opened[0]))
+            return (captures[-1],) + opened[1:]
+
+        detector._open_video = open_video
+        with pytest.raises(OSError):
+            detector.process_video(video_path, output_path=str(tmp_path / "not_a_dir" / "out.mp4"))
+
+        captures[0].release.assert_called_once()
+
+    def test_live_sources_reject_range_options(self, make_detector):
+        with pytest.raises(ValueError):
+            make_detector().process_video("rtsp://camera.local/stream", start=1.0)
+
+class _FrameListCapture:
+    """Captura falsa: o índice do frame fica no primeiro pixel"""
+
+    def __init__(self, frame_count):
+        self.frames = [np.full((48, 64, 3), index, dtype=np.uint8) for index in range(frame_count)]
+        self.position = 0
+
+    def read(self):
+        if self.position >= len(self.frames):
+            return False, None
+        self.position += 1
+        return True, self.frames[self.position - 1]
+
+    def set(self, prop, value):
+        self.position = int(value)
+        return True
+
+def _moving_pothole(frame, analyze=False, low_confidence=False):
+    """Detector falso: caixa que anda 2 px por frame"""
+    x = 10 + 2 * int(frame[0, 0, 0])
+    return [PotholeDetection((x, 20, x + 40, 60), 0.9, 'pothole')]
+
+class TestSkippedFrameInterpolation:
+
+    def test_skipped_frames_are_written_with_interpolated_boxes(self, make_detector):
+        detector = make_detector(frame_skip=3, min_track_length=1)
+        detector.detect = _moving_pothole
+        output_video = Mock()
+        aggregates = VideoAnalysisAggregates()
+
+        detector._process_frames(_FrameListCapture(13), 10.0, 13, aggregates, output_video=output_video)
+
+        written = {call.args[0]: call.args[2][0] for call in output_video.write.call_args_list}
+        assert sorted(written) == list(range(13))
+        assert aggregates.processed_frames == 5
+        assert aggregates.interpolated_frames == 8
+
+        for frame_number in (1, 2, 4, 5, 7, 8, 10, 11):
+            detection, = written[frame_number]
+            assert detection.interpolation == INTERPOLATED
+            assert detection.bbox[0] == pytest.approx(10 + 2 * frame_number)
+        assert written[3][0].interpolation is None
+
+class TestBoxStatistics:
+
+    def test_integral_statistics_match_per_roi_computation(self, make_detector):
+        detector = make_detector()
+        rng = np.random.default_rng(7)
+        frame = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+        frame[100:300, 200:400] //= 4
+        bboxes = [(200, 100, 400, 300), (0, 0, 37, 53), (600, 440, 700, 520), (150, 250, 260, 330), (5, 300, 6, 301)]
+        detections = [PotholeDetection(bbox, 0.8, 'pothole') for bbox in bboxes]
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        analyzed = detector._analyze_potholes(detections, frame, gray, detector._integral_images(gray))
+
+        for detection in analyzed:
+            x1, y1, x2, y2 = detection.bbox
+            roi = gray[y1:y2, x1:x2].astype(np.float64)
+            expected = np.clip((255 - roi.mean()) / 255.0 * 0.5 + roi.std() / 255.0 * 0.3, 0.01, 1.0)
+            assert detection.depth_estimate == pytest.approx(expected, rel=1e-9)
+            assert detection.severity_level == detector._classify_severity(expected)
+            assert detection.area_estimate == detector._estimate_area(detection.bbox)
+
+def _textured_frames(count, seed=3):
+    """Pares (nítido, borrado) de uma textura de blocos 8x8"""
+    rng = np.random.default_rng(seed)
+    pairs = []
+    for _ in range(count):
+        sharp = cv2.resize(rng.integers(0, 256, (60, 80), dtype=np.uint8), (640, 480),
+                           interpolation=cv2.INTER_NEAREST)
+        pairs.append((cv2.cvtColor(sharp, cv2.COLOR_GRAY2BGR),
+                      cv2.cvtColor(cv2.GaussianBlur(sharp, (0, 0), 8), cv2.COLOR_GRAY2BGR)))
+    return pairs
+
+class TestLowConfidenceAssociation:
+
+    def test_low_confidence_boxes_only_extend_confirmed_tracks(self, make_detector):
+        detector = make_detector(min_track_length=2)
+        # Frames 0-2 confiantes; 3-5 com confiança baixa (buraco parcialmente ocluído) e uma caixa isolada
+        confidences = [0.9, 0.9, 0.9, 0.3, 0.3, 0.3]
+        requested = []
+
+        def detect(frame, analyze=False, low_confidence=False):
+            requested.append(low_confidence)
+            index = int(frame[0, 0, 0])
+            return [PotholeDetection((100, 100, 160, 160), confidences[index], 'pothole'),
+                    PotholeDetection((400, 300, 450, 350), 0.3, 'pothole')]
+
+        detector.detect = detect
+        aggregates = VideoAnalysisAggregates()
+        detector._process_frames(_FrameListCapture(6), 10.0, 6, aggregates)
+
+        assert all(requested)
+        track, = detector.tracks.values()
+        assert track.total_frames == 6 and track.last_frame == 5
+        assert aggregates.total_detections == 6
+
+    def test_model_threshold_is_lowered_only_for_tracking(self, make_detector):
+        detector = make_detector()
+        detector.model = Mock(return_value=[Mock(boxes=None)])
+
+        detector.detect(np.zeros((8, 8, 3), dtype=np.uint8))
+        detector.detect(np.zeros((8, 8, 3), dtype=np.uint8), low_confidence=True)
+
+        assert [call.kwargs['conf'] for call in detector.model.call_args_list] == [0.5, 0.1]
+
+class TestFrameQuality:
+
+    def test_blurred_frames_are_gated_and_sharp_frames_pass(self, make_detector):
+        detector = make_detector(quality_estimator='fast', min_frame_quality=0.8)
+        capture = _FrameListCapture(0)
+        capture.frames = [frame for pair in _textured_frames(4) for frame in pair]
+        detected = []
+        detector.detect = lambda frame, analyze=False, low_confidence=False: detected.append(frame) or []
+        aggregates = VideoAnalysisAggregates()
+
+        detector._process_frames(capture, 10.0, len(capture.frames), aggregates)
+
+        assert aggregates.quality_gated_frames == 4
+        assert aggregates.processed_frames == 4
+        assert [id(frame) for frame in detected] == [id(frame) for frame in capture.frames[0::2]]
+
+    def test_calibration_suggests_scale_that_separates_sharp_from_blurred(self, make_detector, tmp_path):
+        pairs = _textured_frames(10)
+        video_path = str(tmp_path / "quality.avi")
+        writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'MJPG'), 10.0, (640, 480))
+        for sharp, blurred in pairs:
+            writer.write(sharp)
+            writer.write(blurred)
+        writer.release()
+        detector = make_detector(quality_estimator='fast')
+
+        calibration = detector.calibrate_frame_quality(video_path)
+
+        assert calibration['samples'] == 20
+        assert calibration['calibrated']['mean_abs_error'] <= calibration['current']['mean_abs_error']
+        assert calibration['calibrated']['bucket_agreement'] >= calibration['current']['bucket_agreement']
+
+        detector.quality_laplacian_scale = calibration['suggested_laplacian_scale']
+        sharp_scores = [detector._assess_frame_quality_fast(cv2.cvtColor(s, cv2.COLOR_BGR2GRAY)) for s, _ in pairs]
+        blurred_scores = [detector._assess_frame_quality_fast(cv2.cvtColor(b, cv2.COLOR_BGR2GRAY)) for _, b in pairs]
+        assert min(sharp_scores) > max(blurred_scores)
+
+class TestPerTrackAnalysis:
+
+    def test_representative_is_reanalyzed_only_on_significant_gain(self, make_detector):
+        detector = make_detector(analysis_mode='per_track', min_track_length=1)
+        gray = np.full((480, 640), 128, dtype=np.uint8)
+
+        with patch.object(detector, '_analyze_potholes', wraps=detector._analyze_potholes) as analyze:
+            # Buraco se aproximando: a caixa cresce a cada frame e a pontuação melhora sempre
+            for frame_number in range(60):
+                size = 40 + 2 * frame_number
+                detection = PotholeDetection((100, 100, 100 + size, 100 + size), 0.9, 'pothole')
+                detector._update_tracking([detection], frame_number, gray=gray, frame_quality=0.8)
+
+        track, = detector.tracks.values()
+        assert track.total_frames == 60
+        assert analyze.call_count == track.representative_analyses
+        assert track.representative_analyses < 15
+        assert track.representative_frame >= 50
+
+def _stable_track(track_id, last_frame, length=5):
+    return PotholeTrack(
+        track_id=track_id, first_frame=last_frame - length + 1, last_frame=last_frame,
+        detections=deque(maxlen=30), average_confidence=0.9, average_risk_score=0.5,
+        severity_level='medium', total_frames=length, stability_score=1.0
+    )
+
+def _empty_track(track_id, first_frame=0):
+    return PotholeTrack(
+        track_id=track_id, first_frame=first_frame, last_frame=first_frame, detections=deque(maxlen=30),
+        average_confidence=0.0, average_risk_score=0.0, severity_level='low', total_frames=0,
+        stability_score=1.0
+    )
+
+def _detections(count, offset=0):
+    severities = ['low', 'medium', None, 'high', 'critical']
+    return [
+        PotholeDetection((0, 0, 10, 10), 0.5 + 0.01 * ((index + offset) % 40), 'pothole',
+                         severity_level=severities[index % len(severities)],
+                         risk_score=None if index % 4 == 0 else 0.1 + 0.02 * (index % 30))
+        for index in range(count)
+    ]
+
+def _check_aggregates(track, detections):
+    """Compara os agregados incrementais com o recálculo sobre todas as detecções"""
+    risks = [d.risk_score for d in detections if d.risk_score]
+    severities = [d.severity_level for d in detections if d.severity_level]
+    assert track.total_frames == len(detections)
+    assert track.average_confidence == pytest.approx(np.mean([d.confidence for d in detections]))
+    assert track.average_risk_score == pytest.approx(np.mean(risks))
+    assert dict(track.severity_counts) == {level: severities.count(level) for level in set(severities)}
+    assert track.average_severity_score == pytest.approx(np.mean([SEVERITY_SCORES[s] for s in severities]))
+    assert track.best_detection.confidence == max(d.confidence for d in detections)
+
+class TestPotholeTrack:
+
+    def test_running_aggregates_match_recomputation(self):
+        detections = _detections(100)
+        track = _empty_track(1)
+        for frame_number, detection in enumerate(detections):
+            track.add_detection(detection, frame_number)
+
+        _check_aggregates(track, detections)
+        assert track.last_frame == 99
+
+    def test_merge_matches_recomputation_over_both_parts(self):
+        head, tail = _detections(50), _detections(35, offset=7)
+        first, second = _empty_track(1), _empty_track(2, first_frame=60)
+        for frame_number, detection in enumerate(head):
+            first.add_detection(detection, frame_number)
+        for frame_number, detection in enumerate(tail, start=60):
+            second.add_detection(detection, frame_number)
+
+        first.merge(second)
+
+        _check_aggregates(first, head + tail)
+        assert (first.first_frame, first.last_frame) == (0, 94)
+
+    def test_history_is_bounded(self):
+        track = _empty_track(1)
+        detections = _detections(100)
+        for frame_number, detection in enumerate(detections):
+            track.add_detection(detection, frame_number)
+
+        assert len(track.detections) == track.detections.maxlen == 30
+        assert list(track.detections) == detections[-30:]
+
+        other = _empty_track(2, first_frame=100)
+        for frame_number, detection in enumerate(_detections(20), start=100):
+            other.add_detection(detection, frame_number)
+        track.merge(other)
+        assert len(track.detections) == 30
+
+class TestGeolocation:
+
+    def test_tracks_are_located_and_merged_into_shared_index(self, make_detector, tmp_path):
+        index_path = tmp_path / "potholes.json"
+        gps_path = tmp_path / "run.csv"
+        gps_path.write_text("time,lat,lon\n0,-23.55,-46.63\n10,-23.55,-46.62\n")
+
+        reports = []
+        for run in ("run_a.mp4", "run_b.mp4"):
+            detector = make_detector(spatial_index_path=str(index_path), min_track_length=3)
+            # Vistos pela última vez em 1 s e 5 s (~400 m de distância); o track curto fica de fora
+            detector.tracks = {1: _stable_track(1, 10), 2: _stable_track(2, 50), 3: _stable_track(3, 70, length=1)}
+            reports.append(detector._geolocate_tracks(str(tmp_path / run), 10.0, str(gps_path)))
+
+        first, second = reports
+        assert first['located_tracks'] == 2 and first['new_potholes'] == 2
+        assert second['merged_observations'] == 2 and second['indexed_potholes'] == 2
+        assert detector.tracks[1].longitude == pytest.approx(-46.629)
+        assert detector.tracks[3].latitude is None
+
+        index = PotholeSpatialIndex.load(str(index_path))
+        pothole, _ = index.nearest(-23.55, -46.625)
+        assert pothole.sources == {str(tmp_path / "run_a.mp4"): 1, str(tmp_path / "run_b.mp4"): 1}
@@ -0,0 +1,441 @@
+
+
+import pytest
+import time
+import asyncio
+import numpy as np
+import cv2
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from vision.ocr.text_extractor import TextExtractor, TextResult, OCRBatchResult, OCRType
+from vision.ocr.crop_cache import CropResultCache
+from vision.ocr.plate_recognizer import PLATE_ALPHABET, encode_plate, constrained_ctc_decode, ctc_greedy_decode
+from vision.ocr.crop_quality import calibrate_quality_gate, BLURRED, OVEREXPOSED, TOO_SMALL
+from vision.ocr.plate_voting import PlateOCRScheduler, plate_consensus
+
+def _make_extractor(ocr_type, engine, config=None):
+    with patch.object(TextExtractor, 'initialize'):
+        extractor = TextExtractor(config or {})
+    extractor.current_ocr = ocr_type
+    extractor.ocr_engines[ocr_type] = engine
+    return extractor
+
+def _paddle_ocr(recognize, detect=None):
+    """Imita PaddleOCR.ocr 2.7: uma lista é tratada como páginas; com det=False cada página vai ao
+    reconhecedor, e uma página que é ela mesma uma lista de recortes é reconhecida em um único lote"""
+    def ocr(img, det=True, cls=True):
+        pages = img if isinstance(img, list) else [img]
+        if det:
+            return [detect(page) for page in pages]
+        return [recognize(page if isinstance(page, list) else [page]) for page in pages]
+    return ocr
+
+@pytest.fixture
+def frame():
+    return np.random.randint(0, 255, (240, 640, 3), dtype=np.uint8)
+
+@pytest.fixture
+def plate_regions():
+    return [{'bbox': (10 + i * 75, 20 + i * 20, 70, 20 + i * 4)} for i in range(8)]
+
+class TestBatchRecognition:
+
+    def test_paddleocr_runs_recognizer_once_on_normalized_crops(self, frame, plate_regions):
+        engine = Mock()
+        engine.ocr.side_effect = _paddle_ocr(lambda crops: [(f"PLT{i}", 0.9) for i in range(len(crops))])
+        extractor = _make_extractor(OCRType.PADDLEOCR, engine)
+
+        result = extractor.extract_text(frame, plate_regions)
+
+        assert engine.ocr.call_count == 1
+        crops, = engine.ocr.call_args[0][0]
+        assert {crop.shape[0] for crop in crops} == {48}
+        assert engine.ocr.call_args[1]['det'] is False
+        assert [r.text for r in result.text_results] == [f"PLT{i}" for i in range(8)]
+        assert [r.bbox for r in result.text_results] == [r['bbox'] for r in plate_regions]
+
+    def test_easyocr_results_map_back_to_regions(self, frame, plate_regions):
+        def recognize(canvas, horizontal_list, free_list, batch_size, detail):
+            results = [
+                ([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], f"PLT{index}", 0.8)
+                for index, (x0, x1, y0, y1) in enumerate(horizontal_list)
+            ]
+            return results[::-1]
+
+        engine = Mock()
+        engine.recognize.side_effect = recognize
+        extractor = _make_extractor(OCRType.EASYOCR, engine)
+
+        texts = extractor.extract_text_batch(frame, plate_regions)
+
+        assert engine.recognize.call_count == 1
+        assert [(t.text, t.bbox) for t in texts] == [(f"PLT{i}", r['bbox']) for i, r in enumerate(plate_regions)]
+
+    def test_engine_failure_falls_back_to_per_region(self, frame, plate_regions):
+        engine = Mock()
+        engine.ocr.side_effect = [RuntimeError("batch"), *[[[[[[0, 0]], ("ABC1D23", 0.9)]]]] * 8]
+        extractor = _make_extractor(OCRType.PADDLEOCR, engine)
+
+        result = extractor.extract_text(frame, plate_regions)
+
+        assert engine.ocr.call_count == 9
+        assert result.total_texts == 8
+
+class TestPlateMode:
+
+    @pytest.fixture
+    def skewed_plate(self):
+        image = np.full((80, 200, 3), 30, dtype=np.uint8)
+        corners = np.array([[20, 15], [185, 5], [180, 70], [15, 65]], dtype=np.int32)
+        cv2.fillConvexPoly(image, corners, (230, 230, 230))
+        return image
+
+    def test_confident_plates_skip_detection_and_angle_classification(self, frame, plate_regions):
+        engine = Mock()
+        engine.ocr.side_effect = _paddle_ocr(lambda crops: [("ABC1D23", 0.95)] * len(crops))
+        extractor = _make_extractor(OCRType.PADDLEOCR, engine, {'plate_mode': True})
+
+        result = extractor.extract_text(frame, plate_regions)
+
+        assert engine.ocr.call_count == 1
+        assert len(engine.ocr.call_args[0][0]) == 1 and len(engine.ocr.call_args[0][0][0]) == 8
+        assert engine.ocr.call_args[1] == {'det': False, 'cls': False}
+        assert result.total_texts == 8
+        assert extractor.get_ocr_info()['plate_mode']['fast_path'] == 8
+
+    def test_low_confidence_falls_back_to_full_pipeline(self, skewed_plate):
+        engine = Mock()
+        engine.ocr.side_effect = _paddle_ocr(
+            lambda crops: [("A8C1D2", 0.4)] * len(crops),
+            lambda image: [[[[0, 0]], ("ABC1D23", 0.9)]]
+        )
+        extractor = _make_extractor(OCRType.PADDLEOCR, engine, {'plate_mode': True})
+
+        result = extractor.extract_text(skewed_plate, [{'bbox': (0, 0, 200, 80)}])
+
+        assert result.text_results[0].text == "ABC1D23"
+        assert engine.ocr.call_args_list[-1][1] == {'cls': True}
+        assert extractor.plate_fallback_count == 1
+
+    def test_rectify_plate_removes_perspective(self, skewed_plate):
+        rectified = TextExtractor._rectify_plate(skewed_plate)
+
+        assert rectified.shape[1] > 2 * rectified.shape[0]
+        # Sem o fundo escuro nos cantos após a retificação
+        assert rectified[2:-2, 2:-2].min() > 200
+
+class TestEngineCascade:
+
+    @pytest.fixture
+    def cascade_extractor(self):
+        paddle = Mock()
+        paddle.ocr.side_effect = _paddle_ocr(lambda crops: [("ABC1D23", 0.95), ("A8C-12", 0.9), ("BRA2E19", 0.3)])
+        tesseract = Mock()
+        tesseract.image_to_string.side_effect = ["ABC-1234", "BRA2E19"]
+        extractor = _make_extractor(OCRType.PADDLEOCR, paddle, {'enable_fallback': True, 'cascade_min_confidence': 0.6})
+        extractor.ocr_engines[OCRType.TESSERACT] = tesseract
+        extractor.cascade = [OCRType.PADDLEOCR, OCRType.TESSERACT]
+        return extractor, paddle, tesseract
+
+    def test_only_rejected_reads_escalate(self, frame, cascade_extractor):
+        extractor, paddle, tesseract = cascade_extractor
+        regions = [{'bbox': (0, 0, 120, 40)}, {'bbox': (0, 50, 120, 40)}, {'bbox': (0, 100, 120, 40)}]
+
+        result = extractor.extract_text(frame, regions)
+
+        assert paddle.ocr.call_count == 1
+        assert tesseract.image_to_string.call_count == 2
+        assert [r.text for r in result.text_results] == ["ABC1D23", "ABC-1234", "BRA2E19"]
+        assert result.metadata['cascade_escalations'] == 2
+        assert extractor.current_ocr == OCRType.PADDLEOCR
+
+        engines = extractor.get_ocr_info()['engines']
+        assert engines['paddleocr']['calls'] == 1 and engines['paddleocr']['accepted'] == 1
+        assert engines['tesseract']['regions'] == 2 and engines['tesseract']['accepted'] == 2
+
+    def test_cascade_order_follows_engine_cost(self):
+        def fake_init(engine):
+            def init(self):
+                self.ocr_engines[engine] = Mock()
+                self.current_ocr = engine
+            return init
+
+        with patch.object(TextExtractor, '_initialize_easyocr', fake_init(OCRType.EASYOCR)), \
+             patch.object(TextExtractor, '_initialize_paddleocr', fake_init(OCRType.PADDLEOCR)), \
+             patch.object(TextExtractor, '_initialize_tesseract', side_effect=ImportError("Tesseract não está disponível")):
+            extractor = TextExtractor({'enable_fallback': True, 'fallback_order': ["easyocr", "tesseract", "paddleocr"]})
+
+        assert extractor.cascade == [OCRType.PADDLEOCR, OCRType.EASYOCR]
+        assert extractor.current_ocr == OCRType.PADDLEOCR
+
+def _ctc_log_probs(text, steps=32, confusions=None):
+    """Saída CTC sintética: cada caractere ocupa um segmento de passos separado por brancos"""
+    probabilities = np.full((steps, len(PLATE_ALPHABET) + 1), 0.001)
+    probabilities[:, 0] = 1.0
+    segment = steps // len(text)
+    for position, label in enumerate(encode_plate(text)):
+        rows = slice(position * segment + 1, (position + 1) * segment - 1)
+        probabilities[rows] = 0.001
+        probabilities[rows, label] = 1.0
+        for char, weight in (confusions or {}).get(position, {}).items():
+            probabilities[rows, encode_plate(char)[0]] = weight
+    return np.log(probabilities / probabilities.sum(axis=-1, keepdims=True))
+
+class TestPlateCRNN:
+
+    def test_constrained_decoder_follows_plate_slots(self):
+        log_probs = np.stack([
+            _ctc_log_probs("ABC1D23"),
+            _ctc_log_probs("ABC1234"),
+            _ctc_log_probs("0BC1D2O", confusions={0: {'O': 0.6}, 6: {'0': 0.6}})
+        ])
+
+        decoded = constrained_ctc_decode(log_probs)
+
+        assert [text for text, _ in decoded] == ["ABC1D23", "ABC-1234", "OBC1D20"]
+        assert all(0.0 < confidence <= 1.0 for _, confidence in decoded)
+        assert ctc_greedy_decode(log_probs[2:])[0][0] == "0BC1D2O"
+
+    def test_extractor_batches_regions_through_recognizer(self, frame, plate_regions):
+        engine = Mock()
+        engine.recognize.side_effect = lambda rois: [("ABC1D23", 0.97)] * len(rois)
+        extractor = _make_extractor(OCRType.PLATE_CRNN, engine)
+
+        result = extractor.extract_text(frame, plate_regions)
+
+        assert engine.recognize.call_count == 1
+        assert len(engine.recognize.call_args[0][0]) == len(plate_regions)
+        assert result.metadata['ocr_engine'] == OCRType.PLATE_CRNN
+        assert [r.text for r in result.text_results] == ["ABC1D23"] * len(plate_regions)
+
+class TestOCRWorkerPool:
+
+    def test_sync_and_async_extraction_in_worker_processes(self, frame, plate_regions):
+        extractor = TextExtractor({'ocr_workers': 2, 'ocr_worker_start_method': 'fork'})
+        try:
+            result = extractor.extract_text(frame, plate_regions)
+            assert [r.bbox for r in result.text_results] == [r['bbox'] for r in plate_regions]
+
+            async def run_concurrently():
+                return await asyncio.gather(*[extractor.extract_text_async(frame, plate_regions) for _ in range(6)])
+
+            results = asyncio.run(run_concurrently())
+            assert all(r.total_texts == 8 for r in results)
+
+            stats = extractor.get_ocr_info()['worker_pool']
+            assert stats['completed'] == 7
+            assert stats['engine'] == OCRType.TRANSFORMER_OCR
+        finally:
+            extractor.cleanup()
+
+    def test_hung_worker_times_out_and_is_restarted(self, frame, plate_regions):
+        original = TextExtractor._extract_with_simulator
+
+        def hang_on_wide_crops(self, roi, bbox):
+            if roi.shape[1] > 300:
+                time.sleep(30)
+            return original(self, roi, bbox)
+
+        # Os workers (fork) herdam o motor alterado
+        extractor = TextExtractor({'ocr_workers': 1, 'ocr_timeout': 0.5, 'ocr_worker_start_method': 'fork'})
+        try:
+            with patch.object(TextExtractor, '_extract_with_simulator', hang_on_wide_crops):
+                hung = extractor.extract_text(frame, [{'bbox': (0, 0, 400, 50)}])
+                assert 'error' in hung.metadata
+
+                result = extractor.extract_text(frame, plate_regions)
+                assert result.total_texts == 8
+
+            stats = extractor.worker_pool.get_stats()
+            assert stats['timeouts'] == 1 and stats['restarts'] == 1
+        finally:
+            extractor.cleanup()
+
+class TestCropResultCache:
+
+    def test_repeated_plate_is_served_from_cache(self, frame, plate_regions):
+        engine = Mock()
+        engine.ocr.side_effect = _paddle_ocr(lambda crops: [(f"PLT{i}", 0.9) for i in range(len(crops))])
+        extractor = _make_extractor(OCRType.PADDLEOCR, engine, {'crop_cache': True})
+
+        first = extractor.extract_text(frame, plate_regions[:2])
+
+        # Mesmo conteúdo em outra posição, com ruído leve: acerto por proximidade
+        moved = frame.copy()
+        x, y, w, h = plate_regions[0]['bbox']
+        noisy = np.clip(frame[y:y+h, x:x+w].astype(np.int16) + np.random.randint(-2, 3, (h, w, 3)), 0, 255)
+        moved[150:150+h, 300:300+w] = noisy.astype(np.uint8)
+        second = extractor.extract_text(moved, [{'bbox': (300, 150, w, h)}, plate_regions[1]])
+
+        assert engine.ocr.call_count == 1
+        assert [r.text for r in second.text_results] == [r.text for r in first.text_results]
+        assert second.text_results[0].bbox == (300, 150, w, h)
+        stats = extractor.get_ocr_info()['crop_cache']
+        assert stats['hits'] == 2 and stats['hit_rate'] == 0.5
+
+    def test_lru_eviction_and_distinct_crops_miss(self):
+        cache = CropResultCache(max_entries=2, max_distance=4)
+        crops = [np.random.randint(0, 255, (30, 100), dtype=np.uint8) for _ in range(3)]
+        hashes = [cache.hash_crop(crop) for crop in crops]
+        results = [TextResult(f"T{i}", 0.9, (0, 0, 100, 30), 'pt', 0.1) for i in range(3)]
+
+        cache.put(hashes[0], results[0])
+        cache.put(hashes[1], results[1])
+        assert cache.get(hashes[0]).text == "T0"
+        cache.put(hashes[2], results[2])
+
+        assert cache.get(hashes[1]) is None
+        assert cache.get(hashes[0]).text == "T0"
+        assert cache.get(hashes[2]).processing_time == 0.0
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_updated_entry_is_stored_without_processing_time(self):
+        cache = CropResultCache()
+        crop_hash = cache.hash_crop(np.random.randint(0, 255, (30, 100), dtype=np.uint8))
+
+        cache.put(crop_hash, TextResult("T0", 0.6, (0, 0, 100, 30), 'pt', 0.1))
+        cache.put(crop_hash, TextResult("T1", 0.9, (0, 0, 100, 30), 'pt', 0.2))
+
+        assert cache.get(crop_hash).text == "T1"
+        assert cache.get(crop_hash).processing_time == 0.0
+
+def _plate_crop(height=40, text="ABC1D23"):
+    crop = np.full((height, height * 4, 3), 190, dtype=np.uint8)
+    cv2.putText(crop, text, (4, int(height * 0.75)), cv2.FONT_HERSHEY_SIMPLEX, height / 40, (30, 30, 30), 2)
+    return crop
+
+class TestCropQualityGate:
+
+    @pytest.fixture
+    def gated_frame(self):
+        frame = np.full((200, 400, 3), 128, dtype=np.uint8)
+        frame[0:40, 0:160] = _plate_crop()
+        frame[50:90, 0:160] = cv2.GaussianBlur(_plate_crop(), (21, 21), 8)
+        frame[100:108, 0:32] = _plate_crop(8)
+        frame[120:160, 0:160] = 252
+        return frame
+
+    def test_bad_crops_never_reach_engine(self, gated_frame):
+        engine = Mock()
+        engine.ocr.return_value = [[[[[0, 0]], ("ABC1D23", 0.9)]]]
+        extractor = _make_extractor(OCRType.PADDLEOCR, engine, {'quality_gate': True})
+        regions = [{'bbox': bbox} for bbox in [(0, 0, 160, 40), (0, 50, 160, 40), (0, 100, 32, 8), (0, 120, 160, 40)]]
+
+        result = extractor.extract_text(gated_frame, regions)
+
+        assert engine.ocr.call_count == 1
+        assert [r.bbox for r in result.text_results] == [(0, 0, 160, 40)]
+        reasons = {tuple(g['bbox']): g['reason'] for g in result.metadata['gated_regions']}
+        assert reasons == {(0, 50, 160, 40): BLURRED, (0, 100, 32, 8): TOO_SMALL, (0, 120, 160, 40): OVEREXPOSED}
+        assert extractor.get_ocr_info()['quality_gate']['rejected'] == 3
+
+    def test_all_gated_skips_engine(self, gated_frame):
+        engine = Mock()
+        extractor = _make_extractor(OCRType.PADDLEOCR, engine, {'quality_gate': True})
+
+        result = extractor.extract_text(gated_frame, [{'bbox': (0, 120, 160, 40)}])
+
+        engine.ocr.assert_not_called()
+        assert result.total_texts == 0
+        assert result.metadata['gated_regions'][0]['metrics']['bright_fraction'] > 0.9
+
+    def test_calibration_keeps_readable_crops(self):
+        readable = [_plate_crop(h) for h in (24, 32, 40, 48)]
+        unreadable = [cv2.GaussianBlur(crop, (21, 21), 8) for crop in readable]
+
+        report = calibrate_quality_gate(readable, unreadable, keep_ratio=1.0)
+
+        assert report['readable_kept'] == 1.0
+        assert report['unreadable_rejected'] == 1.0
+        assert set(report['thresholds']) == {
+            'gate_min_height', 'gate_min_sharpness', 'gate_max_clipped_fraction', 'gate_min_contrast'
+        }
+
+class _ScriptedExtractor:
+    """Extrator falso: devolve as leituras roteirizadas, uma por chamada e região"""
+
+    def __init__(self, reads):
+        self.reads = list(reads)
+        self.calls = []
+
+    def extract_text(self, image, regions):
+        self.calls.append(len(regions))
+        text, confidence = self.reads.pop(0)
+        results = [TextResult(text, confidence, region['bbox'], 'pt', 0.0) for region in regions]
+        return OCRBatchResult(results, 0.0, len(results), confidence, {})
+
+class _Plate:
+
+    def __init__(self, bbox, track_id):
+        self.bbox = bbox
+        self.track_id = track_id
+
+class TestPlateVoting:
+
+    @pytest.fixture
+    def sharp_frame(self):
+        image = np.zeros((120, 320, 3), dtype=np.uint8)
+        image[::4, :] = 255
+        return image
+
+    def test_consensus_votes_per_character(self):
+        text, confidence, votes = plate_consensus([("ABC1D23", 0.8), ("A8C1D23", 0.6), ("ABC1D23", 0.7)])
+
+        assert text == "ABC1D23"
+        assert votes[1] == pytest.approx({'B': 1.5, '8': 0.6})
+        assert 0.0 < confidence < 0.94
+
+    def test_zero_confidence_reads_do_not_break_consensus(self, sharp_frame):
+        assert plate_consensus([("ABC1234", 0.0)]) == ("ABC1234", 0.0, [{c: 0.0} for c in "ABC1234"])
+
+        extractor = _ScriptedExtractor([("ABC1234", 0.0), ("ABC1234", 0.95)])
+        scheduler = PlateOCRScheduler(extractor, {'read_interval': 1, 'lock_confidence': 0.9, 'min_sharpness': 10})
+        emitted = []
+        for frame_number in range(3):
+            emitted += scheduler.update(sharp_frame, frame_number, [_Plate((40, 30, 200, 70), 5)])
+
+        assert len(emitted) == 1 and emitted[0].plate_text == "ABC1234"
+
+    def test_track_locks_after_agreeing_reads_and_emits_once(self, sharp_frame):
+        extractor = _ScriptedExtractor([("ABC-1D23", 0.8), ("A8C1D23", 0.5), ("ABC1D23", 0.85)])
+        scheduler = PlateOCRScheduler(extractor, {'read_interval': 2, 'lock_confidence': 0.9, 'min_sharpness': 10})
+
+        emitted = []
+        for frame_number in range(20):
+            emitted += scheduler.update(sharp_frame, frame_number, [_Plate((40, 30, 200, 70), 7)])
+        emitted += scheduler.update(sharp_frame, 20, [], removed_track_ids=[7])
+
+        assert len(extractor.calls) == 3
+        assert len(emitted) == 1
+        assert emitted[0].plate_text == "ABC1D23" and emitted[0].locked
+        assert emitted[0].ocr_calls == 3
+
+    def test_agreeing_confident_reads_lock_before_max_reads(self, sharp_frame):
+        extractor = _ScriptedExtractor([("ABC1D23", 0.85), ("ABC-1D23", 0.8), ("XYZ9W99", 0.9)])
+        scheduler = PlateOCRScheduler(extractor, {'read_interval': 2, 'lock_confidence': 0.9,
+                                                  'max_reads': 5, 'min_sharpness': 10})
+
+        emitted = []
+        for frame_number in range(20):
+            emitted += scheduler.update(sharp_frame, frame_number, [_Plate((40, 30, 200, 70), 3)])
+        emitted += scheduler.update(sharp_frame, 20, [], removed_track_ids=[3])
+
+        assert len(emitted) == 1 and emitted[0].locked
+        assert emitted[0].plate_text == "ABC1D23"
+        assert emitted[0].ocr_calls == 2 < scheduler.max_reads
+        assert len(extractor.calls) == 2
+
+    def test_small_or_blurred_crops_are_not_read(self, sharp_frame):
+        extractor = _ScriptedExtractor([])
+        scheduler = PlateOCRScheduler(extractor, {'min_plate_height': 20, 'min_sharpness': 10})
+
+        scheduler.update(sharp_frame, 0, [_Plate((40, 30, 200, 40), 1)])
+        scheduler.update(np.full_like(sharp_frame, 128), 1, [_Plate((40, 30, 200, 70), 1)])
+
+        assert extractor.calls == []
+        assert scheduler.get_stats()['gated_crops'] == 2
+        assert scheduler.flush() == []
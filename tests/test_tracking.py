@@ -0,0 +1,121 @@
+
+
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from vision.tracking.tracker import (
+    MultiObjectTracker,
+    KalmanBoxFilter,
+    TrackState,
+    iou_matrix,
+    solve_assignment
+)
+from vision.tracking.interpolation import interpolate_track_boxes, INTERPOLATED, EXTRAPOLATED
+
+class TestIoUMatrix:
+
+    def test_identical_and_disjoint_boxes(self):
+        boxes_a = np.array([[0, 0, 10, 10], [100, 100, 110, 110]])
+        boxes_b = np.array([[0, 0, 10, 10]])
+
+        matrix = iou_matrix(boxes_a, boxes_b)
+
+        assert matrix.shape == (2, 1)
+        assert matrix[0, 0] == pytest.approx(1.0)
+        assert matrix[1, 0] == 0.0
+
+    def test_empty_inputs(self):
+        assert iou_matrix(np.zeros((0, 4)), np.array([[0, 0, 1, 1]])).shape == (0, 1)
+
+class TestAssignment:
+
+    def test_optimal_assignment_beats_greedy(self):
+        # Guloso escolheria (0, 0) e deixaria a linha 1 com custo 0.9
+        cost = np.array([[0.1, 0.2], [0.15, 0.9]])
+
+        matches, unmatched_rows, unmatched_cols = solve_assignment(cost, max_cost=1.0)
+
+        assert sorted(matches) == [(0, 1), (1, 0)]
+        assert unmatched_rows == [] and unmatched_cols == []
+
+    def test_rejects_pairs_above_max_cost(self):
+        matches, unmatched_rows, unmatched_cols = solve_assignment(np.array([[0.9]]), max_cost=0.5)
+
+        assert matches == []
+        assert unmatched_rows == [0] and unmatched_cols == [0]
+
+class TestKalmanBoxFilter:
+
+    def test_constant_velocity_prediction(self):
+        kalman = KalmanBoxFilter((0, 0, 20, 20))
+        for step in range(1, 6):
+            kalman.predict()
+            kalman.update((step * 10, 0, step * 10 + 20, 20))
+
+        predicted = kalman.predict()
+
+        assert predicted[0] == pytest.approx(60, abs=5)
+
+class TestMultiObjectTracker:
+
+    def test_track_birth_confirmation_and_death(self):
+        tracker = MultiObjectTracker({'min_hits': 2, 'max_age': 2})
+
+        update = tracker.update([[0, 0, 50, 50]], [0.9], frame_number=0)
+        assert len(update.new_tracks) == 1
+        track = update.new_tracks[0][1]
+        assert track.state == TrackState.TENTATIVE
+
+        tracker.update([[2, 0, 52, 50]], [0.9], frame_number=1)
+        assert track.state == TrackState.CONFIRMED
+
+        tracker.update([], [], frame_number=2)
+        tracker.update([], [], frame_number=3)
+        assert track.track_id in tracker.tracks
+
+        update = tracker.update([], [], frame_number=4)
+        assert [t.track_id for t in update.removed_tracks] == [track.track_id]
+        assert tracker.tracks == {}
+
+    def test_fast_motion_keeps_identity(self):
+        tracker = MultiObjectTracker({'min_hits': 1, 'iou_threshold': 0.3})
+
+        track_ids = set()
+        for frame in range(10):
+            x = frame * 30
+            update = tracker.update([[x, 100, x + 60, 160]], [0.9], frame_number=frame)
+            track_ids.update(t.track_id for _, t in update.matches + update.new_tracks)
+
+        assert track_ids == {0}
+
+    def test_low_confidence_detection_only_extends_confirmed_tracks(self):
+        tracker = MultiObjectTracker({'min_hits': 1, 'high_confidence_threshold': 0.5})
+
+        tracker.update([[0, 0, 50, 50]], [0.9], frame_number=0)
+        update = tracker.update([[1, 0, 51, 50], [300, 300, 350, 350]], [0.3, 0.3], frame_number=1)
+
+        assert [d for d, _ in update.matches] == [0]
+        assert update.new_tracks == []
+        assert update.unmatched_detections == [1]
+
+class TestTrackInterpolation:
+
+    def test_boxes_between_keyframes_are_interpolated(self):
+        boxes = interpolate_track_boxes({1: (0, 0, 10, 10)}, {1: (40, 0, 50, 10)}, 0, 4, [1, 2, 3])
+
+        assert [b.bbox for b in (boxes[1] + boxes[2] + boxes[3])] == [
+            (10, 0, 20, 10), (20, 0, 30, 10), (30, 0, 40, 10)
+        ]
+        assert all(b.method == INTERPOLATED for b in boxes[2])
+
+    def test_lost_track_is_extrapolated_up_to_limit(self):
+        boxes = interpolate_track_boxes({1: (0, 0, 10, 10)}, {}, 0, 4, [1, 2, 3],
+                                        velocities={1: (5.0, 0.0)}, max_extrapolation=2)
+
+        assert boxes[1][0].bbox == (5, 0, 15, 10)
+        assert boxes[1][0].method == EXTRAPOLATED
+        assert boxes[3] == []
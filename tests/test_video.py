@@ -0,0 +1,318 @@
+
+
+import pytest
+import numpy as np
+import cv2
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from vision.video.chunked import plan_chunks, stitch_chunk_tracks
+from vision.video.checkpoint import VideoCheckpointer
+from vision.video.sources import GeneratorSource, StreamReader
+from vision.video.scheduler import StreamScheduler
+from vision.video.result_cache import VideoResultCache, file_content_hash
+from vision.video.writer import AnnotatedVideoWriter, VideoOutputMode
+from vision.video.ffmpeg_decoder import FFmpegVideoCapture, FFMPEG_AVAILABLE
+
+class TestChunkPlanning:
+
+    def test_chunks_cover_video_with_warmup_overlap(self):
+        chunks = plan_chunks(total_frames=250, fps=10, chunk_seconds=10, overlap_seconds=1)
+
+        assert [(c.start_frame, c.end_frame) for c in chunks] == [(0, 100), (100, 200), (200, 250)]
+        assert chunks[0].warmup_start_frame == 0
+        assert chunks[1].warmup_start_frame == 90
+        assert chunks[1].tail_start_frame == 190
+
+    def test_max_frames_truncates_plan(self):
+        chunks = plan_chunks(total_frames=1000, fps=10, chunk_seconds=10, overlap_seconds=1, max_frames=150)
+
+        assert chunks[-1].end_frame == 150
+
+    def test_range_start_offsets_chunks_without_warmup_before_range(self):
+        chunks = plan_chunks(total_frames=200, fps=10, chunk_seconds=5, overlap_seconds=1, start_frame=50)
+
+        assert [(c.start_frame, c.end_frame) for c in chunks] == [(50, 100), (100, 150), (150, 200)]
+        assert chunks[0].warmup_start_frame == 50
+        assert chunks[1].warmup_start_frame == 90
+
+class TestTrackStitching:
+
+    def test_tracks_matching_in_overlap_are_joined(self):
+        boundaries = [
+            {'head': {}, 'tail': {3: {98: (10, 10, 50, 50), 99: (12, 10, 52, 50)},
+                                  4: {99: (200, 200, 240, 240)}}},
+            {'head': {0: {98: (11, 10, 51, 50), 99: (12, 10, 52, 50)}}, 'tail': {}}
+        ]
+
+        groups = stitch_chunk_tracks(boundaries, iou_threshold=0.5)
+
+        assert groups[(1, 0)] == (0, 3)
+        assert groups.get((0, 4), (0, 4)) == (0, 4)
+
+    def test_non_overlapping_tracks_stay_separate(self):
+        boundaries = [
+            {'head': {}, 'tail': {1: {99: (0, 0, 10, 10)}}},
+            {'head': {0: {99: (100, 100, 110, 110)}}, 'tail': {}}
+        ]
+
+        groups = stitch_chunk_tracks(boundaries, iou_threshold=0.5)
+
+        assert all(key == root for key, root in groups.items())
+
+class TestVideoCheckpointer:
+
+    @pytest.fixture
+    def video_file(self, tmp_path):
+        path = tmp_path / "video.mp4"
+        path.write_bytes(b"fake_video_data" * 100)
+        return path
+
+    def test_save_load_and_clear(self, tmp_path, video_file):
+        checkpointer = VideoCheckpointer(str(tmp_path / "ckpt"), str(video_file), {'frame_skip': 1})
+
+        assert checkpointer.load() is None
+
+        checkpointer.save({'next_frame': 120, 'tracks': {}})
+        state = checkpointer.load()
+        assert state['next_frame'] == 120
+        assert list((tmp_path / "ckpt").iterdir()) == [checkpointer.path]
+
+        checkpointer.clear()
+        assert checkpointer.load() is None
+
+    def test_config_change_does_not_resume(self, tmp_path, video_file):
+        VideoCheckpointer(str(tmp_path), str(video_file), {'frame_skip': 1}).save({'next_frame': 10})
+
+        assert VideoCheckpointer(str(tmp_path), str(video_file), {'frame_skip': 2}).load() is None
+
+class _Detection:
+
+    def __init__(self, bbox, confidence):
+        self.bbox = bbox
+        self.confidence = confidence
+        self.track_id = None
+
+class _SquareDetector:
+    """Detector falso: a posição do quadrado é codificada no primeiro pixel"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def detect_batch(self, images):
+        self.batch_sizes.append(len(images))
+        detections = []
+        for image in images:
+            x = int(image[0, 0])
+            detections.append([_Detection((x, 10, x + 40, 50), 0.9)])
+        return detections
+
+def _moving_square(step):
+    def frame(index):
+        image = np.zeros((64, 256), dtype=np.uint8)
+        image[0, 0] = (index * step) % 200
+        return image
+    return frame
+
+class TestStreamScheduler:
+
+    def test_streams_share_batches_and_keep_separate_tracks(self):
+        detector = _SquareDetector()
+        scheduler = StreamScheduler(detector, {'batch_size': 4, 'tracking': {'min_hits': 1}})
+        scheduler.add_stream('a', GeneratorSource(_moving_square(2), fps=10, max_frames=20))
+        scheduler.add_stream('b', GeneratorSource(_moving_square(3), fps=10, max_frames=20))
+
+        results = []
+        stats = scheduler.run(callback=results.append)
+
+        assert stats['streams']['a']['frames_processed'] == 20
+        assert stats['streams']['b']['frames_processed'] == 20
+        assert max(detector.batch_sizes) > 1
+        for stream_id in ('a', 'b'):
+            frames = [r.frame_number for r in results if r.stream_id == stream_id]
+            assert frames == sorted(frames)
+            assert {r.detections[0].track_id for r in results if r.stream_id == stream_id} == {0}
+
+    def test_target_fps_skips_frames_of_file_sources(self):
+        scheduler = StreamScheduler(_SquareDetector(), {'batch_size': 2})
+        scheduler.add_stream('slow', GeneratorSource(_moving_square(1), fps=30, max_frames=30), target_fps=10)
+
+        stats = scheduler.run()
+
+        assert stats['streams']['slow']['frames_processed'] == 10
+        assert stats['streams']['slow']['frames_skipped'] == 20
+
+class TestLatestFrameMode:
+
+    def test_slow_consumer_processes_newest_frame_and_drops_stale_ones(self):
+        reader = StreamReader('cam', GeneratorSource(_moving_square(1), fps=200, realtime=True, max_frames=60),
+                              latest_only=True)
+        reader.start()
+
+        processed = []
+        while not reader.finished:
+            item = reader.get()
+            if item is None:
+                time.sleep(0.001)
+                continue
+            time.sleep(0.02)  # inferência mais lenta que a câmera
+            processed.append(item.frame_number)
+        reader.stop()
+
+        stats = reader.get_stats()
+        assert stats['frames_dropped'] > 0
+        assert stats['frames_read'] == len(processed) + stats['frames_dropped']
+        assert processed == sorted(processed)
+        assert processed[-1] >= 55
+
+class TestVideoResultCache:
+
+    @pytest.fixture
+    def output_file(self, tmp_path):
+        path = tmp_path / "annotated.mp4"
+        path.write_bytes(b"annotated" * 100)
+        return path
+
+    def test_hit_requires_same_content_and_config(self, tmp_path, output_file):
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake_video_data" * 100)
+        cache = VideoResultCache(str(tmp_path / "cache"))
+        key = VideoResultCache.make_key(file_content_hash(str(video)), {'frame_skip': 1})
+
+        assert cache.get(key) is None
+        cache.put(key, {'detection_summary': {'total_potholes': 3}}, {'annotated_video': str(output_file)})
+
+        entry = cache.get(key)
+        assert entry['report']['detection_summary']['total_potholes'] == 3
+        assert Path(entry['files']['annotated_video']).read_bytes() == output_file.read_bytes()
+        assert cache.get(VideoResultCache.make_key(file_content_hash(str(video)), {'frame_skip': 2})) is None
+        assert cache.get_stats()['hits'] == 1
+
+    def test_key_changes_when_model_file_is_replaced(self, tmp_path):
+        model = tmp_path / "pothole_yolo.pt"
+        model.write_bytes(b"weights_v1")
+        key = VideoResultCache.make_key('abc', {'frame_skip': 1}, model_path=str(model))
+
+        assert VideoResultCache.make_key('abc', {'frame_skip': 1}, model_path=str(model)) == key
+        model.write_bytes(b"weights_v2_retrained")
+        assert VideoResultCache.make_key('abc', {'frame_skip': 1}, model_path=str(model)) != key
+
+    def test_evicts_expired_and_least_recently_used_entries(self, tmp_path, output_file):
+        cache = VideoResultCache(str(tmp_path / "cache"), max_size_bytes=2500)
+        cache.put('a', {}, {'annotated_video': str(output_file)})
+        time.sleep(0.01)
+        cache.put('b', {}, {'annotated_video': str(output_file)})
+        cache.get('a')
+        cache.put('c', {}, {'annotated_video': str(output_file)})
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+
+        cache.max_age_seconds = 1e-6
+        time.sleep(0.01)
+        assert cache.evict() and cache.get_stats()['entries'] == 0
+
+def _write_gray_video(path, frame_count=20, fps=10.0, size=(64, 48)):
+    """Vídeo sintético em que o frame i tem intensidade uniforme 10 * i"""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    for index in range(frame_count):
+        writer.write(np.full((size[1], size[0], 3), 10 * index, dtype=np.uint8))
+    writer.release()
+    return path
+
+@pytest.mark.skipif(not FFMPEG_AVAILABLE, reason="ffmpeg/ffprobe não instalados")
+class TestFFmpegVideoCapture:
+
+    @pytest.fixture
+    def video_path(self, tmp_path):
+        return str(_write_gray_video(tmp_path / "gray.mp4"))
+
+    def test_ring_buffers_are_reused(self, video_path):
+        cap = FFmpegVideoCapture(video_path, buffer_count=2)
+        frames = [cap.read()[1] for _ in range(3)]
+        cap.release()
+
+        assert frames[2] is frames[0]
+        assert frames[1] is not frames[0]
+        assert abs(float(frames[1].mean()) - 10) < 6
+
+    def test_seek_restarts_at_requested_frame(self, video_path):
+        cap = FFmpegVideoCapture(video_path)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 10)
+        ok, frame = cap.read()
+        cap.release()
+
+        assert ok
+        assert abs(float(frame.mean()) - 100) < 6
+        assert cap.get(cv2.CAP_PROP_POS_FRAMES) == 11
+
+    def test_scale_and_output_fps_are_applied_by_ffmpeg(self, video_path):
+        cap = FFmpegVideoCapture(video_path, scale=0.5, output_fps=5.0)
+        frames = []
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frames.append(frame.copy())
+        cap.release()
+
+        assert (cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) == (32, 24)
+        assert frames[0].shape == (24, 32, 3)
+        assert cap.get(cv2.CAP_PROP_FPS) == 5.0
+        assert cap.get(cv2.CAP_PROP_FRAME_COUNT) == 10
+        assert abs(len(frames) - 10) <= 1
+
+class TestAnnotatedVideoWriter:
+
+    @staticmethod
+    def _read_means(path):
+        cap = cv2.VideoCapture(path)
+        means = []
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            means.append(float(frame.mean()))
+        cap.release()
+        return means
+
+    def test_events_mode_writes_clips_with_pre_and_post_roll(self, tmp_path):
+        writer = AnnotatedVideoWriter(str(tmp_path / "out.avi"), 10.0, (32, 32), None,
+                                      mode=VideoOutputMode.EVENTS, pre_event_frames=3,
+                                      post_event_frames=2, fourcc='MJPG')
+        events = {10, 11, 12, 25}
+        writer.start()
+        for index in range(30):
+            writer.write(index, np.full((32, 32, 3), 8 * index, dtype=np.uint8), has_event=index in events)
+        summary = writer.close()
+
+        clips = summary['clips']
+        assert [(c['start_frame'], c['end_frame']) for c in clips] == [(7, 14), (22, 27)]
+        assert summary['frames_written'] == 14
+
+        for clip, first in zip(clips, (7, 22)):
+            means = self._read_means(clip['path'])
+            expected = range(first, clip['end_frame'] + 1)
+            assert len(means) == len(expected)
+            assert means == pytest.approx([8 * index for index in expected], abs=3)
+
+    def test_event_pre_roll_survives_reused_input_buffer(self, tmp_path):
+        annotated = []
+
+        def annotate(frame, payload):
+            annotated.append(int(frame[0, 0, 0]))
+            return frame
+
+        writer = AnnotatedVideoWriter(str(tmp_path / "out.mp4"), 10.0, (16, 16), annotate,
+                                      mode=VideoOutputMode.EVENTS, pre_event_frames=2)
+        buffer = np.zeros((16, 16, 3), dtype=np.uint8)
+        for index in range(5):
+            buffer[:] = index
+            writer._handle_event_frame(index, buffer, None, has_event=index == 4)
+        summary = writer.close()
+
+        assert annotated == [2, 3, 4]
+        assert summary['clips'][0]['start_frame'] == 2
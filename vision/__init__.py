@@ -12,6 +12,7 @@ from .detection.signal_plate_detector import SignalPlateDetector, SignalPlateDet
 from .detection.pothole_detector import PotholeDetector, PotholeDetection
 from .detection.specialized_detector import SpecializedDetector, UnifiedDetectionResult
 from .ocr.text_extractor import TextExtractor
+from .tracking.tracker import MultiObjectTracker
 
 try:
     from config.vision_architecture import (
@@ -49,6 +50,7 @@ __all__ = [
     'SpecializedDetector',
     'UnifiedDetectionResult',
     'TextExtractor',
+    'MultiObjectTracker',
     
     'VisionArchitectureConfig',
     'ModelConfig',
@@ -81,7 +83,8 @@ def get_components():
             'PotholeDetector',
             'SpecializedDetector'
         ],
-        'ocr': ['TextExtractor']
+        'ocr': ['TextExtractor'],
+        'tracking': ['MultiObjectTracker']
     }
 
 def create_pipeline(config=None):
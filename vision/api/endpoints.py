@@ -4,6 +4,7 @@ import os
 import time
 import uuid
 import base64
+import hashlib
 import logging
 from typing import Dict, Any, Optional
 from pathlib import Path
@@ -16,7 +17,8 @@ from pydantic import BaseModel
 from .auth import get_current_user
 from .models import ImageRequest, ProcessResponse, User
 from ..core.vision_pipeline import VisionPipeline
-from ..detection.pothole_detector import PotholeDetector
+from ..detection.pothole_detector import PotholeDetector, InvalidRangeError
+from ..video.result_cache import VideoResultCache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -25,6 +27,10 @@ logger = logging.getLogger(__name__)
 UPLOAD_DIR = Path("uploads")
 VIDEO_RESULTS_DIR = Path("video_analysis_results")
 MAX_VIDEO_SIZE = 500 * 1024 * 1024  # 500MB
+VIDEO_CACHE_DIR = VIDEO_RESULTS_DIR / "cache"
+VIDEO_CACHE_MAX_SIZE = 5 * 1024 * 1024 * 1024  # 5GB
+VIDEO_CACHE_MAX_AGE = 7 * 24 * 3600  # 7 dias
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
 # Criar diretórios se não existirem
 UPLOAD_DIR.mkdir(exist_ok=True)
@@ -33,6 +39,26 @@ VIDEO_RESULTS_DIR.mkdir(exist_ok=True)
 # Pipeline de visão
 vision_pipeline = None
 
+# Cache de resultados de vídeo (hash do conteúdo + configuração)
+video_result_cache = VideoResultCache(str(VIDEO_CACHE_DIR), VIDEO_CACHE_MAX_SIZE, VIDEO_CACHE_MAX_AGE)
+
+def _video_response_data(video_id: str, processing_time: float, video_report: Dict[str, Any],
+                         output_files: Dict[str, Any], cached: bool = False) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "video_id": video_id,
+        "processing_time": processing_time,
+        "cached": cached,
+        "video_info": video_report.get('video_info', {}),
+        "detection_summary": video_report.get('detection_summary', {}),
+        "quality_analysis": video_report.get('quality_analysis', {}),
+        "road_condition_analysis": video_report.get('road_condition_analysis', {}),
+        "maintenance_analysis": video_report.get('maintenance_analysis', {}),
+        "tracking_analysis": video_report.get('tracking_analysis', {}),
+        "recommendations": video_report.get('recommendations', []),
+        "output_files": output_files
+    }
+
 def get_vision_pipeline():
     global vision_pipeline
     if vision_pipeline is None:
@@ -153,9 +179,16 @@ async def process_image(
 @router.post("/process_video")
 async def process_video(
     video_file: UploadFile = File(...),
+    start: Optional[float] = Form(None),
+    end: Optional[float] = Form(None),
+    keyframes_only: bool = Form(False),
     current_user: User = Depends(get_current_user)
 ) -> ProcessResponse:
-    """Processa um vídeo usando o PotholeDetector para análise de buracos"""
+    """Processa um vídeo usando o PotholeDetector para análise de buracos
+    
+    start/end (segundos) restringem a análise a um trecho do vídeo e
+    keyframes_only faz uma passada rápida apenas nos quadros-chave.
+    """
     
     try:
         start_time = time.time()
@@ -164,6 +197,12 @@ async def process_video(
         if not video_file.content_type.startswith('video/'):
             raise HTTPException(status_code=400, detail="Arquivo deve ser um vídeo")
         
+        # Verificar trecho solicitado (a duração do vídeo é verificada no processamento)
+        if (start is not None and start < 0) or (end is not None and end <= 0):
+            raise HTTPException(status_code=400, detail="start e end devem ser tempos positivos em segundos")
+        if start is not None and end is not None and start >= end:
+            raise HTTPException(status_code=400, detail="start deve ser menor que end")
+        
         # Verificar tamanho do arquivo
         if video_file.size and video_file.size > MAX_VIDEO_SIZE:
             raise HTTPException(
@@ -174,16 +213,21 @@ async def process_video(
         # Gerar ID único para o vídeo
         video_id = str(uuid.uuid4())
         
-        # Salvar vídeo temporariamente
+        # Salvar vídeo temporariamente, calculando o hash do conteúdo em blocos
         video_path = UPLOAD_DIR / f"{video_id}_{video_file.filename}"
+        content_hash = hashlib.sha256()
         with open(video_path, "wb") as f:
-            content = await video_file.read()
-            f.write(content)
+            while True:
+                chunk = await video_file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                content_hash.update(chunk)
+                f.write(chunk)
         
         logger.info(f"Vídeo salvo temporariamente: {video_path}")
         
         try:
-            # Inicializar PotholeDetector
+            # Configuração do PotholeDetector
             config = {
                 'model_path': 'models/pothole_yolo.pt',
                 'confidence_threshold': 0.5,
@@ -193,15 +237,50 @@ async def process_video(
                     'min_track_length': 3,
                     'tracking_threshold': 0.7,
                     'max_tracks': 50,
+                    'max_track_age': 30,
+                    'track_history_size': 30,
                     'enable_frame_quality_assessment': True,
                     'enable_temporal_analysis': True,
                     'enable_stability_scoring': True,
                     'output_annotated_video': True,
+                    'output_mode': 'full',
+                    'event_clip_padding': 1.0,
+                    'processing_mode': 'sequential',
+                    'chunk_seconds': 60.0,
+                    'chunk_overlap_seconds': 1.0,
+                    'enable_checkpoints': True,
+                    'checkpoint_dir': str(VIDEO_RESULTS_DIR),
+                    'checkpoint_interval': 60.0,
                     'save_frame_analyses': True,
                     'generate_tracking_report': True
                 }
             }
             
+            # Upload repetido com a mesma configuração e trecho: devolver o resultado em cache
+            cache_key = VideoResultCache.make_key(
+                content_hash.hexdigest(),
+                {'detector': config, 'start': start, 'end': end, 'keyframes_only': keyframes_only},
+                model_path=config['model_path']
+            )
+            cached_entry = video_result_cache.get(cache_key)
+            if cached_entry:
+                logger.info(f"Resultado de vídeo encontrado no cache: {cache_key}")
+                cached_files = cached_entry['files']
+                response_data = _video_response_data(
+                    video_id, time.time() - start_time, cached_entry['report'],
+                    {
+                        "annotated_video": cached_files.get('annotated_video'),
+                        "analysis_report": cached_files.get('analysis_report'),
+                        "video_output": cached_entry['report'].get('video_output', {})
+                    },
+                    cached=True
+                )
+                return ProcessResponse(
+                    result=response_data,
+                    timestamp=datetime.now().isoformat(),
+                    api_version="1.0.0"
+                )
+            
             detector = PotholeDetector(config)
             
             # Configurar caminho de saída
@@ -214,35 +293,44 @@ async def process_video(
             
             video_report = detector.process_video(
                 video_path=str(video_path),
-                output_path=str(output_video_path)
+                output_path=str(output_video_path),
+                start=start,
+                end=end,
+                keyframes_only=keyframes_only
             )
             
             # Calcular tempo de processamento
             processing_time = time.time() - start_time
             
             # Preparar resposta
-            response_data = {
-                "success": True,
-                "video_id": video_id,
-                "processing_time": processing_time,
-                "video_info": video_report.get('video_info', {}),
-                "detection_summary": video_report.get('detection_summary', {}),
-                "quality_analysis": video_report.get('quality_analysis', {}),
-                "road_condition_analysis": video_report.get('road_condition_analysis', {}),
-                "maintenance_analysis": video_report.get('maintenance_analysis', {}),
-                "tracking_analysis": video_report.get('tracking_analysis', {}),
-                "recommendations": video_report.get('recommendations', []),
-                "output_files": {
+            response_data = _video_response_data(
+                video_id, processing_time, video_report,
+                {
                     "annotated_video": str(output_video_path),
-                    "analysis_report": str(report_path)
+                    "analysis_report": str(report_path),
+                    "video_output": video_report.get('video_output', {})
                 }
-            }
+            )
             
             # Salvar relatório JSON
             import json
             with open(report_path, 'w', encoding='utf-8') as f:
                 json.dump(video_report, f, indent=2, ensure_ascii=False, default=str)
             
+            # Guardar no cache para uploads repetidos; uma análise retomada de checkpoint
+            # ou com erro na escrita tem o vídeo anotado incompleto e não é guardada
+            resumed = 'resumed_from_frame' in video_report.get('video_info', {})
+            if resumed or 'error' in video_report.get('video_output', {}):
+                logger.info(f"Resultado não armazenado no cache (vídeo anotado incompleto): {video_id}")
+            else:
+                try:
+                    video_result_cache.put(cache_key, video_report, {
+                        'annotated_video': str(output_video_path),
+                        'analysis_report': str(report_path)
+                    })
+                except Exception as e:
+                    logger.warning(f"Não foi possível salvar o resultado no cache: {e}")
+            
             logger.info(f"Análise de vídeo concluída: {video_id}")
             logger.info(f"Vídeo anotado: {output_video_path}")
             logger.info(f"Relatório: {report_path}")
@@ -263,6 +351,10 @@ async def process_video(
                 video_path.unlink()
                 logger.info(f"Arquivo temporário removido: {video_path}")
         
+    except HTTPException:
+        raise
+    except InvalidRangeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Erro ao processar vídeo: {e}")
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
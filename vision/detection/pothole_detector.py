@@ -2,14 +2,24 @@
 
 import cv2
 import numpy as np
-from typing import Dict, List, Any, Optional, Tuple, Union
+from typing import Dict, List, Any, Optional, Tuple, Union, Deque
 import logging
 from pathlib import Path
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from collections import defaultdict, deque
 import json
 
+from ..tracking.tracker import MultiObjectTracker, TrackingUpdate
+from ..tracking.interpolation import interpolate_track_boxes
+from ..video.writer import AnnotatedVideoWriter, VideoOutputMode
+from ..video.chunked import VideoChunk, plan_chunks, run_video_chunks, stitch_chunk_tracks
+from ..video.checkpoint import VideoCheckpointer
+from ..video.sources import FrameSource, VideoCaptureSource, StreamReader, StrideCapture, LatencyStats, is_live_uri
+from ..video.ffmpeg_decoder import FFmpegVideoCapture, FFMPEG_AVAILABLE
+from ..geo.gps import GPSTrack, find_sidecar
+from ..geo.spatial_index import PotholeSpatialIndex
+
 try:
     from ultralytics import YOLO
     YOLO_AVAILABLE = True
@@ -17,6 +27,9 @@ except ImportError:
     YOLO_AVAILABLE = False
     YOLO = None
 
+class InvalidRangeError(ValueError):
+    """Trecho start/end vazio ou fora da duração do vídeo"""
+
 @dataclass
 class PotholeDetection:
     bbox: Tuple[int, int, int, int]
@@ -27,6 +40,8 @@ class PotholeDetection:
     depth_estimate: Optional[float] = None
     area_estimate: Optional[float] = None
     risk_score: Optional[float] = None
+    track_id: Optional[int] = None
+    interpolation: Optional[str] = None  # 'interpolated'/'extrapolated' em frames sem inferência
 
 @dataclass
 class VideoPotholeAnalysis:
@@ -37,17 +52,144 @@ class VideoPotholeAnalysis:
     road_condition: str
     maintenance_priority: str
 
+@dataclass
+class VideoAnalysisAggregates:
+    processed_frames: int = 0
+    total_detections: int = 0
+    frames_with_detections: int = 0
+    frame_quality_sum: float = 0.0
+    quality_distribution: Dict[str, int] = field(default_factory=lambda: {
+        'excellent': 0, 'good': 0, 'fair': 0, 'poor': 0
+    })
+    road_condition_counts: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    priority_counts: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    interpolated_frames: int = 0
+    interpolated_boxes: int = 0
+    quality_gated_frames: int = 0
+    
+    def add(self, analysis: VideoPotholeAnalysis):
+        """Acumula a análise de um frame sem guardar o histórico de frames"""
+        self.processed_frames += 1
+        self.total_detections += len(analysis.detections)
+        if analysis.detections:
+            self.frames_with_detections += 1
+        
+        quality = analysis.frame_quality
+        self.frame_quality_sum += quality
+        if quality >= 0.8:
+            self.quality_distribution['excellent'] += 1
+        elif quality >= 0.6:
+            self.quality_distribution['good'] += 1
+        elif quality >= 0.4:
+            self.quality_distribution['fair'] += 1
+        else:
+            self.quality_distribution['poor'] += 1
+        
+        self.road_condition_counts[analysis.road_condition] += 1
+        self.priority_counts[analysis.maintenance_priority] += 1
+    
+    def merge(self, other: 'VideoAnalysisAggregates'):
+        """Combina os agregados de outro bloco de vídeo"""
+        self.processed_frames += other.processed_frames
+        self.total_detections += other.total_detections
+        self.frames_with_detections += other.frames_with_detections
+        self.frame_quality_sum += other.frame_quality_sum
+        for key, count in other.quality_distribution.items():
+            self.quality_distribution[key] = self.quality_distribution.get(key, 0) + count
+        for key, count in other.road_condition_counts.items():
+            self.road_condition_counts[key] += count
+        for key, count in other.priority_counts.items():
+            self.priority_counts[key] += count
+        self.interpolated_frames += other.interpolated_frames
+        self.interpolated_boxes += other.interpolated_boxes
+        self.quality_gated_frames += other.quality_gated_frames
+    
+    @property
+    def average_frame_quality(self) -> float:
+        return self.frame_quality_sum / self.processed_frames if self.processed_frames else 0.0
+
+SEVERITY_SCORES = {'low': 1, 'medium': 2, 'high': 3, 'critical': 4}
+
 @dataclass
 class PotholeTrack:
     track_id: int
     first_frame: int
     last_frame: int
-    detections: List[PotholeDetection]
+    detections: Deque[PotholeDetection]
     average_confidence: float
     average_risk_score: float
     severity_level: str
     total_frames: int
     stability_score: float
+    best_detection: Optional[PotholeDetection] = None
+    confidence_sum: float = 0.0
+    risk_score_sum: float = 0.0
+    risk_score_count: int = 0
+    severity_score_sum: int = 0
+    severity_counts: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    representative: Optional[PotholeDetection] = None
+    representative_frame: Optional[int] = None
+    representative_score: float = 0.0
+    representative_analyses: int = 0
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    geo_pothole_id: Optional[int] = None
+    
+    def add_detection(self, detection: PotholeDetection, frame_number: int):
+        """Atualiza as estatísticas do track em O(1) com uma nova detecção"""
+        self.detections.append(detection)
+        self.last_frame = frame_number
+        self.total_frames += 1
+        
+        self.confidence_sum += detection.confidence
+        self.average_confidence = self.confidence_sum / self.total_frames
+        
+        if detection.risk_score:
+            self.risk_score_sum += detection.risk_score
+            self.risk_score_count += 1
+            self.average_risk_score = self.risk_score_sum / self.risk_score_count
+        
+        if detection.severity_level:
+            self.severity_counts[detection.severity_level] += 1
+            self.severity_score_sum += SEVERITY_SCORES.get(detection.severity_level, 1)
+        
+        if self.best_detection is None or detection.confidence > self.best_detection.confidence:
+            self.best_detection = detection
+    
+    def merge(self, other: 'PotholeTrack'):
+        """Incorpora um trecho posterior do mesmo buraco (costura entre blocos)"""
+        self.first_frame = min(self.first_frame, other.first_frame)
+        self.last_frame = max(self.last_frame, other.last_frame)
+        self.total_frames += other.total_frames
+        self.detections.extend(other.detections)
+        
+        self.confidence_sum += other.confidence_sum
+        self.average_confidence = self.confidence_sum / self.total_frames if self.total_frames else 0.0
+        
+        self.risk_score_sum += other.risk_score_sum
+        self.risk_score_count += other.risk_score_count
+        if self.risk_score_count:
+            self.average_risk_score = self.risk_score_sum / self.risk_score_count
+        
+        self.severity_score_sum += other.severity_score_sum
+        for level, count in other.severity_counts.items():
+            self.severity_counts[level] += count
+        
+        if other.best_detection is not None and (
+                self.best_detection is None or other.best_detection.confidence > self.best_detection.confidence):
+            self.best_detection = other.best_detection
+        
+        if other.representative is not None and (
+                self.representative is None or other.representative_score > self.representative_score):
+            self.representative = other.representative
+            self.representative_frame = other.representative_frame
+            self.representative_score = other.representative_score
+        self.representative_analyses += other.representative_analyses
+    
+    @property
+    def average_severity_score(self) -> float:
+        severity_total = sum(self.severity_counts.values())
+        return self.severity_score_sum / severity_total if severity_total else 0.0
 
 class PotholeDetector:
     
@@ -57,6 +199,9 @@ class PotholeDetector:
         self.model = None
         self.device = "auto"
         self.confidence_threshold = config.get('confidence_threshold', 0.5)
+        # Em vídeo, caixas entre low_confidence_threshold e confidence_threshold só estendem tracks
+        # já confirmados (segunda associação do rastreador) e não criam detecções novas
+        self.low_confidence_threshold = min(config.get('low_confidence_threshold', 0.1), self.confidence_threshold)
         self.iou_threshold = config.get('iou_threshold', 0.45)
         self.model_path = config.get('model_path', 'models/pothole_yolo.pt')
         
@@ -66,10 +211,71 @@ class PotholeDetector:
         self.min_track_length = self.video_config.get('min_track_length', 3)
         self.tracking_threshold = self.video_config.get('tracking_threshold', 0.7)
         self.max_tracks = self.video_config.get('max_tracks', 50)
+        self.max_track_age = self.video_config.get('max_track_age', 30)
+        self.track_history_size = self.video_config.get('track_history_size', 30)
+        self.output_mode = self.video_config.get('output_mode', VideoOutputMode.FULL)
+        self.event_clip_padding = self.video_config.get('event_clip_padding', 1.0)
+        self.writer_queue_size = self.video_config.get('writer_queue_size', 32)
+        self.max_processed_frames = self.video_config.get('max_processed_frames', 1000)
+        
+        # Caixas interpoladas/extrapoladas pelo tracking nos frames pulados (frame_skip)
+        self.interpolate_skipped_frames = self.video_config.get('interpolate_skipped_frames', True)
+        self.max_extrapolation_frames = self.video_config.get('max_extrapolation_frames', self.frame_skip)
+        
+        # Análise pesada (profundidade/severidade/risco) por detecção ou uma vez por track
+        self.analysis_mode = self.video_config.get('analysis_mode', 'per_detection')
+        self.representative_refresh_frames = self.video_config.get('representative_refresh_frames', 0)
+        # Ganho relativo mínimo de pontuação para reanalisar o representante (evita reanálise a cada frame)
+        self.representative_min_gain = self.video_config.get('representative_min_gain', 0.25)
+        
+        # Backend de decodificação ('opencv' ou 'ffmpeg', com escala/fps aplicados no decodificador)
+        self.video_backend = self.video_config.get('video_backend', 'opencv')
+        self.decode_scale = self.video_config.get('decode_scale')
+        self.decode_width = self.video_config.get('decode_width')
+        self.decode_fps = self.video_config.get('decode_fps')
+        self.ffmpeg_hwaccel = self.video_config.get('ffmpeg_hwaccel')
+        # Intervalo de amostragem do modo keyframes_only quando o ffmpeg não está disponível
+        self.survey_interval = self.video_config.get('survey_interval', 2.0)
+        
+        # Estimador de qualidade do frame ('legacy' ou 'fast') e descarte de frames borrados
+        self.quality_estimator = self.video_config.get('quality_estimator', 'legacy')
+        self.quality_laplacian_scale = self.video_config.get('quality_laplacian_scale', 400.0)
+        self.quality_calibration = self.video_config.get('quality_calibration', False)
+        self.min_frame_quality = self.video_config.get('min_frame_quality', 0.0)
+        self._quality_pairs = deque(maxlen=self.video_config.get('quality_calibration_samples', 1000))
+        
+        # Georreferenciamento por trilha GPS (GPX/CSV) e deduplicação entre vídeos/passagens
+        self.gps_time_offset = self.video_config.get('gps_time_offset', 0.0)
+        self.gps_max_gap = self.video_config.get('gps_max_gap', 5.0)
+        self.spatial_index_path = self.video_config.get('spatial_index_path')
+        self.geo_merge_radius = self.video_config.get('geo_merge_radius', 5.0)
+        
+        # Processamento paralelo em blocos
+        self.processing_mode = self.video_config.get('processing_mode', 'sequential')
+        self.chunk_seconds = self.video_config.get('chunk_seconds', 60.0)
+        self.chunk_overlap_seconds = self.video_config.get('chunk_overlap_seconds', 1.0)
+        self.parallel_workers = self.video_config.get('parallel_workers')
+        self.parallel_start_method = self.video_config.get('parallel_start_method', 'spawn')
+        self._chunk_boundary = None
+        
+        # Checkpoints para retomar análises longas
+        self.enable_checkpoints = self.video_config.get('enable_checkpoints', False)
+        self.checkpoint_dir = self.video_config.get('checkpoint_dir', 'video_analysis_results')
+        self.checkpoint_interval = self.video_config.get('checkpoint_interval', 60.0)
+        
+        # Modo tempo real: o frame mais recente vence (fontes ao vivo)
+        self.realtime_mode = self.video_config.get('realtime_mode', False)
+        self.live_poll_interval = self.video_config.get('live_poll_interval', 0.005)
         
         # Sistema de tracking
         self.tracks = {}
-        self.next_track_id = 0
+        self.tracker = MultiObjectTracker({
+            'iou_threshold': self.tracking_threshold,
+            'high_confidence_threshold': self.confidence_threshold,
+            'min_hits': self.min_track_length,
+            'max_age': self.max_track_age,
+            'max_tracks': self.max_tracks
+        })
         self.frame_history = deque(maxlen=30)
         
         self.pothole_types = [
@@ -115,28 +321,33 @@ class PotholeDetector:
         except:
             return "cpu"
     
-    def detect(self, image: np.ndarray) -> List[PotholeDetection]:
+    def detect(self, image: np.ndarray, analyze: bool = True,
+               low_confidence: bool = False) -> List[PotholeDetection]:
+        return self.detect_batch([image], analyze=analyze, low_confidence=low_confidence)[0]
+    
+    def detect_batch(self, images: List[np.ndarray], analyze: bool = True,
+                     low_confidence: bool = False) -> List[List[PotholeDetection]]:
+        """Detecta buracos; com low_confidence, inclui caixas a partir de low_confidence_threshold (para o rastreador)"""
         if self.model is None:
-            return []
+            return [[] for _ in images]
         
         try:
             start_time = time.time()
             
             results = self.model(
-                image,
-                conf=self.confidence_threshold,
+                images,
+                conf=self.low_confidence_threshold if low_confidence else self.confidence_threshold,
                 iou=self.iou_threshold,
                 verbose=False
             )
             
-            detections = []
+            batch_detections = []
             
-            for result in results:
+            for image, result in zip(images, results):
+                detections = []
                 boxes = result.boxes
-                if boxes is None:
-                    continue
                 
-                for box in boxes:
+                for box in boxes if boxes is not None else []:
                     bbox = box.xyxy[0].cpu().numpy()
                     confidence = float(box.conf[0])
                     class_id = int(box.cls[0])
@@ -148,30 +359,447 @@ class PotholeDetector:
                         class_name=class_name
                     )
                     
-                    detection = self._analyze_pothole(detection, image)
+                    detection.pothole_type = detection.class_name
                     detections.append(detection)
+                
+                if analyze:
+                    self._analyze_potholes(detections, image)
+                
+                batch_detections.append(detections)
             
             processing_time = time.time() - start_time
-            self.logger.info(f"Detectados {len(detections)} buracos em {processing_time:.3f}s")
+            total_detections = sum(len(detections) for detections in batch_detections)
+            self.logger.info(f"Detectados {total_detections} buracos em {processing_time:.3f}s ({len(images)} imagens)")
             
-            return detections
+            return batch_detections
             
         except Exception as e:
             self.logger.error(f"Erro na detecção: {e}")
-            return []
+            return [[] for _ in images]
+    
+    def process_video(self, video_path: str, output_path: Optional[str] = None,
+                      start: Optional[float] = None, end: Optional[float] = None,
+                      keyframes_only: bool = False, gps_path: Optional[str] = None) -> Dict[str, Any]:
+        """Processa um vídeo para análise de buracos
+        
+        start/end (segundos) limitam a análise a um trecho, buscando diretamente
+        o início do trecho; keyframes_only decodifica apenas quadros-chave
+        (passada rápida de levantamento). gps_path aponta a trilha GPS
+        (GPX/CSV); sem ele, é usado um arquivo .gpx/.csv com o nome do vídeo.
+        """
+        
+        if self.realtime_mode or is_live_uri(video_path):
+            if start is not None or end is not None or keyframes_only or gps_path:
+                raise ValueError("start, end, keyframes_only e gps_path não são suportados em fontes ao vivo")
+            return self.process_live(video_path, output_path)
+        
+        if self.processing_mode == 'parallel':
+            if keyframes_only:
+                self.logger.warning("keyframes_only não é suportado no modo paralelo, processando sequencialmente")
+            else:
+                if output_path:
+                    self.logger.warning("Modo paralelo não gera vídeo anotado, apenas o relatório")
+                return self.process_video_parallel(video_path, start=start, end=end, gps_path=gps_path)
+        
+        # Frames retidos pela fila do escritor e pela interpolação (buffers do decodificador);
+        # o pré-evento do modo de clipes guarda cópias e não conta aqui
+        retained_frames = self.writer_queue_size + 2 * self.frame_skip + 4 if output_path else 0
+        cap, fps, total_frames, width, height, duration = self._open_video(video_path, retained_frames, keyframes_only)
+        
+        # Preparar vídeo de saída se especificado (escrita em thread dedicada); a captura
+        # (processo ffmpeg, no backend ffmpeg) é liberada se o trecho ou a saída falharem
+        output_video = None
+        video_output = {'mode': VideoOutputMode.NONE}
+        try:
+            range_start, range_end = self._frame_range(fps, total_frames, start, end)
+            
+            if output_path and self.output_mode != VideoOutputMode.NONE:
+                written_every = 1 if self.interpolate_skipped_frames else self.frame_skip
+                padding_frames = int(round(self.event_clip_padding * fps / written_every))
+                output_video = AnnotatedVideoWriter(
+                    output_path, fps, (width, height), self._annotate_frame,
+                    mode=self.output_mode,
+                    queue_size=self.writer_queue_size,
+                    pre_event_frames=padding_frames,
+                    post_event_frames=padding_frames
+                )
+                output_video.start()
+        except Exception:
+            cap.release()
+            raise
+        
+        # Análise do vídeo (retomando do último checkpoint, se houver)
+        aggregates = VideoAnalysisAggregates()
+        start_frame = range_start
+        checkpointer = None
+        if self.enable_checkpoints:
+            checkpoint_config = self.config
+            if range_start or range_end < total_frames or keyframes_only:
+                checkpoint_config = dict(self.config, analysis_range=[range_start, range_end, keyframes_only])
+            checkpointer = VideoCheckpointer(self.checkpoint_dir, video_path, checkpoint_config, self.checkpoint_interval)
+            state = checkpointer.load()
+            if state:
+                aggregates = state['aggregates']
+                start_frame = self._restore_checkpoint_state(state)
+                if output_video:
+                    self.logger.warning(f"Vídeo anotado conterá apenas os frames a partir de {start_frame}")
+        
+        start_time = time.time()
+        
+        try:
+            self._process_frames(cap, fps, total_frames, aggregates, output_video=output_video,
+                                 start_frame=start_frame, end_frame=range_end, checkpointer=checkpointer,
+                                 keyframes_only=keyframes_only)
+        finally:
+            cap.release()
+            if output_video:
+                video_output = output_video.close()
+        
+        if checkpointer:
+            checkpointer.clear()
+        
+        # Finalizar análise
+        processing_time = time.time() - start_time
+        self.logger.info(f"Processamento concluído em {processing_time:.2f}s")
+        
+        # Gerar relatório final
+        geo_analysis = self._geolocate_tracks(video_path, fps, gps_path)
+        final_report = self._generate_video_report(aggregates, fps, total_frames, duration, video_path)
+        final_report['video_output'] = video_output
+        if geo_analysis:
+            final_report['geo_analysis'] = geo_analysis
+        if start_frame != range_start:
+            final_report['video_info']['resumed_from_frame'] = start_frame
+        if range_start or range_end < total_frames or keyframes_only:
+            final_report['video_info']['analyzed_range'] = self._range_info(fps, range_start, range_end, keyframes_only)
+        
+        return final_report
+    
+    def _frame_range(self, fps: float, total_frames: int, start: Optional[float],
+                     end: Optional[float]) -> Tuple[int, int]:
+        """Converte o trecho start/end (segundos) em [frame_inicial, frame_final)"""
+        start_frame = max(int(round((start or 0.0) * fps)), 0)
+        end_frame = total_frames if end is None else min(int(round(end * fps)), total_frames)
+        
+        if start_frame >= total_frames or start_frame >= end_frame:
+            raise InvalidRangeError(f"Trecho inválido: start={start}, end={end} (duração {total_frames / fps:.2f}s)")
+        
+        return start_frame, end_frame
+    
+    @staticmethod
+    def _range_info(fps: float, start_frame: int, end_frame: int, keyframes_only: bool = False) -> Dict[str, Any]:
+        return {
+            'start': start_frame / fps,
+            'end': end_frame / fps,
+            'start_frame': start_frame,
+            'end_frame': end_frame,
+            'keyframes_only': keyframes_only
+        }
+    
+    def _checkpoint_state(self, next_frame: int, aggregates: VideoAnalysisAggregates) -> Dict[str, Any]:
+        """Estado necessário para retomar a análise a partir de next_frame"""
+        return {
+            'next_frame': next_frame,
+            'aggregates': aggregates,
+            'tracks': self.tracks,
+            'tracker': self.tracker.get_state()
+        }
+    
+    def _restore_checkpoint_state(self, state: Dict[str, Any]) -> int:
+        """Restaura tracks e rastreador de um checkpoint e retorna o próximo frame"""
+        self.tracks = state['tracks']
+        self.tracker.set_state(state['tracker'])
+        return state['next_frame']
+    
+    def process_video_parallel(self, video_path: str, num_workers: Optional[int] = None,
+                               start: Optional[float] = None, end: Optional[float] = None,
+                               gps_path: Optional[str] = None) -> Dict[str, Any]:
+        """Processa o vídeo (ou o trecho start/end) em blocos paralelos e costura os tracks nas fronteiras"""
+        
+        cap, fps, total_frames, width, height, duration = self._open_video(video_path)
+        cap.release()
+        range_start, range_end = self._frame_range(fps, total_frames, start, end)
+        
+        frame_limit = self.max_processed_frames * self.frame_skip if self.max_processed_frames else None
+        if frame_limit and frame_limit < range_end - range_start:
+            self.logger.warning("Limite de frames atingido, processando apenas o início do trecho")
+        
+        chunks = plan_chunks(range_end, fps, self.chunk_seconds, self.chunk_overlap_seconds, frame_limit,
+                             start_frame=range_start)
+        
+        start_time = time.time()
+        results = run_video_chunks(
+            type(self), self.config, video_path, chunks,
+            max_workers=num_workers or self.parallel_workers,
+            start_method=self.parallel_start_method
+        )
+        
+        # Combinar agregados e costurar tracks entre blocos
+        aggregates = VideoAnalysisAggregates()
+        for result in results:
+            aggregates.merge(result['aggregates'])
+        
+        groups = stitch_chunk_tracks([result['boundary'] for result in results], self.tracking_threshold)
+        
+        merged_tracks = {}
+        for result in results:
+            chunk_index = result['chunk'].index
+            for track_id, track in sorted(result['tracks'].items(), key=lambda item: item[1].first_frame):
+                key = groups.get((chunk_index, track_id), (chunk_index, track_id))
+                if key in merged_tracks:
+                    merged_tracks[key].merge(track)
+                else:
+                    merged_tracks[key] = track
+        
+        self.tracks = {}
+        for new_id, track in enumerate(sorted(merged_tracks.values(), key=lambda t: t.first_frame)):
+            track.track_id = new_id
+            track.severity_level = self._classify_severity_from_track(track)
+            self.tracks[new_id] = track
+        
+        processing_time = time.time() - start_time
+        self.logger.info(f"Processamento paralelo concluído em {processing_time:.2f}s ({len(chunks)} blocos)")
+        
+        geo_analysis = self._geolocate_tracks(video_path, fps, gps_path)
+        final_report = self._generate_video_report(aggregates, fps, total_frames, duration, video_path)
+        final_report['video_output'] = {'mode': VideoOutputMode.NONE}
+        if geo_analysis:
+            final_report['geo_analysis'] = geo_analysis
+        final_report['parallel_processing'] = {
+            'chunks': len(chunks),
+            'chunk_seconds': self.chunk_seconds,
+            'overlap_seconds': self.chunk_overlap_seconds,
+            'stitched_tracks': sum(1 for key, root in groups.items() if key != root)
+        }
+        if range_start or range_end < total_frames:
+            final_report['video_info']['analyzed_range'] = self._range_info(fps, range_start, range_end)
+        
+        return final_report
+    
+    def _geolocate_tracks(self, video_path: str, fps: float, gps_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Atribui latitude/longitude aos tracks estáveis e os registra no índice espacial
+        
+        A posição de um buraco é a da câmera no último frame em que ele foi
+        visto, quando o veículo está passando sobre ele.
+        """
+        gps_path = gps_path or find_sidecar(video_path)
+        if not gps_path:
+            return None
+        
+        try:
+            gps_track = GPSTrack.from_file(gps_path, self.gps_time_offset, self.gps_max_gap)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Trilha GPS ignorada ({gps_path}): {e}")
+            return None
+        
+        tracks = [t for t in self.tracks.values() if t.total_frames >= self.min_track_length]
+        positions = gps_track.positions_at(np.array([t.last_frame / fps for t in tracks], dtype=np.float64))
+        located = 0
+        for track, position in zip(tracks, positions):
+            track.latitude, track.longitude = position if position else (None, None)
+            located += position is not None
+        
+        geo_analysis = {
+            'gps_source': str(gps_path),
+            'gps_points': len(gps_track),
+            'gps_duration': gps_track.duration,
+            'located_tracks': located
+        }
+        
+        if self.spatial_index_path:
+            merged = 0
+            observed_at = gps_track.start_time
+            # Releitura e gravação sob trava: outras análises podem estar atualizando o mesmo índice
+            with PotholeSpatialIndex.locked(self.spatial_index_path, self.geo_merge_radius) as index:
+                for track in tracks:
+                    if track.latitude is None:
+                        continue
+                    pothole, was_merged = index.add_observation(
+                        track.latitude, track.longitude, source=str(video_path),
+                        severity_level=track.severity_level, risk_score=track.average_risk_score,
+                        timestamp=observed_at + track.last_frame / fps + self.gps_time_offset
+                    )
+                    track.geo_pothole_id = pothole.pothole_id
+                    merged += was_merged
+            
+            geo_analysis.update({
+                'new_potholes': located - merged,
+                'merged_observations': merged,
+                'indexed_potholes': len(index)
+            })
+        
+        return geo_analysis
+    
+    def process_video_chunk(self, video_path: str, chunk: VideoChunk) -> Dict[str, Any]:
+        """Processa um bloco do vídeo (executado em um processo worker)"""
+        
+        cap, fps, total_frames, width, height, duration = self._open_video(video_path)
+        
+        aggregates = VideoAnalysisAggregates()
+        self._chunk_boundary = {'chunk': chunk, 'head': defaultdict(dict), 'tail': defaultdict(dict)}
+        
+        try:
+            self._process_frames(
+                cap, fps, total_frames, aggregates,
+                start_frame=chunk.warmup_start_frame,
+                end_frame=chunk.end_frame,
+                stats_start_frame=chunk.start_frame,
+                frame_limit=None
+            )
+            boundary = {
+                'head': {tid: dict(boxes) for tid, boxes in self._chunk_boundary['head'].items()},
+                'tail': {tid: dict(boxes) for tid, boxes in self._chunk_boundary['tail'].items()}
+            }
+        finally:
+            cap.release()
+            self._chunk_boundary = None
+        
+        return {
+            'chunk': chunk,
+            'aggregates': aggregates,
+            'tracks': dict(self.tracks),
+            'boundary': boundary
+        }
+    
+    def process_live(self, source: Union[str, int, FrameSource], output_path: Optional[str] = None,
+                     max_duration: Optional[float] = None) -> Dict[str, Any]:
+        """Processa uma fonte ao vivo no modo "o frame mais recente vence"
+        
+        A leitura ocorre em thread própria sobre um buffer de uma posição que é
+        sempre sobrescrito; a inferência roda sempre no frame mais novo e os
+        frames obsoletos são descartados, de modo que o atraso não cresce
+        quando a inferência é mais lenta que a câmera.
+        """
+        if not isinstance(source, FrameSource):
+            source = VideoCaptureSource(source)
+        source_label = str(getattr(source, 'uri', source.__class__.__name__))
+        
+        reader = StreamReader(source_label, source, latest_only=True)
+        reader.start()
+        if reader.error:
+            raise ValueError(f"Não foi possível abrir a fonte: {source_label}")
+        
+        aggregates = VideoAnalysisAggregates()
+        lag = LatencyStats()
+        frame_lag = LatencyStats()
+        output_video = None
+        video_output = {'mode': VideoOutputMode.NONE}
+        start_time = time.time()
+        
+        try:
+            while not reader.finished:
+                if max_duration is not None and time.time() - start_time >= max_duration:
+                    break
+                if self.max_processed_frames and aggregates.processed_frames >= self.max_processed_frames:
+                    self.logger.warning("Limite de frames atingido, parando processamento")
+                    break
+                
+                item = reader.get()
+                if item is None:
+                    time.sleep(self.live_poll_interval)
+                    continue
+                
+                gray, frame_quality = self._frame_quality(item.frame)
+                if frame_quality < self.min_frame_quality:
+                    aggregates.quality_gated_frames += 1
+                    continue
+                
+                detections = self.detect(item.frame, analyze=False, low_confidence=True)
+                if not self.per_track_analysis:
+                    self._analyze_potholes(detections, item.frame, gray)
+                self._update_tracking(detections, item.frame_number, gray=gray, frame_quality=frame_quality)
+                detections = self._reportable_detections(detections)
+                aggregates.add(self._analyze_frame(item.frame, item.frame_number, item.timestamp, detections,
+                                                   frame_quality))
+                
+                if output_path and self.output_mode != VideoOutputMode.NONE and output_video is None:
+                    height, width = item.frame.shape[:2]
+                    writer = AnnotatedVideoWriter(
+                        output_path, source.fps, (width, height), self._annotate_frame,
+                        mode=self.output_mode,
+                        queue_size=self.writer_queue_size,
+                        pre_event_frames=int(round(self.event_clip_padding * source.fps)),
+                        post_event_frames=int(round(self.event_clip_padding * source.fps))
+                    )
+                    # Só é atribuído após abrir: uma falha cai no finally, que encerra o leitor
+                    writer.start()
+                    output_video = writer
+                if output_video:
+                    output_video.write(
+                        item.frame_number, item.frame,
+                        (detections, self._tracking_overlay_info(item.frame_number)),
+                        has_event=bool(detections)
+                    )
+                
+                # Atraso ponta a ponta (captura -> análise concluída) e em frames
+                lag.add(time.time() - item.captured_at)
+                frame_lag.add((reader.last_frame_number or 0) - item.frame_number)
+        finally:
+            reader.stop()
+            if output_video:
+                video_output = output_video.close()
+        
+        elapsed_time = time.time() - start_time
+        reader_stats = reader.get_stats()
+        self.logger.info(f"Análise ao vivo encerrada após {elapsed_time:.1f}s: "
+                         f"{aggregates.processed_frames} frames processados, "
+                         f"{reader_stats['frames_dropped']} descartados")
+        
+        final_report = self._generate_video_report(aggregates, source.fps, reader_stats['frames_read'], elapsed_time)
+        final_report['video_info']['path'] = source_label
+        final_report['video_output'] = video_output
+        final_report['live_metrics'] = {
+            'frames_read': reader_stats['frames_read'],
+            'frames_processed': aggregates.processed_frames,
+            'frames_dropped': reader_stats['frames_dropped'],
+            'drop_rate': reader_stats['frames_dropped'] / reader_stats['frames_read'] if reader_stats['frames_read'] else 0.0,
+            'processing_fps': aggregates.processed_frames / elapsed_time if elapsed_time > 0 else 0.0,
+            'lag_seconds': lag.to_dict(),
+            'lag_frames': frame_lag.to_dict()
+        }
+        
+        return final_report
     
-    def process_video(self, video_path: str, output_path: Optional[str] = None) -> Dict[str, Any]:
-        """Processa um vídeo completo para análise de buracos"""
+    def _open_video(self, video_path: str, retained_frames: int = 0,
+                    keyframes_only: bool = False) -> Tuple[Any, float, int, int, int, float]:
+        """Abre o vídeo e retorna a captura com suas informações básicas
+        
+        retained_frames indica quantos frames o chamador mantém vivos ao mesmo
+        tempo (dimensiona o anel de buffers do backend ffmpeg). Com
+        keyframes_only, a captura expõe last_frame_number com o índice de cada
+        frame lido.
+        """
         
         if not Path(video_path).exists():
             raise FileNotFoundError(f"Vídeo não encontrado: {video_path}")
         
         self.logger.info(f"Iniciando processamento do vídeo: {video_path}")
         
-        cap = cv2.VideoCapture(video_path)
+        cap = None
+        if self.video_backend == 'ffmpeg':
+            if FFMPEG_AVAILABLE:
+                cap = FFmpegVideoCapture(
+                    video_path,
+                    scale=self.decode_scale,
+                    width=self.decode_width,
+                    output_fps=self.decode_fps,
+                    buffer_count=retained_frames + 2,
+                    hwaccel=self.ffmpeg_hwaccel,
+                    keyframes_only=keyframes_only
+                )
+            else:
+                self.logger.warning("ffmpeg não disponível, usando cv2.VideoCapture")
+        
+        if cap is None:
+            cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
             raise RuntimeError(f"Não foi possível abrir o vídeo: {video_path}")
         
+        if keyframes_only and not isinstance(cap, FFmpegVideoCapture):
+            # Sem ffmpeg: amostrar um frame a cada survey_interval segundos
+            stride = max(int(round(self.survey_interval * (cap.get(cv2.CAP_PROP_FPS) or 30.0))), 1)
+            cap = StrideCapture(cap, stride)
+        
         # Informações do vídeo
         fps = cap.get(cv2.CAP_PROP_FPS)
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
@@ -181,196 +809,289 @@ class PotholeDetector:
         
         self.logger.info(f"Vídeo: {width}x{height}, {fps} FPS, {total_frames} frames, {duration:.2f}s")
         
-        # Preparar vídeo de saída se especificado
-        output_video = None
-        if output_path:
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            output_video = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-        
-        # Análise do vídeo
-        frame_analyses = []
-        frame_count = 0
+        return cap, fps, total_frames, width, height, duration
+    
+    def _process_frames(self, cap, fps: float, total_frames: int, aggregates: VideoAnalysisAggregates,
+                        output_video: Optional[AnnotatedVideoWriter] = None, start_frame: int = 0,
+                        end_frame: Optional[int] = None, stats_start_frame: Optional[int] = None,
+                        frame_limit: Union[int, None, str] = 'default',
+                        checkpointer: Optional[VideoCheckpointer] = None,
+                        keyframes_only: bool = False) -> int:
+        """Processa os frames [start_frame, end_frame) acumulando os agregados
+        
+        Frames anteriores a stats_start_frame apenas aquecem o rastreador.
+        Com keyframes_only, todo frame entregue pela captura é processado e
+        numerado por cap.last_frame_number. Retorna o número do próximo frame
+        a ser lido.
+        """
+        if frame_limit == 'default':
+            frame_limit = self.max_processed_frames
+        if stats_start_frame is None:
+            stats_start_frame = start_frame
+        
+        if start_frame > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        
+        frame_count = start_frame
         start_time = time.time()
         
-        try:
-            while True:
-                ret, frame = cap.read()
-                if not ret:
+        # Frames pulados aguardando o próximo quadro-chave para receber caixas interpoladas
+        interpolate = bool(output_video) and self.interpolate_skipped_frames and not keyframes_only and (
+            self.frame_skip > 1 or self.min_frame_quality > 0)
+        pending_frames: List[Tuple[int, np.ndarray]] = []
+        last_keyframe: Optional[Tuple[int, Dict[int, PotholeDetection]]] = None
+        
+        while end_frame is None or frame_count < end_frame:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            
+            if keyframes_only:
+                frame_count = cap.last_frame_number
+                if end_frame is not None and frame_count >= end_frame:
                     break
-                
-                # Processar apenas frames específicos (frame_skip)
-                if frame_count % self.frame_skip != 0:
-                    frame_count += 1
-                    continue
-                
-                # Detectar buracos no frame
-                detections = self.detect(frame)
-                
-                # Atualizar sistema de tracking
-                self._update_tracking(detections, frame_count)
-                
-                # Analisar qualidade do frame
-                frame_quality = self._assess_frame_quality(frame)
-                
-                # Gerar análise do frame
-                frame_analysis = VideoPotholeAnalysis(
-                    frame_number=frame_count,
-                    timestamp=frame_count / fps,
-                    detections=detections,
-                    frame_quality=frame_quality,
-                    road_condition=self._assess_road_condition_from_detections(detections),
-                    maintenance_priority=self._assess_maintenance_priority_from_detections(detections)
-                )
-                
-                frame_analyses.append(frame_analysis)
-                
-                # Desenhar detecções no frame
-                annotated_frame = self.draw_detections(frame, detections)
-                
-                # Adicionar informações de tracking
-                annotated_frame = self._draw_tracking_info(annotated_frame, frame_count)
-                
-                # Salvar frame no vídeo de saída
-                if output_video:
-                    output_video.write(annotated_frame)
-                
-                # Log de progresso
-                if frame_count % (fps * 5) == 0:  # A cada 5 segundos
-                    elapsed_time = time.time() - start_time
-                    progress = (frame_count / total_frames) * 100
-                    self.logger.info(f"Progresso: {progress:.1f}% ({frame_count}/{total_frames}) - Tempo: {elapsed_time:.1f}s")
-                
+            
+            # Processar apenas frames específicos (frame_skip)
+            elif frame_count % self.frame_skip != 0:
+                if interpolate and frame_count >= stats_start_frame:
+                    pending_frames.append((frame_count, frame))
                 frame_count += 1
-                
-                # Limitar processamento para evitar sobrecarga
-                if len(frame_analyses) > 1000:
-                    self.logger.warning("Limite de frames atingido, parando processamento")
-                    break
-                
-        finally:
-            cap.release()
+                continue
+            
+            # Frames de aquecimento apenas alimentam o rastreador
+            if frame_count < stats_start_frame:
+                self._update_tracking(self.detect(frame, analyze=False, low_confidence=True), frame_count,
+                                      count_statistics=False)
+                frame_count += 1
+                continue
+            
+            # Qualidade do frame antes da inferência: frames borrados não passam pelo modelo
+            gray, frame_quality = self._frame_quality(frame)
+            if frame_quality < self.min_frame_quality:
+                aggregates.quality_gated_frames += 1
+                if interpolate:
+                    pending_frames.append((frame_count, frame))
+                    # Sequências longas de frames borrados não ficam retidas em memória
+                    if len(pending_frames) >= 2 * self.frame_skip:
+                        self._write_interpolated_frames(output_video, aggregates, pending_frames, last_keyframe)
+                frame_count += 1
+                continue
+            
+            # Detectar buracos no frame e analisar todas as caixas com a mesma imagem em cinza
+            detections = self.detect(frame, analyze=False, low_confidence=True)
+            if not self.per_track_analysis:
+                self._analyze_potholes(detections, frame, gray)
+            self._update_tracking(detections, frame_count, gray=gray, frame_quality=frame_quality)
+            detections = self._reportable_detections(detections)
+            
+            # Gerar análise do frame
+            aggregates.add(self._analyze_frame(frame, frame_count, frame_count / fps, detections, frame_quality))
+            
+            if interpolate:
+                self._write_interpolated_frames(output_video, aggregates, pending_frames, last_keyframe,
+                                                frame_count, detections)
+                last_keyframe = (frame_count, {d.track_id: d for d in detections if d.track_id is not None})
+            
+            # Enviar frame para anotação e escrita fora da thread de inferência
             if output_video:
-                output_video.release()
+                output_video.write(
+                    frame_count, frame,
+                    (detections, self._tracking_overlay_info(frame_count)),
+                    has_event=bool(detections)
+                )
+            
+            # Log de progresso
+            if frame_count % (fps * 5) == 0:  # A cada 5 segundos
+                elapsed_time = time.time() - start_time
+                progress = (frame_count / total_frames) * 100
+                self.logger.info(f"Progresso: {progress:.1f}% ({frame_count}/{total_frames}) - Tempo: {elapsed_time:.1f}s")
+            
+            frame_count += 1
+            
+            # Checkpoint periódico do estado da análise
+            if checkpointer and checkpointer.due():
+                checkpointer.save(self._checkpoint_state(frame_count, aggregates))
+            
+            # Limitar processamento para evitar sobrecarga
+            if frame_limit and aggregates.processed_frames > frame_limit:
+                self.logger.warning("Limite de frames atingido, parando processamento")
+                break
         
-        # Finalizar análise
-        processing_time = time.time() - start_time
-        self.logger.info(f"Processamento concluído em {processing_time:.2f}s")
+        # Frames pulados no fim do vídeo: apenas extrapolação
+        if interpolate:
+            self._write_interpolated_frames(output_video, aggregates, pending_frames, last_keyframe)
         
-        # Gerar relatório final
-        final_report = self._generate_video_report(frame_analyses, fps, total_frames, duration)
+        return frame_count
+    
+    def _write_interpolated_frames(self, output_video: AnnotatedVideoWriter, aggregates: VideoAnalysisAggregates,
+                                   pending_frames: List[Tuple[int, np.ndarray]],
+                                   last_keyframe: Optional[Tuple[int, Dict[int, PotholeDetection]]],
+                                   next_frame: Optional[int] = None,
+                                   next_detections: Optional[List[PotholeDetection]] = None):
+        """Escreve os frames pulados com caixas interpoladas entre os quadros-chave do tracking"""
+        if not pending_frames:
+            return
+        
+        start_detections = last_keyframe[1] if last_keyframe else {}
+        boxes_by_frame = {}
+        if start_detections:
+            start_frame = last_keyframe[0]
+            end_detections = {d.track_id: d for d in next_detections or [] if d.track_id is not None}
+            velocities = {
+                track_id: self.tracker.tracks[track_id].kalman.velocity
+                for track_id in start_detections if track_id in self.tracker.tracks
+            }
+            boxes_by_frame = interpolate_track_boxes(
+                {tid: d.bbox for tid, d in start_detections.items()},
+                {tid: d.bbox for tid, d in end_detections.items()},
+                start_frame,
+                next_frame if next_frame is not None else pending_frames[-1][0] + 1,
+                [frame_number for frame_number, _ in pending_frames],
+                start_confidences={tid: d.confidence for tid, d in start_detections.items()},
+                end_confidences={tid: d.confidence for tid, d in end_detections.items()},
+                velocities=velocities,
+                max_extrapolation=self.max_extrapolation_frames
+            )
         
-        return final_report
+        for frame_number, frame in pending_frames:
+            detections = [
+                replace(start_detections[box.track_id], bbox=box.bbox, confidence=box.confidence,
+                        interpolation=box.method)
+                for box in boxes_by_frame.get(frame_number, [])
+            ]
+            aggregates.interpolated_frames += 1
+            aggregates.interpolated_boxes += len(detections)
+            output_video.write(
+                frame_number, frame,
+                (detections, self._tracking_overlay_info(frame_number)),
+                has_event=bool(detections)
+            )
+        
+        pending_frames.clear()
+    
+    def _reportable_detections(self, detections: List[PotholeDetection]) -> List[PotholeDetection]:
+        """Descarta as caixas de baixa confiança que o rastreador não associou a um track"""
+        return [d for d in detections if d.confidence >= self.confidence_threshold or d.track_id is not None]
     
-    def _update_tracking(self, detections: List[PotholeDetection], frame_number: int):
+    @property
+    def per_track_analysis(self) -> bool:
+        return self.analysis_mode == 'per_track'
+    
+    def _frame_quality(self, frame: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Converte o frame para cinza uma única vez (reutilizado na análise das caixas) e mede a qualidade"""
+        gray = self._to_grayscale(frame)
+        
+        if self.quality_estimator == 'fast':
+            frame_quality = self._assess_frame_quality_fast(gray)
+            if self.quality_calibration:
+                self._quality_pairs.append((self._assess_frame_quality(frame, gray), frame_quality))
+        else:
+            frame_quality = self._assess_frame_quality(frame, gray)
+        
+        return gray, frame_quality
+    
+    def _analyze_frame(self, frame: np.ndarray, frame_number: int, timestamp: float,
+                       detections: List[PotholeDetection], frame_quality: Optional[float] = None) -> VideoPotholeAnalysis:
+        """Gera a análise de um frame já detectado"""
+        if frame_quality is None:
+            frame_quality = self._assess_frame_quality(frame)
+        return VideoPotholeAnalysis(
+            frame_number=frame_number,
+            timestamp=timestamp,
+            detections=detections,
+            frame_quality=frame_quality,
+            road_condition=self._assess_road_condition_from_detections(detections),
+            maintenance_priority=self._assess_maintenance_priority_from_detections(detections)
+        )
+    
+    def _update_tracking(self, detections: List[PotholeDetection], frame_number: int,
+                         count_statistics: bool = True, gray: Optional[np.ndarray] = None,
+                         frame_quality: Optional[float] = None) -> TrackingUpdate:
         """Atualiza o sistema de tracking de buracos"""
         
-        current_tracks = {}
+        update = self.tracker.update_detections(detections, frame_number)
+        boundary = self._chunk_boundary
         
-        for detection in detections:
-            best_track_id = None
-            best_overlap = 0
+        for det_index, motion_track in update.matches + update.new_tracks:
+            detection = detections[det_index]
             
-            # Encontrar track mais similar
-            for track_id, track in self.tracks.items():
-                if not track.detections:
-                    continue
-                
-                last_detection = track.detections[-1]
-                overlap = self._calculate_bbox_overlap(detection.bbox, last_detection.bbox)
-                
-                if overlap > self.tracking_threshold and overlap > best_overlap:
-                    best_overlap = overlap
-                    best_track_id = track_id
-            
-            if best_track_id is not None:
-                # Atualizar track existente
-                track = self.tracks[best_track_id]
-                track.detections.append(detection)
-                track.last_frame = frame_number
-                track.total_frames += 1
-                
-                # Atualizar estatísticas
-                confidences = [d.confidence for d in track.detections]
-                risk_scores = [d.risk_score for d in track.detections if d.risk_score]
-                
-                track.average_confidence = np.mean(confidences)
-                if risk_scores:
-                    track.average_risk_score = np.mean(risk_scores)
-                
-                # Atualizar severidade baseada na média
-                track.severity_level = self._classify_severity_from_track(track)
-                
-                current_tracks[best_track_id] = track
-                
-            else:
+            # Registrar caixas nas regiões de sobreposição para costura entre blocos
+            if boundary is not None:
+                if frame_number < boundary['chunk'].start_frame:
+                    boundary['head'][motion_track.track_id][frame_number] = tuple(int(v) for v in detection.bbox)
+                elif frame_number >= boundary['chunk'].tail_start_frame:
+                    boundary['tail'][motion_track.track_id][frame_number] = tuple(int(v) for v in detection.bbox)
+            
+            if not count_statistics:
+                continue
+            
+            track = self.tracks.get(motion_track.track_id)
+            if track is None:
                 # Criar novo track
-                new_track = PotholeTrack(
-                    track_id=self.next_track_id,
+                track = PotholeTrack(
+                    track_id=motion_track.track_id,
                     first_frame=frame_number,
                     last_frame=frame_number,
-                    detections=[detection],
+                    detections=deque(maxlen=self.track_history_size),
                     average_confidence=detection.confidence,
                     average_risk_score=detection.risk_score or 0.0,
                     severity_level=detection.severity_level or 'low',
-                    total_frames=1,
+                    total_frames=0,
                     stability_score=1.0
                 )
-                
-                self.tracks[self.next_track_id] = new_track
-                current_tracks[self.next_track_id] = new_track
-                self.next_track_id += 1
-        
-        # Limpar tracks antigos
-        active_tracks = {}
-        for track_id, track in self.tracks.items():
-            if track_id in current_tracks or track.total_frames >= self.min_track_length:
-                active_tracks[track_id] = track
-        
-        self.tracks = active_tracks
-        
-        # Manter apenas o número máximo de tracks
-        if len(self.tracks) > self.max_tracks:
-            sorted_tracks = sorted(self.tracks.items(), key=lambda x: x[1].total_frames, reverse=True)
-            self.tracks = dict(sorted_tracks[:self.max_tracks])
+                self.tracks[motion_track.track_id] = track
+            
+            # No modo por track, a detecção herda a análise do representante do track
+            if self.per_track_analysis and gray is not None:
+                self._update_track_representative(track, detection, gray, frame_number, frame_quality)
+            
+            # Atualizar estatísticas e severidade baseada na média
+            track.add_detection(detection, frame_number)
+            track.severity_level = self._classify_severity_from_track(track)
+        
+        # Tracks encerrados pelo rastreador só permanecem no relatório se forem estáveis
+        for motion_track in update.removed_tracks:
+            track = self.tracks.get(motion_track.track_id)
+            if track is None or track.total_frames >= self.min_track_length:
+                continue
+            if boundary is not None and (motion_track.track_id in boundary['head'] or
+                                         motion_track.track_id in boundary['tail']):
+                continue
+            del self.tracks[motion_track.track_id]
+        
+        return update
     
-    def _calculate_bbox_overlap(self, bbox1: Tuple[int, int, int, int], 
-                               bbox2: Tuple[int, int, int, int]) -> float:
-        """Calcula sobreposição entre duas bounding boxes"""
-        x1_1, y1_1, x2_1, y2_1 = bbox1
-        x1_2, y1_2, x2_2, y2_2 = bbox2
-        
-        # Calcular interseção
-        x_left = max(x1_1, x1_2)
-        y_top = max(y1_1, y1_2)
-        x_right = min(x2_1, x2_2)
-        y_bottom = min(y2_1, y2_2)
-        
-        if x_right < x_left or y_bottom < y_top:
-            return 0.0
-        
-        intersection = (x_right - x_left) * (y_bottom - y_top)
-        area1 = (x2_1 - x1_1) * (y2_1 - y1_1)
-        area2 = (x2_2 - x1_2) * (y2_2 - y1_2)
-        union = area1 + area2 - intersection
-        
-        return intersection / union if union > 0 else 0.0
+    def _update_track_representative(self, track: PotholeTrack, detection: PotholeDetection,
+                                     gray: np.ndarray, frame_number: int, frame_quality: Optional[float]):
+        """Executa a análise pesada apenas no melhor frame do track (qualidade x tamanho da caixa)"""
+        if frame_quality is None:
+            frame_quality = self._assess_frame_quality(gray, gray)
+        score = frame_quality * self._estimate_area(detection.bbox)
+        
+        refresh_due = (self.representative_refresh_frames and track.representative_frame is not None and
+                       frame_number - track.representative_frame >= self.representative_refresh_frames)
+        improved = score > track.representative_score * (1.0 + self.representative_min_gain)
+        if track.representative is None or improved or refresh_due:
+            track.representative = self._analyze_potholes([replace(detection)], gray)[0]
+            track.representative_frame = frame_number
+            track.representative_score = score
+            track.representative_analyses += 1
+        
+        representative = track.representative
+        detection.pothole_type = representative.pothole_type
+        detection.depth_estimate = representative.depth_estimate
+        detection.severity_level = representative.severity_level
+        detection.area_estimate = self._estimate_area(detection.bbox)
+        detection.risk_score = representative.risk_score
     
     def _classify_severity_from_track(self, track: PotholeTrack) -> str:
-        """Classifica severidade baseada no histórico do track"""
-        if not track.detections:
-            return 'low'
-        
-        # Calcular severidade média
-        severity_scores = []
-        for detection in track.detections:
-            if detection.severity_level:
-                severity_map = {'low': 1, 'medium': 2, 'high': 3, 'critical': 4}
-                severity_scores.append(severity_map.get(detection.severity_level, 1))
-        
-        if not severity_scores:
+        """Classifica severidade baseada nos contadores incrementais do track"""
+        if self.per_track_analysis and track.representative is not None:
+            return track.representative.severity_level or 'low'
+        if not track.severity_counts:
             return 'low'
         
-        avg_severity = np.mean(severity_scores)
+        avg_severity = track.average_severity_score
         
         if avg_severity >= 3.5:
             return 'critical'
@@ -381,11 +1102,12 @@ class PotholeDetector:
         else:
             return 'low'
     
-    def _assess_frame_quality(self, frame: np.ndarray) -> float:
-        """Avalia a qualidade do frame para análise"""
+    def _assess_frame_quality(self, frame: np.ndarray, gray: Optional[np.ndarray] = None) -> float:
+        """Avalia a qualidade do frame para análise (reutiliza a imagem em cinza, se fornecida)"""
         try:
             # Converter para escala de cinza
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if gray is None:
+                gray = self._to_grayscale(frame)
             
             # Calcular variância (maior variância = mais detalhes)
             variance = np.var(gray)
@@ -409,6 +1131,99 @@ class PotholeDetector:
             self.logger.warning(f"Erro ao avaliar qualidade do frame: {e}")
             return 0.5
     
+    def _assess_frame_quality_fast(self, gray: np.ndarray) -> float:
+        """Qualidade estimada em 1/4 da resolução: variância e variância do Laplaciano em float32"""
+        try:
+            small = cv2.resize(gray, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA).astype(np.float32)
+            
+            _, std = cv2.meanStdDev(small)
+            variance = float(std[0, 0]) ** 2
+            
+            _, laplacian_std = cv2.meanStdDev(cv2.Laplacian(small, cv2.CV_32F, ksize=3))
+            laplacian_variance = float(laplacian_std[0, 0]) ** 2
+            
+            variance_score = min(variance / 1000, 1.0)
+            sharpness_score = min(laplacian_variance / self.quality_laplacian_scale, 1.0)
+            
+            quality_score = (variance_score * 0.6 + sharpness_score * 0.4)
+            
+            return min(max(quality_score, 0.0), 1.0)
+            
+        except Exception as e:
+            self.logger.warning(f"Erro ao avaliar qualidade do frame: {e}")
+            return 0.5
+    
+    def calibrate_frame_quality(self, video_path: str, max_samples: int = 200) -> Dict[str, Any]:
+        """Compara o estimador rápido com a implementação original em frames amostrados do vídeo
+        
+        Retorna correlação, erro absoluto e a escala do Laplaciano que melhor
+        aproxima os scores originais (para 'quality_laplacian_scale').
+        """
+        cap, fps, total_frames, width, height, duration = self._open_video(video_path)
+        step = max(total_frames // max(max_samples, 1), 1)
+        
+        legacy_scores, variance_scores, laplacian_variances = [], [], []
+        try:
+            for frame_number in range(0, total_frames, step):
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                
+                gray = self._to_grayscale(frame)
+                small = cv2.resize(gray, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA).astype(np.float32)
+                legacy_scores.append(self._assess_frame_quality(frame, gray))
+                variance_scores.append(min(float(np.var(small)) / 1000, 1.0))
+                laplacian_variances.append(float(np.var(cv2.Laplacian(small, cv2.CV_32F, ksize=3))))
+        finally:
+            cap.release()
+        
+        if not legacy_scores:
+            return {'samples': 0}
+        
+        legacy = np.array(legacy_scores)
+        variance_part = np.array(variance_scores) * 0.6
+        laplacian = np.array(laplacian_variances)
+        
+        def fast_scores(scale: float) -> np.ndarray:
+            return np.clip(variance_part + np.minimum(laplacian / scale, 1.0) * 0.4, 0.0, 1.0)
+        
+        candidate_scales = np.geomspace(10.0, 10000.0, 121)
+        errors = [np.mean(np.abs(fast_scores(scale) - legacy)) for scale in candidate_scales]
+        best_scale = float(candidate_scales[int(np.argmin(errors))])
+        
+        current = self._summarize_quality_pairs(list(zip(legacy, fast_scores(self.quality_laplacian_scale))))
+        calibrated = self._summarize_quality_pairs(list(zip(legacy, fast_scores(best_scale))))
+        
+        return {
+            'samples': len(legacy_scores),
+            'current_scale': self.quality_laplacian_scale,
+            'current': current,
+            'suggested_laplacian_scale': best_scale,
+            'calibrated': calibrated
+        }
+    
+    @staticmethod
+    def _summarize_quality_pairs(pairs: List[Tuple[float, float]]) -> Dict[str, Any]:
+        """Concordância entre scores (original, rápido)"""
+        if not pairs:
+            return {'samples': 0}
+        
+        legacy, fast = (np.array(values, dtype=np.float64) for values in zip(*pairs))
+        errors = np.abs(fast - legacy)
+        correlation = float(np.corrcoef(legacy, fast)[0, 1]) if len(pairs) > 1 and legacy.std() > 0 and fast.std() > 0 else None
+        
+        def bucket(scores: np.ndarray) -> np.ndarray:
+            return np.digitize(scores, [0.4, 0.6, 0.8])
+        
+        return {
+            'samples': len(pairs),
+            'correlation': correlation,
+            'mean_abs_error': float(errors.mean()),
+            'max_abs_error': float(errors.max()),
+            'bucket_agreement': float(np.mean(bucket(legacy) == bucket(fast)))
+        }
+    
     def _assess_road_condition_from_detections(self, detections: List[PotholeDetection]) -> str:
         """Avalia condição da estrada baseada nas detecções do frame"""
         if not detections:
@@ -443,53 +1258,59 @@ class PotholeDetector:
         else:
             return "low"
     
-    def _draw_tracking_info(self, frame: np.ndarray, frame_number: int) -> np.ndarray:
+    def _tracking_overlay_info(self, frame_number: int) -> Dict[str, Any]:
+        """Captura as estatísticas de tracking exibidas no frame anotado"""
+        info = {'frame_number': frame_number, 'total_tracks': len(self.tracks)}
+        
+        active_tracks = [t for t in self.tracks.values() if t.total_frames >= self.min_track_length]
+        if active_tracks:
+            info['average_confidence'] = float(np.mean([t.average_confidence for t in active_tracks]))
+            info['average_risk_score'] = float(np.mean([t.average_risk_score for t in active_tracks]))
+        
+        return info
+    
+    def _annotate_frame(self, frame: np.ndarray, payload: Tuple[List[PotholeDetection], Dict[str, Any]]) -> np.ndarray:
+        """Anota um frame do vídeo de saída (executado na thread do escritor)"""
+        detections, overlay_info = payload
+        annotated_frame = self.draw_detections(frame, detections, in_place=True)
+        return self._draw_tracking_info(annotated_frame, overlay_info['frame_number'], overlay_info, in_place=True)
+    
+    def _draw_tracking_info(self, frame: np.ndarray, frame_number: int,
+                            overlay_info: Optional[Dict[str, Any]] = None, in_place: bool = False) -> np.ndarray:
         """Desenha informações de tracking no frame"""
-        output_frame = frame.copy()
+        output_frame = frame if in_place else frame.copy()
+        info = overlay_info or self._tracking_overlay_info(frame_number)
         
         # Informações do frame
         cv2.putText(output_frame, f"Frame: {frame_number}", (10, 30), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        cv2.putText(output_frame, f"Tracks: {len(self.tracks)}", (10, 60), 
+        cv2.putText(output_frame, f"Tracks: {info['total_tracks']}", (10, 60), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
         # Estatísticas dos tracks
-        if self.tracks:
-            active_tracks = [t for t in self.tracks.values() if t.total_frames >= self.min_track_length]
-            if active_tracks:
-                avg_confidence = np.mean([t.average_confidence for t in active_tracks])
-                avg_risk = np.mean([t.average_risk_score for t in active_tracks])
-                
-                cv2.putText(output_frame, f"Avg Conf: {avg_confidence:.2f}", (10, 90), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-                cv2.putText(output_frame, f"Avg Risk: {avg_risk:.2f}", (10, 120), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+        if 'average_confidence' in info:
+            cv2.putText(output_frame, f"Avg Conf: {info['average_confidence']:.2f}", (10, 90), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            cv2.putText(output_frame, f"Avg Risk: {info['average_risk_score']:.2f}", (10, 120), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
         
         return output_frame
     
-    def _generate_video_report(self, frame_analyses: List[VideoPotholeAnalysis], 
-                              fps: float, total_frames: int, duration: float) -> Dict[str, Any]:
+    def _generate_video_report(self, aggregates: VideoAnalysisAggregates, fps: float, total_frames: int,
+                              duration: float, video_path: Optional[str] = None) -> Dict[str, Any]:
         """Gera relatório final da análise do vídeo"""
         
         # Estatísticas gerais
-        total_detections = sum(len(analysis.detections) for analysis in frame_analyses)
-        frames_with_detections = sum(1 for analysis in frame_analyses if analysis.detections)
+        total_detections = aggregates.total_detections
+        frames_with_detections = aggregates.frames_with_detections
+        processed_frames = aggregates.processed_frames
         
         # Análise de qualidade dos frames
-        frame_qualities = [analysis.frame_quality for analysis in frame_analyses]
-        avg_frame_quality = np.mean(frame_qualities) if frame_qualities else 0.0
-        
-        # Análise de condição da estrada
-        road_conditions = [analysis.road_condition for analysis in frame_analyses]
-        road_condition_counts = defaultdict(int)
-        for condition in road_conditions:
-            road_condition_counts[condition] += 1
+        avg_frame_quality = aggregates.average_frame_quality
         
-        # Análise de prioridade de manutenção
-        maintenance_priorities = [analysis.maintenance_priority for analysis in frame_analyses]
-        priority_counts = defaultdict(int)
-        for priority in maintenance_priorities:
-            priority_counts[priority] += 1
+        # Análise de condição da estrada e prioridade de manutenção
+        road_condition_counts = aggregates.road_condition_counts
+        priority_counts = aggregates.priority_counts
         
         # Análise dos tracks
         track_analysis = []
@@ -503,31 +1324,50 @@ class PotholeDetector:
                     'average_confidence': track.average_confidence,
                     'average_risk_score': track.average_risk_score,
                     'severity_level': track.severity_level,
-                    'stability_score': track.stability_score
+                    'severity_distribution': dict(track.severity_counts),
+                    'stability_score': track.stability_score,
+                    'best_detection': {
+                        'bbox': [int(v) for v in track.best_detection.bbox],
+                        'confidence': track.best_detection.confidence,
+                        'risk_score': track.best_detection.risk_score
+                    } if track.best_detection else None,
+                    'representative': {
+                        'frame_number': track.representative_frame,
+                        'bbox': [int(v) for v in track.representative.bbox],
+                        'confidence': track.representative.confidence,
+                        'depth_estimate': track.representative.depth_estimate,
+                        'severity_level': track.representative.severity_level,
+                        'risk_score': track.representative.risk_score,
+                        'analyses': track.representative_analyses
+                    } if track.representative else None,
+                    'location': {
+                        'latitude': track.latitude,
+                        'longitude': track.longitude,
+                        'pothole_id': track.geo_pothole_id
+                    } if track.latitude is not None else None
                 })
         
         # Relatório final
         report = {
             'video_info': {
-                'path': str(Path(video_path)) if 'video_path' in locals() else 'unknown',
+                'path': str(Path(video_path)) if video_path else 'unknown',
                 'fps': fps,
                 'total_frames': total_frames,
                 'duration': duration,
-                'processed_frames': len(frame_analyses)
+                'processed_frames': processed_frames,
+                'interpolated_frames': aggregates.interpolated_frames,
+                'quality_gated_frames': aggregates.quality_gated_frames
             },
             'detection_summary': {
                 'total_detections': total_detections,
                 'frames_with_detections': frames_with_detections,
-                'detection_rate': frames_with_detections / len(frame_analyses) if frame_analyses else 0.0
+                'detection_rate': frames_with_detections / processed_frames if processed_frames else 0.0,
+                'interpolated_boxes': aggregates.interpolated_boxes
             },
             'quality_analysis': {
                 'average_frame_quality': avg_frame_quality,
-                'quality_distribution': {
-                    'excellent': sum(1 for q in frame_qualities if q >= 0.8),
-                    'good': sum(1 for q in frame_qualities if 0.6 <= q < 0.8),
-                    'fair': sum(1 for q in frame_qualities if 0.4 <= q < 0.6),
-                    'poor': sum(1 for q in frame_qualities if q < 0.4)
-                }
+                'quality_distribution': dict(aggregates.quality_distribution),
+                'estimator': self.quality_estimator
             },
             'road_condition_analysis': {
                 'condition_distribution': dict(road_condition_counts),
@@ -547,6 +1387,9 @@ class PotholeDetector:
             )
         }
         
+        if self.quality_calibration and self._quality_pairs:
+            report['quality_analysis']['calibration'] = self._summarize_quality_pairs(list(self._quality_pairs))
+        
         return report
     
     def _generate_video_recommendations(self, total_detections: int, avg_quality: float,
@@ -586,15 +1429,47 @@ class PotholeDetector:
         return recommendations
     
     def _analyze_pothole(self, detection: PotholeDetection, image: np.ndarray) -> PotholeDetection:
-        x1, y1, x2, y2 = detection.bbox
+        return self._analyze_potholes([detection], image)[0]
+    
+    def _analyze_potholes(self, detections: List[PotholeDetection], image: np.ndarray,
+                          gray: Optional[np.ndarray] = None,
+                          integrals: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> List[PotholeDetection]:
+        """Calcula área, profundidade, severidade e risco de todas as caixas do frame em uma passada
+        
+        A imagem é convertida para tons de cinza uma única vez e as médias e
+        desvios por caixa vêm das imagens integrais (soma e soma dos quadrados).
+        """
+        if not detections:
+            return detections
         
-        detection.pothole_type = detection.class_name
-        detection.area_estimate = self._estimate_area(detection.bbox)
-        detection.depth_estimate = self._estimate_depth(image, detection.bbox)
-        detection.severity_level = self._classify_severity(detection.depth_estimate)
-        detection.risk_score = self._calculate_risk_score(detection)
+        if gray is None:
+            gray = self._to_grayscale(image)
+        
+        bboxes = np.array([d.bbox for d in detections], dtype=np.int64).reshape(-1, 4)
+        confidences = np.array([d.confidence for d in detections], dtype=np.float64)
         
-        return detection
+        areas = self._estimate_areas(bboxes)
+        depths = self._estimate_depths(gray, bboxes, integrals)
+        severities = self._classify_severities(depths)
+        risks = self._calculate_risk_scores(confidences, areas, severities)
+        
+        for index, detection in enumerate(detections):
+            detection.pothole_type = detection.class_name
+            detection.area_estimate = float(areas[index])
+            detection.depth_estimate = float(depths[index])
+            detection.severity_level = severities[index]
+            detection.risk_score = float(risks[index])
+        
+        return detections
+    
+    @staticmethod
+    def _to_grayscale(image: np.ndarray) -> np.ndarray:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    
+    @staticmethod
+    def _integral_images(gray: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Imagens integrais de soma e soma dos quadrados (float64 evita overflow em 4K)"""
+        return cv2.integral2(gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
     
     def _estimate_area(self, bbox: Tuple[int, int, int, int]) -> float:
         x1, y1, x2, y2 = bbox
@@ -602,27 +1477,47 @@ class PotholeDetector:
         height = y2 - y1
         return width * height
     
+    @staticmethod
+    def _estimate_areas(bboxes: np.ndarray) -> np.ndarray:
+        return ((bboxes[:, 2] - bboxes[:, 0]) * (bboxes[:, 3] - bboxes[:, 1])).astype(np.float64)
+    
     def _estimate_depth(self, image: np.ndarray, bbox: Tuple[int, int, int, int]) -> float:
-        x1, y1, x2, y2 = bbox
-        roi = image[y1:y2, x1:x2]
-        
-        if roi.size == 0:
-            return 0.0
+        depths = self._estimate_depths(self._to_grayscale(image), np.array([bbox], dtype=np.int64))
+        return float(depths[0])
+    
+    def _estimate_depths(self, gray: np.ndarray, bboxes: np.ndarray,
+                         integrals: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> np.ndarray:
+        """Estimativa de profundidade pela intensidade média e desvio padrão de cada caixa"""
+        height, width = gray.shape[:2]
+        x1 = np.clip(bboxes[:, 0], 0, width)
+        y1 = np.clip(bboxes[:, 1], 0, height)
+        x2 = np.clip(bboxes[:, 2], 0, width)
+        y2 = np.clip(bboxes[:, 3], 0, height)
+        pixel_counts = (np.maximum(x2 - x1, 0) * np.maximum(y2 - y1, 0)).astype(np.float64)
+        
+        depths = np.zeros(len(bboxes), dtype=np.float64)
+        valid = pixel_counts > 0
+        if not np.any(valid):
+            return depths
         
         try:
-            gray_roi = cv2.cvtColor(roi, cv2.COLOR_RGB2GRAY) if len(roi.shape) == 3 else roi
+            integral_sum, integral_sq = integrals if integrals is not None else self._integral_images(gray)
             
-            mean_intensity = np.mean(gray_roi)
-            std_intensity = np.std(gray_roi)
+            def box_sums(integral):
+                return integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
             
-            depth_estimate = (255 - mean_intensity) / 255.0 * 0.5
-            depth_estimate += (std_intensity / 255.0) * 0.3
+            counts = np.where(valid, pixel_counts, 1.0)
+            mean_intensity = box_sums(integral_sum) / counts
+            variance = np.maximum(box_sums(integral_sq) / counts - mean_intensity ** 2, 0.0)
+            std_intensity = np.sqrt(variance)
             
-            return min(max(depth_estimate, 0.01), 1.0)
+            estimates = (255 - mean_intensity) / 255.0 * 0.5 + (std_intensity / 255.0) * 0.3
+            depths[valid] = np.clip(estimates[valid], 0.01, 1.0)
+            return depths
             
         except Exception as e:
             self.logger.warning(f"Erro ao estimar profundidade: {e}")
-            return 0.05
+            return np.where(valid, 0.05, 0.0)
     
     def _classify_severity(self, depth_estimate: float) -> str:
         for level, ranges in self.severity_levels.items():
@@ -631,9 +1526,23 @@ class PotholeDetector:
                 return level
         return 'low'
     
+    def _classify_severities(self, depths: np.ndarray) -> List[str]:
+        levels = list(self.severity_levels.keys())
+        level_index = np.full(len(depths), -1)
+        # Percorrer em ordem inversa para que a primeira faixa compatível prevaleça
+        for index in range(len(levels) - 1, -1, -1):
+            min_depth, max_depth = self.severity_levels[levels[index]]['depth_range']
+            level_index[(depths >= min_depth) & (depths <= max_depth)] = index
+        return [levels[index] if index >= 0 else 'low' for index in level_index]
+    
     def _calculate_risk_score(self, detection: PotholeDetection) -> float:
-        base_score = detection.confidence
-        
+        risks = self._calculate_risk_scores(
+            np.array([detection.confidence]), np.array([detection.area_estimate]), [detection.severity_level]
+        )
+        return float(risks[0])
+    
+    @staticmethod
+    def _calculate_risk_scores(confidences: np.ndarray, areas: np.ndarray, severities: List[str]) -> np.ndarray:
         severity_multiplier = {
             'low': 1.0,
             'medium': 1.5,
@@ -641,11 +1550,11 @@ class PotholeDetector:
             'critical': 3.0
         }
         
-        area_factor = min(detection.area_estimate / 10000, 2.0)
-        severity_factor = severity_multiplier.get(detection.severity_level, 1.0)
+        area_factor = np.minimum(areas / 10000, 2.0)
+        severity_factor = np.array([severity_multiplier.get(level, 1.0) for level in severities])
         
-        risk_score = base_score * severity_factor * area_factor
-        return min(risk_score, 1.0)
+        risk_scores = confidences * severity_factor * area_factor
+        return np.minimum(risk_scores, 1.0)
     
     def filter_by_severity(self, detections: List[PotholeDetection], severity: str) -> List[PotholeDetection]:
         return [det for det in detections if det.severity_level == severity]
@@ -714,8 +1623,8 @@ class PotholeDetector:
             }
         }
     
-    def draw_detections(self, image: np.ndarray, detections: List[PotholeDetection]) -> np.ndarray:
-        output_image = image.copy()
+    def draw_detections(self, image: np.ndarray, detections: List[PotholeDetection], in_place: bool = False) -> np.ndarray:
+        output_image = image if in_place else image.copy()
         
         for detection in detections:
             x1, y1, x2, y2 = detection.bbox
@@ -735,7 +1644,13 @@ class PotholeDetector:
             label = f"Buraco: {detection.pothole_type} ({confidence:.2f})"
             label += f" | Severidade: {severity} | Risco: {risk_score:.2f}"
             
-            cv2.rectangle(output_image, (x1, y1), (x2, y2), color, 2)
+            # Caixas sintetizadas pelo tracking são marcadas e desenhadas com traço fino
+            thickness = 2
+            if detection.interpolation:
+                label = f"[{detection.interpolation}] {label}"
+                thickness = 1
+            
+            cv2.rectangle(output_image, (x1, y1), (x2, y2), color, thickness)
             
             label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 2)[0]
             cv2.rectangle(output_image, (x1, y1 - label_size[1] - 10), 
@@ -817,4 +1732,5 @@ class PotholeDetector:
         
         # Limpar tracking
         self.tracks.clear()
+        self.tracker.reset()
         self.frame_history.clear()
@@ -8,6 +8,8 @@ from pathlib import Path
 import time
 from dataclasses import dataclass
 
+from ..tracking.tracker import MultiObjectTracker
+
 try:
     from ultralytics import YOLO
     YOLO_AVAILABLE = True
@@ -23,6 +25,7 @@ class SignalPlateDetection:
     signal_type: Optional[str] = None
     signal_category: Optional[str] = None
     regulatory_code: Optional[str] = None
+    track_id: Optional[int] = None
 
 class SignalPlateDetector:
     
@@ -34,6 +37,7 @@ class SignalPlateDetector:
         self.confidence_threshold = config.get('confidence_threshold', 0.5)
         self.iou_threshold = config.get('iou_threshold', 0.45)
         self.model_path = config.get('model_path', 'models/signal_plates_yolo.pt')
+        self.tracker = MultiObjectTracker(config.get('tracking', {}))
         
         self.regulatory_signs = [
             'stop_sign', 'yield_sign', 'no_entry', 'no_left_turn', 'no_right_turn',
@@ -82,27 +86,29 @@ class SignalPlateDetector:
             return "cpu"
     
     def detect(self, image: np.ndarray) -> List[SignalPlateDetection]:
+        return self.detect_batch([image])[0]
+    
+    def detect_batch(self, images: List[np.ndarray]) -> List[List[SignalPlateDetection]]:
         if self.model is None:
-            return []
+            return [[] for _ in images]
         
         try:
             start_time = time.time()
             
             results = self.model(
-                image,
+                images,
                 conf=self.confidence_threshold,
                 iou=self.iou_threshold,
                 verbose=False
             )
             
-            detections = []
+            batch_detections = []
             
-            for result in results:
+            for image, result in zip(images, results):
+                detections = []
                 boxes = result.boxes
-                if boxes is None:
-                    continue
                 
-                for box in boxes:
+                for box in boxes if boxes is not None else []:
                     bbox = box.xyxy[0].cpu().numpy()
                     confidence = float(box.conf[0])
                     class_id = int(box.cls[0])
@@ -116,15 +122,18 @@ class SignalPlateDetector:
                     
                     detection = self._classify_signal(detection)
                     detections.append(detection)
+                
+                batch_detections.append(detections)
             
             processing_time = time.time() - start_time
-            self.logger.info(f"Detectadas {len(detections)} placas de sinalização em {processing_time:.3f}s")
+            total_detections = sum(len(detections) for detections in batch_detections)
+            self.logger.info(f"Detectadas {total_detections} placas de sinalização em {processing_time:.3f}s ({len(images)} imagens)")
             
-            return detections
+            return batch_detections
             
         except Exception as e:
             self.logger.error(f"Erro na detecção: {e}")
-            return []
+            return [[] for _ in images]
     
     def _classify_signal(self, detection: SignalPlateDetection) -> SignalPlateDetection:
         class_name = detection.class_name.lower()
@@ -163,6 +172,11 @@ class SignalPlateDetector:
         
         return regulatory_mapping.get(class_name)
     
+    def detect_and_track(self, image: np.ndarray, frame_number: int) -> List[SignalPlateDetection]:
+        detections = self.detect(image)
+        self.tracker.update_detections(detections, frame_number)
+        return detections
+    
     def filter_by_category(self, detections: List[SignalPlateDetection], category: str) -> List[SignalPlateDetection]:
         return [det for det in detections if det.signal_category == category]
     
@@ -230,3 +244,5 @@ class SignalPlateDetector:
         if self.model:
             del self.model
             self.model = None
+        
+        self.tracker.reset()
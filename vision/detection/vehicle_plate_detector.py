@@ -8,6 +8,9 @@ from pathlib import Path
 import time
 from dataclasses import dataclass
 
+from ..tracking.tracker import MultiObjectTracker
+from ..ocr.plate_voting import PlateOCRScheduler, PlateReadResult
+
 try:
     from ultralytics import YOLO
     YOLO_AVAILABLE = True
@@ -23,6 +26,7 @@ class VehiclePlateDetection:
     plate_text: Optional[str] = None
     plate_type: Optional[str] = None
     vehicle_type: Optional[str] = None
+    track_id: Optional[int] = None
 
 class VehiclePlateDetector:
     
@@ -34,6 +38,7 @@ class VehiclePlateDetector:
         self.confidence_threshold = config.get('confidence_threshold', 0.5)
         self.iou_threshold = config.get('iou_threshold', 0.45)
         self.model_path = config.get('model_path', 'models/vehicle_plates_yolo.pt')
+        self.tracker = MultiObjectTracker(config.get('tracking', {}))
         
         self.vehicle_classes = [
             'car', 'truck', 'bus', 'motorcycle', 'bicycle', 'van', 'pickup'
@@ -75,27 +80,29 @@ class VehiclePlateDetector:
             return "cpu"
     
     def detect(self, image: np.ndarray) -> List[VehiclePlateDetection]:
+        return self.detect_batch([image])[0]
+    
+    def detect_batch(self, images: List[np.ndarray]) -> List[List[VehiclePlateDetection]]:
         if self.model is None:
-            return []
+            return [[] for _ in images]
         
         try:
             start_time = time.time()
             
             results = self.model(
-                image,
+                images,
                 conf=self.confidence_threshold,
                 iou=self.iou_threshold,
                 verbose=False
             )
             
-            detections = []
+            batch_detections = []
             
-            for result in results:
+            for image, result in zip(images, results):
+                detections = []
                 boxes = result.boxes
-                if boxes is None:
-                    continue
                 
-                for box in boxes:
+                for box in boxes if boxes is not None else []:
                     bbox = box.xyxy[0].cpu().numpy()
                     confidence = float(box.conf[0])
                     class_id = int(box.cls[0])
@@ -109,15 +116,18 @@ class VehiclePlateDetector:
                     
                     detection = self._classify_detection(detection)
                     detections.append(detection)
+                
+                batch_detections.append(detections)
             
             processing_time = time.time() - start_time
-            self.logger.info(f"Detectadas {len(detections)} placas/veículos em {processing_time:.3f}s")
+            total_detections = sum(len(detections) for detections in batch_detections)
+            self.logger.info(f"Detectadas {total_detections} placas/veículos em {processing_time:.3f}s ({len(images)} imagens)")
             
-            return detections
+            return batch_detections
             
         except Exception as e:
             self.logger.error(f"Erro na detecção: {e}")
-            return []
+            return [[] for _ in images]
     
     def _classify_detection(self, detection: VehiclePlateDetection) -> VehiclePlateDetection:
         class_name = detection.class_name.lower()
@@ -131,6 +141,34 @@ class VehiclePlateDetector:
         
         return detection
     
+    def detect_and_track(self, image: np.ndarray, frame_number: int) -> List[VehiclePlateDetection]:
+        detections = self.detect(image)
+        self.tracker.update_detections(detections, frame_number)
+        return detections
+    
+    def detect_track_and_read(self, image: np.ndarray, frame_number: int,
+                              plate_reader: PlateOCRScheduler) -> Tuple[List[VehiclePlateDetection], List[PlateReadResult]]:
+        """Detecta, rastreia e agenda o OCR das placas por track
+        
+        Retorna as detecções (com o consenso atual em plate_text) e as placas
+        consolidadas emitidas neste frame (uma vez por track).
+        """
+        detections = self.detect(image)
+        update = self.tracker.update_detections(detections, frame_number)
+        
+        plates = self.filter_vehicle_plates(detections)
+        emitted = plate_reader.update(image, frame_number, plates,
+                                      [track.track_id for track in update.removed_tracks])
+        
+        for detection in plates:
+            if detection.track_id is None:
+                continue
+            current = plate_reader.get_result(detection.track_id)
+            if current is not None:
+                detection.plate_text = current.plate_text
+        
+        return detections, emitted
+    
     def filter_vehicle_plates(self, detections: List[VehiclePlateDetection]) -> List[VehiclePlateDetection]:
         return [det for det in detections if det.plate_type is not None]
     
@@ -190,3 +228,5 @@ class VehiclePlateDetector:
         if self.model:
             del self.model
             self.model = None
+        
+        self.tracker.reset()
@@ -0,0 +1,13 @@
+from .gps import GPSPoint, GPSTrack, load_gpx, load_gps_csv, find_sidecar
+from .spatial_index import GeoPothole, PotholeSpatialIndex, distance_meters
+
+__all__ = [
+    'GPSPoint',
+    'GPSTrack',
+    'load_gpx',
+    'load_gps_csv',
+    'find_sidecar',
+    'GeoPothole',
+    'PotholeSpatialIndex',
+    'distance_meters'
+]
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Trilhas GPS
+===========
+
+Leitura de trilhas GPS em arquivos auxiliares (sidecar) GPX ou CSV gravados
+junto com o vídeo e interpolação da posição para o tempo de cada frame.
+"""
+
+import csv
+import numpy as np
+from typing import List, Optional, Tuple, Union
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass
+import xml.etree.ElementTree as ET
+
+SIDECAR_EXTENSIONS = ('.gpx', '.csv')
+CSV_TIME_COLUMNS = ('time', 'timestamp', 'datetime', 'seconds', 't')
+CSV_LATITUDE_COLUMNS = ('latitude', 'lat')
+CSV_LONGITUDE_COLUMNS = ('longitude', 'lon', 'lng', 'long')
+
+@dataclass
+class GPSPoint:
+    """Ponto da trilha: tempo em segundos (epoch ou relativo), latitude e longitude em graus"""
+    timestamp: float
+    latitude: float
+    longitude: float
+
+def _parse_time(value: str) -> float:
+    """Segundos a partir de um número ou de uma data ISO 8601"""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value).timestamp()
+
+def load_gpx(path: Union[str, Path]) -> List[GPSPoint]:
+    """Pontos <trkpt> (ou <rtept>/<wpt>) com <time> de um arquivo GPX"""
+    points = []
+    for element in ET.parse(str(path)).getroot().iter():
+        tag = element.tag.rsplit('}', 1)[-1]
+        if tag not in ('trkpt', 'rtept', 'wpt'):
+            continue
+        time_text = next((child.text for child in element if child.tag.rsplit('}', 1)[-1] == 'time'), None)
+        if not time_text:
+            continue
+        points.append(GPSPoint(_parse_time(time_text), float(element.get('lat')), float(element.get('lon'))))
+    return points
+
+def load_gps_csv(path: Union[str, Path]) -> List[GPSPoint]:
+    """CSV com cabeçalho contendo colunas de tempo, latitude e longitude"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        columns = {name.strip().lower(): name for name in reader.fieldnames or []}
+
+        def column(candidates: Tuple[str, ...]) -> str:
+            for candidate in candidates:
+                if candidate in columns:
+                    return columns[candidate]
+            raise ValueError(f"Coluna ausente no CSV de GPS ({'/'.join(candidates)}): {path}")
+
+        time_column = column(CSV_TIME_COLUMNS)
+        lat_column = column(CSV_LATITUDE_COLUMNS)
+        lon_column = column(CSV_LONGITUDE_COLUMNS)
+
+        return [
+            GPSPoint(_parse_time(row[time_column]), float(row[lat_column]), float(row[lon_column]))
+            for row in reader
+            if row.get(time_column) and row.get(lat_column) and row.get(lon_column)
+        ]
+
+def find_sidecar(video_path: Union[str, Path]) -> Optional[Path]:
+    """Arquivo GPX/CSV com o mesmo nome do vídeo, se existir"""
+    video_path = Path(video_path)
+    for extension in SIDECAR_EXTENSIONS:
+        for candidate in (video_path.with_suffix(extension), video_path.with_suffix(extension.upper())):
+            if candidate.exists():
+                return candidate
+    return None
+
+class GPSTrack:
+    """Trilha GPS ordenada no tempo, alinhada ao tempo do vídeo
+
+    O instante 0 do vídeo corresponde ao primeiro ponto da trilha deslocado
+    de time_offset segundos (positivo quando o vídeo começa depois do GPS).
+    Posições fora da trilha só são aceitas até max_gap segundos das pontas.
+    """
+
+    def __init__(self, points: List[GPSPoint], time_offset: float = 0.0, max_gap: float = 5.0,
+                 source: Optional[str] = None):
+        if len(points) < 1:
+            raise ValueError("Trilha GPS vazia")
+
+        points = sorted(points, key=lambda p: p.timestamp)
+        self.source = source
+        self.time_offset = time_offset
+        self.max_gap = max_gap
+        self.start_time = points[0].timestamp
+
+        self._times = np.array([p.timestamp - self.start_time for p in points], dtype=np.float64)
+        self._latitudes = np.array([p.latitude for p in points], dtype=np.float64)
+        self._longitudes = np.array([p.longitude for p in points], dtype=np.float64)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], time_offset: float = 0.0, max_gap: float = 5.0) -> 'GPSTrack':
+        """Carrega GPX ou CSV conforme a extensão"""
+        path = Path(path)
+        if path.suffix.lower() == '.gpx':
+            points = load_gpx(path)
+        elif path.suffix.lower() == '.csv':
+            points = load_gps_csv(path)
+        else:
+            raise ValueError(f"Formato de GPS não suportado: {path.suffix}")
+        return cls(points, time_offset=time_offset, max_gap=max_gap, source=str(path))
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    @property
+    def duration(self) -> float:
+        return float(self._times[-1])
+
+    def position_at(self, video_time: float) -> Optional[Tuple[float, float]]:
+        """(latitude, longitude) interpolada para o tempo do vídeo em segundos"""
+        return self.positions_at(np.array([video_time]))[0]
+
+    def positions_at(self, video_times: np.ndarray) -> List[Optional[Tuple[float, float]]]:
+        """Versão vetorizada de position_at"""
+        times = np.asarray(video_times, dtype=np.float64) + self.time_offset
+        latitudes = np.interp(times, self._times, self._latitudes)
+        longitudes = np.interp(times, self._times, self._longitudes)
+        valid = (times >= -self.max_gap) & (times <= self._times[-1] + self.max_gap)
+
+        return [
+            (float(lat), float(lon)) if ok else None
+            for lat, lon, ok in zip(latitudes, longitudes, valid)
+        ]
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Índice Espacial de Buracos
+==========================
+
+Grade regular em metros (linhas de latitude, colunas de longitude ajustadas
+pelo cosseno da latitude de cada linha) que agrupa observações do mesmo
+buraco vindas de vídeos e passagens diferentes. Cada consulta examina só as
+3x3 células vizinhas, com custo independente do tamanho do índice.
+
+O arquivo do índice é compartilhado entre análises: atualizações devem usar
+PotholeSpatialIndex.locked, que relê e grava o índice sob uma trava
+exclusiva de arquivo.
+"""
+
+import os
+import json
+import math
+import time
+import tempfile
+import logging
+from typing import Dict, Any, List, Optional, Tuple, Iterator
+from pathlib import Path
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+METERS_PER_DEGREE = 111320.0
+INDEX_VERSION = 1
+
+SEVERITY_ORDER = {'low': 1, 'medium': 2, 'high': 3, 'critical': 4}
+
+def distance_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distância aproximada (equiretangular), precisa para separações de poucos quilômetros"""
+    x = math.radians(lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return math.hypot(x, y) * 6371000.0
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Trava exclusiva entre processos no arquivo auxiliar <path>.lock"""
+    lock_path = path.with_name(f"{path.name}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+@dataclass
+class GeoPothole:
+    """Buraco consolidado: posição média das observações e pior severidade vista"""
+    pothole_id: int
+    latitude: float
+    longitude: float
+    observations: int = 0
+    first_seen: float = 0.0
+    last_seen: float = 0.0
+    severity_level: Optional[str] = None
+    max_risk_score: float = 0.0
+    sources: Dict[str, int] = field(default_factory=dict)
+
+class PotholeSpatialIndex:
+    """Índice em grade para deduplicação geográfica de buracos
+
+    Observações a até merge_radius metros de um buraco existente são
+    incorporadas a ele (posição média ponderada pelo número de observações);
+    caso contrário, um novo buraco é criado.
+    """
+
+    def __init__(self, merge_radius: float = 5.0):
+        self.merge_radius = float(merge_radius)
+        self.cell_degrees = self.merge_radius / METERS_PER_DEGREE
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.potholes: Dict[int, GeoPothole] = {}
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self.potholes)
+
+    def _cell(self, latitude: float, longitude: float, row: Optional[int] = None) -> Tuple[int, int]:
+        if row is None:
+            row = math.floor(latitude / self.cell_degrees)
+        row_latitude = (row + 0.5) * self.cell_degrees
+        column_degrees = self.cell_degrees / max(math.cos(math.radians(row_latitude)), 1e-6)
+        return row, math.floor(longitude / column_degrees)
+
+    def _insert(self, pothole: GeoPothole):
+        self._cells.setdefault(self._cell(pothole.latitude, pothole.longitude), []).append(pothole.pothole_id)
+
+    def _remove(self, pothole: GeoPothole):
+        key = self._cell(pothole.latitude, pothole.longitude)
+        members = self._cells.get(key)
+        if members:
+            members.remove(pothole.pothole_id)
+            if not members:
+                del self._cells[key]
+
+    def query(self, latitude: float, longitude: float,
+              radius: Optional[float] = None) -> List[Tuple[GeoPothole, float]]:
+        """Buracos a até radius metros (padrão: merge_radius), ordenados pela distância"""
+        radius = self.merge_radius if radius is None else radius
+        reach = max(int(math.ceil(radius / self.merge_radius)), 1)
+        base_row = math.floor(latitude / self.cell_degrees)
+
+        found = []
+        for row in range(base_row - reach, base_row + reach + 1):
+            _, base_column = self._cell(latitude, longitude, row)
+            for column in range(base_column - reach, base_column + reach + 1):
+                for pothole_id in self._cells.get((row, column), ()):
+                    pothole = self.potholes[pothole_id]
+                    distance = distance_meters(latitude, longitude, pothole.latitude, pothole.longitude)
+                    if distance <= radius:
+                        found.append((pothole, distance))
+
+        found.sort(key=lambda item: item[1])
+        return found
+
+    def nearest(self, latitude: float, longitude: float) -> Optional[Tuple[GeoPothole, float]]:
+        """Buraco mais próximo dentro de merge_radius"""
+        found = self.query(latitude, longitude)
+        return found[0] if found else None
+
+    def add_observation(self, latitude: float, longitude: float, source: Optional[str] = None,
+                        severity_level: Optional[str] = None, risk_score: Optional[float] = None,
+                        timestamp: Optional[float] = None) -> Tuple[GeoPothole, bool]:
+        """Registra uma observação; retorna (buraco, True se incorporada a um existente)"""
+        timestamp = time.time() if timestamp is None else timestamp
+        match = self.nearest(latitude, longitude)
+
+        if match is None:
+            pothole = GeoPothole(
+                pothole_id=self._next_id,
+                latitude=latitude,
+                longitude=longitude,
+                first_seen=timestamp,
+                last_seen=timestamp
+            )
+            self._next_id += 1
+            self.potholes[pothole.pothole_id] = pothole
+            self._insert(pothole)
+            merged = False
+        else:
+            pothole = match[0]
+            weight = pothole.observations
+            self._remove(pothole)
+            pothole.latitude = (pothole.latitude * weight + latitude) / (weight + 1)
+            pothole.longitude = (pothole.longitude * weight + longitude) / (weight + 1)
+            self._insert(pothole)
+            pothole.first_seen = min(pothole.first_seen, timestamp)
+            pothole.last_seen = max(pothole.last_seen, timestamp)
+            merged = True
+
+        pothole.observations += 1
+        if severity_level and SEVERITY_ORDER.get(severity_level, 0) > SEVERITY_ORDER.get(pothole.severity_level, 0):
+            pothole.severity_level = severity_level
+        if risk_score:
+            pothole.max_risk_score = max(pothole.max_risk_score, float(risk_score))
+        if source:
+            pothole.sources[source] = pothole.sources.get(source, 0) + 1
+
+        return pothole, merged
+
+    def save(self, path: str):
+        """Grava o índice em JSON de forma atômica (arquivo temporário + rename)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            'version': INDEX_VERSION,
+            'merge_radius': self.merge_radius,
+            'next_id': self._next_id,
+            'potholes': [asdict(pothole) for pothole in self.potholes.values()]
+        }
+
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=str(path.parent))
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str, merge_radius: Optional[float] = None) -> 'PotholeSpatialIndex':
+        """Carrega um índice salvo; sem arquivo, retorna um índice vazio"""
+        path = Path(path)
+        if not path.exists():
+            return cls(merge_radius if merge_radius is not None else 5.0)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        if payload.get('version') != INDEX_VERSION:
+            raise ValueError(f"Versão de índice espacial incompatível: {payload.get('version')}")
+
+        index = cls(merge_radius if merge_radius is not None else payload['merge_radius'])
+        for data in payload['potholes']:
+            pothole = GeoPothole(**data)
+            index.potholes[pothole.pothole_id] = pothole
+            index._insert(pothole)
+        index._next_id = max(payload.get('next_id', 0), max(index.potholes, default=-1) + 1)
+        return index
+
+    @classmethod
+    @contextmanager
+    def locked(cls, path: str, merge_radius: Optional[float] = None) -> Iterator['PotholeSpatialIndex']:
+        """Carrega o índice sob trava exclusiva e o grava ao sair sem erro
+
+        Análises concorrentes são serializadas, e cada uma parte do índice
+        gravado pela anterior em vez de sobrescrevê-lo.
+        """
+        path = Path(path)
+        with file_lock(path):
+            index = cls.load(str(path), merge_radius)
+            yield index
+            index.save(str(path))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Número de buracos, células ocupadas e observações"""
+        return {
+            'potholes': len(self.potholes),
+            'cells': len(self._cells),
+            'observations': sum(p.observations for p in self.potholes.values()),
+            'merge_radius': self.merge_radius
+        }
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Cache de OCR por Hash Perceptual
+================================
+
+Evita repetir o OCR do mesmo recorte (a mesma placa em frames seguidos,
+em detecções sobrepostas de detectores diferentes ou em uploads repetidos).
+A chave é um hash de diferenças (dHash) do recorte normalizado em tons de
+cinza; recortes cujos hashes diferem em até max_distance bits são
+considerados iguais. A remoção é LRU.
+"""
+
+import cv2
+import numpy as np
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Tuple
+
+from dataclasses import replace
+
+# Número de bits 1 de cada byte (distância de Hamming sobre hashes empacotados)
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint16)
+
+def crop_dhash(crop: np.ndarray, hash_shape: Tuple[int, int] = (8, 32)) -> np.ndarray:
+    """dHash do recorte: sinal do gradiente horizontal em uma grade (altura, largura), empacotado em bytes"""
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    rows, columns = hash_shape
+    small = cv2.resize(gray, (columns + 1, rows), interpolation=cv2.INTER_AREA).astype(np.int16)
+    return np.packbits(small[:, 1:] > small[:, :-1])
+
+class CropResultCache:
+    """Cache LRU de TextResult indexado pelo hash perceptual do recorte"""
+
+    def __init__(self, max_entries: int = 2048, max_distance: int = 6, hash_shape: Tuple[int, int] = (8, 32)):
+        self.max_entries = max(int(max_entries), 1)
+        self.max_distance = int(max_distance)
+        self.hash_shape = tuple(hash_shape)
+        self._lock = threading.Lock()
+
+        hash_bytes = (self.hash_shape[0] * self.hash_shape[1] + 7) // 8
+        self._hashes = np.zeros((self.max_entries, hash_bytes), dtype=np.uint8)
+        self._valid = np.zeros(self.max_entries, dtype=bool)
+        self._entries: 'OrderedDict[bytes, Tuple[int, Any]]' = OrderedDict()
+        self._free_slots = list(range(self.max_entries - 1, -1, -1))
+
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def hash_crop(self, crop: np.ndarray) -> np.ndarray:
+        return crop_dhash(crop, self.hash_shape)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, crop_hash: np.ndarray):
+        """TextResult em cache para o hash exato ou o mais próximo até max_distance bits"""
+        key = crop_hash.tobytes()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self.max_distance > 0 and self._entries:
+                distances = _POPCOUNT[np.bitwise_xor(self._hashes, crop_hash)].sum(axis=1)
+                distances[~self._valid] = np.iinfo(np.uint16).max
+                slot = int(np.argmin(distances))
+                if distances[slot] <= self.max_distance:
+                    key = self._hashes[slot].tobytes()
+                    entry = self._entries[key]
+                    self.near_hits += 1
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, crop_hash: np.ndarray, result):
+        """Armazena o resultado, removendo o menos usado recentemente se o cache estiver cheio"""
+        key = crop_hash.tobytes()
+        result = replace(result, processing_time=0.0)
+        with self._lock:
+            if key in self._entries:
+                slot, _ = self._entries[key]
+                self._entries[key] = (slot, result)
+                self._entries.move_to_end(key)
+                return
+
+            if not self._free_slots:
+                _, (slot, _) = self._entries.popitem(last=False)
+                self._valid[slot] = False
+                self._free_slots.append(slot)
+                self.evictions += 1
+
+            slot = self._free_slots.pop()
+            self._hashes[slot] = crop_hash
+            self._valid[slot] = True
+            self._entries[key] = (slot, result)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._valid[:] = False
+            self._free_slots = list(range(self.max_entries - 1, -1, -1))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Ocupação, acertos (exatos e por proximidade), falhas e taxa de acerto"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'max_distance': self.max_distance,
+            'hits': self.hits,
+            'near_hits': self.near_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
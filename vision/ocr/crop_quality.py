@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Filtro de Qualidade de Recortes para OCR
+========================================
+
+Verificação barata, antes do OCR, que descarta recortes pequenos demais,
+borrados (variância do Laplaciano) ou mal expostos (histograma saturado ou
+sem contraste). Recortes descartados são registrados com o motivo para que
+o chamador possa tentar novamente em um frame melhor.
+"""
+
+import cv2
+import numpy as np
+from typing import Dict, List, Any, Optional
+from dataclasses import dataclass
+
+TOO_SMALL = "too_small"
+BLURRED = "blurred"
+UNDEREXPOSED = "underexposed"
+OVEREXPOSED = "overexposed"
+LOW_CONTRAST = "low_contrast"
+
+# Altura para a qual o recorte é reduzido antes das medidas (torna a nitidez comparável entre tamanhos)
+MEASURE_HEIGHT = 32
+
+@dataclass
+class CropQuality:
+    """Medidas do recorte e resultado do filtro"""
+    passed: bool
+    reason: Optional[str]
+    height: int
+    sharpness: float
+    dark_fraction: float
+    bright_fraction: float
+    contrast: float
+
+def measure_crop(crop: np.ndarray) -> Dict[str, float]:
+    """Altura, nitidez, frações saturadas (<=10, >=245) e contraste (p95 - p5) do recorte"""
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    height, width = gray.shape[:2]
+    if height > MEASURE_HEIGHT:
+        small = cv2.resize(gray, (max(int(round(width * MEASURE_HEIGHT / height)), 1), MEASURE_HEIGHT),
+                           interpolation=cv2.INTER_AREA)
+    else:
+        small = gray
+
+    histogram = np.bincount(small.ravel(), minlength=256).astype(np.float64)
+    cumulative = np.cumsum(histogram) / max(histogram.sum(), 1.0)
+    p5 = int(np.searchsorted(cumulative, 0.05))
+    p95 = int(np.searchsorted(cumulative, 0.95))
+
+    return {
+        'height': float(height),
+        'sharpness': float(cv2.Laplacian(small, cv2.CV_64F).var()),
+        'dark_fraction': float(cumulative[10]),
+        'bright_fraction': float(1.0 - cumulative[244]),
+        'contrast': float(p95 - p5)
+    }
+
+class CropQualityGate:
+    """Filtro de qualidade com limites configuráveis"""
+
+    def __init__(self, min_height: int = 12, min_sharpness: float = 30.0,
+                 max_clipped_fraction: float = 0.6, min_contrast: float = 25.0):
+        self.min_height = min_height
+        self.min_sharpness = min_sharpness
+        self.max_clipped_fraction = max_clipped_fraction
+        self.min_contrast = min_contrast
+
+        self.checked = 0
+        self.rejections: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'CropQualityGate':
+        """Limites a partir das chaves gate_* da configuração de OCR"""
+        return cls(
+            min_height=config.get('gate_min_height', 12),
+            min_sharpness=config.get('gate_min_sharpness', 30.0),
+            max_clipped_fraction=config.get('gate_max_clipped_fraction', 0.6),
+            min_contrast=config.get('gate_min_contrast', 25.0)
+        )
+
+    def assess(self, crop: np.ndarray) -> CropQuality:
+        metrics = measure_crop(crop)
+
+        reason = None
+        if metrics['height'] < self.min_height:
+            reason = TOO_SMALL
+        elif metrics['dark_fraction'] > self.max_clipped_fraction:
+            reason = UNDEREXPOSED
+        elif metrics['bright_fraction'] > self.max_clipped_fraction:
+            reason = OVEREXPOSED
+        elif metrics['contrast'] < self.min_contrast:
+            reason = LOW_CONTRAST
+        elif metrics['sharpness'] < self.min_sharpness:
+            reason = BLURRED
+
+        self.checked += 1
+        if reason:
+            self.rejections[reason] = self.rejections.get(reason, 0) + 1
+
+        return CropQuality(
+            passed=reason is None,
+            reason=reason,
+            height=int(metrics['height']),
+            sharpness=metrics['sharpness'],
+            dark_fraction=metrics['dark_fraction'],
+            bright_fraction=metrics['bright_fraction'],
+            contrast=metrics['contrast']
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        rejected = sum(self.rejections.values())
+        return {
+            'checked': self.checked,
+            'rejected': rejected,
+            'rejection_rate': rejected / self.checked if self.checked else 0.0,
+            'reasons': dict(self.rejections)
+        }
+
+def calibrate_quality_gate(readable: List[np.ndarray], unreadable: List[np.ndarray],
+                           keep_ratio: float = 0.95) -> Dict[str, Any]:
+    """Sugere limites gate_* a partir de recortes lidos corretamente e incorretamente
+
+    Cada limite é o maior (ou menor, para saturação) valor que ainda mantém
+    keep_ratio dos recortes legíveis; informa também a fração dos ilegíveis
+    que seria descartada com os limites sugeridos.
+    """
+    if not readable:
+        raise ValueError("São necessários recortes legíveis para calibrar o filtro")
+
+    good = [measure_crop(crop) for crop in readable]
+    bad = [measure_crop(crop) for crop in unreadable]
+    drop = (1.0 - keep_ratio) * 100
+
+    def lower_bound(name: str) -> float:
+        return float(np.percentile([m[name] for m in good], drop))
+
+    clipped = [max(m['dark_fraction'], m['bright_fraction']) for m in good]
+
+    # Arredondamento sempre para o lado permissivo, para não descartar o próprio recorte do limite
+    thresholds = {
+        'gate_min_height': int(lower_bound('height')),
+        'gate_min_sharpness': float(np.floor(lower_bound('sharpness') * 100) / 100),
+        'gate_max_clipped_fraction': float(min(np.ceil(np.percentile(clipped, 100 - drop) * 1000) / 1000, 1.0)),
+        'gate_min_contrast': float(np.floor(lower_bound('contrast') * 100) / 100)
+    }
+
+    gate = CropQualityGate.from_config(thresholds)
+    good_kept = sum(gate.assess(crop).passed for crop in readable) / len(readable)
+    bad_rejected = sum(not gate.assess(crop).passed for crop in unreadable) / len(unreadable) if unreadable else 0.0
+
+    return {
+        'thresholds': thresholds,
+        'readable_kept': good_kept,
+        'unreadable_rejected': bad_rejected,
+        'samples': {'readable': len(readable), 'unreadable': len(unreadable)}
+    }
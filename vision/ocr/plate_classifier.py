@@ -1,121 +1,290 @@
+#!/usr/bin/env python3
+"""
+Classificador de Placas Brasileiras
+===================================
+
+Normalização em lote de leituras OCR de placas: limpeza, correção de
+confusões por posição (O↔0, I↔1, B↔8, ...) conforme o tipo de cada posição
+nos formatos Mercosul (AAA0A00) e convencional (AAA-0000), validação e
+classificação em uma única passada por leitura. Estado e cidade são
+identificados no texto de contexto (faixas da placa) por uma trie.
+"""
 
 import re
+import unicodedata
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Iterable, Any
 from dataclasses import dataclass
 
+from .plate_grammar import PLATE_PATTERNS, PLATE_TEMPLATES, MERCOSUL, LEGACY, normalize_plate
+
 logger = logging.getLogger(__name__)
 
+MERCOSUL_TYPE = "mercosul"
+CONVENTIONAL_TYPE = "convencional"
+UNKNOWN_TYPE = "desconhecido"
+
+PLATE_LENGTH = 7
+
+_PLATE_TYPES = {MERCOSUL: MERCOSUL_TYPE, LEGACY: CONVENTIONAL_TYPE}
+
+# Confusões comuns do OCR: dígito lido em posição de letra e vice-versa
+_DIGIT_TO_LETTER = {'0': 'O', '1': 'I', '8': 'B', '5': 'S', '2': 'Z', '6': 'G', '4': 'A', '7': 'T'}
+_LETTER_TO_DIGIT = {'O': '0', 'Q': '0', 'D': '0', 'I': '1', 'L': '1', 'B': '8', 'S': '5', 'Z': '2', 'G': '6'}
+
+_TO_LETTER = str.maketrans(_DIGIT_TO_LETTER)
+_TO_DIGIT = str.maketrans(_LETTER_TO_DIGIT)
+_NON_WORD = re.compile(r'[^A-Z0-9 ]')
+_SPACES = re.compile(r'\s+')
+
+# Penalidade de confiança por caractere corrigido; leituras com mais trocas que o limite são rejeitadas
+CORRECTION_PENALTY = 0.05
+MAX_CORRECTIONS = 2
+
+ESTADOS = {
+    'AC': 'Acre', 'AL': 'Alagoas', 'AP': 'Amapá', 'AM': 'Amazonas',
+    'BA': 'Bahia', 'CE': 'Ceará', 'DF': 'Distrito Federal',
+    'ES': 'Espírito Santo', 'GO': 'Goiás', 'MA': 'Maranhão',
+    'MT': 'Mato Grosso', 'MS': 'Mato Grosso do Sul', 'MG': 'Minas Gerais',
+    'PA': 'Pará', 'PB': 'Paraíba', 'PR': 'Paraná', 'PE': 'Pernambuco',
+    'PI': 'Piauí', 'RJ': 'Rio de Janeiro', 'RN': 'Rio Grande do Norte',
+    'RS': 'Rio Grande do Sul', 'RO': 'Rondônia', 'RR': 'Roraima',
+    'SC': 'Santa Catarina', 'SP': 'São Paulo', 'SE': 'Sergipe',
+    'TO': 'Tocantins'
+}
+
+CIDADES_ESTADOS = {
+    'CAMPO GRANDE': 'MS',
+    'SAO PAULO': 'SP', 'SANTOS': 'SP', 'CAMPINAS': 'SP',
+    'RIO DE JANEIRO': 'RJ', 'NITEROI': 'RJ',
+    'BELO HORIZONTE': 'MG', 'UBERLANDIA': 'MG',
+    'BRASILIA': 'DF',
+    'CURITIBA': 'PR', 'LONDRINA': 'PR',
+    'PORTO ALEGRE': 'RS', 'CAXIAS DO SUL': 'RS',
+    'SALVADOR': 'BA', 'FEIRA DE SANTANA': 'BA',
+    'FORTALEZA': 'CE', 'SOBRAL': 'CE',
+    'RECIFE': 'PE', 'OLINDA': 'PE',
+    'GOIANIA': 'GO', 'ANAPOLIS': 'GO'
+}
+
 @dataclass
 class PlateInfo:
-    
+    """Placa normalizada e classificada"""
+    number: Optional[str]
+    type: str
+    state: Optional[str]
+    city: Optional[str]
+    confidence: float
+    pattern_match: bool
+    raw_text: str = ''
+    corrections: int = 0
+
+def strip_accents(text: str) -> str:
+    """Maiúsculas sem acentos (SÃO PAULO -> SAO PAULO)"""
+    decomposed = unicodedata.normalize('NFKD', text.upper())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+def _correct(candidate: str, kind: str) -> Tuple[str, int]:
+    """Aplica as correções de confusão conforme o tipo de cada posição; retorna o texto e o número de trocas"""
+    slots = PLATE_TEMPLATES[kind]
+    corrected = ''.join(
+        char.translate(_TO_LETTER) if slot == 'L' else char.translate(_TO_DIGIT)
+        for char, slot in zip(candidate, slots)
+    )
+    return corrected, sum(a != b for a, b in zip(candidate, corrected))
+
+def _best_reading(window: str) -> Optional[Tuple[str, str, int]]:
+    """Melhor interpretação de 7 caracteres: (formato, placa, correções) com menos trocas, ou None"""
+    best = None
+    for kind, pattern in PLATE_PATTERNS.items():
+        corrected, corrections = _correct(window, kind)
+        if corrections > MAX_CORRECTIONS:
+            continue
+        if pattern.fullmatch(corrected) and (best is None or corrections < best[2]):
+            best = (kind, corrected, corrections)
+    return best
+
+def normalize_plate_text(raw_text: str) -> Optional[Tuple[str, str, int]]:
+    """(formato, placa, correções) da leitura, procurando a janela de 7 caracteres com menos correções"""
+    text = normalize_plate(raw_text)
+    if len(text) == PLATE_LENGTH:
+        return _best_reading(text)
+
+    best = None
+    for start in range(len(text) - PLATE_LENGTH + 1):
+        reading = _best_reading(text[start:start + PLATE_LENGTH])
+        if reading is not None and (best is None or reading[2] < best[2]):
+            best = reading
+            if reading[2] == 0:
+                break
+    return best
+
+def format_number(kind: str, plate: str) -> str:
+    return f"{plate[:3]}-{plate[3:]}" if kind == LEGACY else plate
+
+class PlaceTrie:
+    """Trie de nomes de lugares (estados e cidades) para busca por palavras em uma passada"""
+
     def __init__(self):
-        self.estados = {
-            'AC': 'Acre', 'AL': 'Alagoas', 'AP': 'Amapá', 'AM': 'Amazonas',
-            'BA': 'Bahia', 'CE': 'Ceará', 'DF': 'Distrito Federal', 
-            'ES': 'Espírito Santo', 'GO': 'Goiás', 'MA': 'Maranhão',
-            'MT': 'Mato Grosso', 'MS': 'Mato Grosso do Sul', 'MG': 'Minas Gerais',
-            'PA': 'Pará', 'PB': 'Paraíba', 'PR': 'Paraná', 'PE': 'Pernambuco',
-            'PI': 'Piauí', 'RJ': 'Rio de Janeiro', 'RN': 'Rio Grande do Norte',
-            'RS': 'Rio Grande do Sul', 'RO': 'Rondônia', 'RR': 'Roraima',
-            'SC': 'Santa Catarina', 'SP': 'São Paulo', 'SE': 'Sergipe',
-            'TO': 'Tocantins'
-        }
-        
-        self.pattern_mercosul = re.compile(r'^[A-Z]{3}[0-9][A-Z][0-9]{2}$')
-        self.pattern_convencional = re.compile(r'^[A-Z]{3}[-\s]?[0-9]{4}$')
-        
-        self.cidades_estados = {
-            'CAMPO GRANDE': 'MS',
-            'SAO PAULO': 'SP', 'SANTOS': 'SP', 'CAMPINAS': 'SP',
-            'RIO DE JANEIRO': 'RJ', 'NITEROI': 'RJ',
-            'BELO HORIZONTE': 'MG', 'UBERLANDIA': 'MG',
-            'BRASILIA': 'DF',
-            'CURITIBA': 'PR', 'LONDRINA': 'PR',
-            'PORTO ALEGRE': 'RS', 'CAXIAS DO SUL': 'RS',
-            'SALVADOR': 'BA', 'FEIRA DE SANTANA': 'BA',
-            'FORTALEZA': 'CE', 'SOBRAL': 'CE',
-            'RECIFE': 'PE', 'OLINDA': 'PE',
-            'GOIANIA': 'GO', 'ANAPOLIS': 'GO'
-        }
+        self.root: Dict[str, Any] = {}
+
+    def insert(self, name: str, value: Tuple[str, Optional[str]]):
+        node = self.root
+        for char in name:
+            node = node.setdefault(char, {})
+        node[None] = value
+
+    def find_all(self, text: str) -> List[Tuple[str, Optional[str]]]:
+        """Valores dos nomes mais longos encontrados no texto, começando e terminando em limites de palavra"""
+        found = []
+        length = len(text)
+        start = 0
+        while start < length:
+            node = self.root
+            match = None
+            match_end = start
+            position = start
+            while position < length and text[position] in node:
+                node = node[text[position]]
+                position += 1
+                if None in node and (position == length or text[position] == ' '):
+                    match, match_end = node[None], position
+            if match is not None:
+                found.append(match)
+                start = match_end + 1
+            else:
+                next_space = text.find(' ', start)
+                start = length if next_space < 0 else next_space + 1
+        return found
+
+class PlateClassifier:
+    """Normalização, validação e classificação de leituras de placas"""
+
+    def __init__(self, correction_penalty: float = CORRECTION_PENALTY):
+        self.estados = ESTADOS
+        self.cidades_estados = CIDADES_ESTADOS
+        self.correction_penalty = correction_penalty
+
+        # Cidades, códigos e nomes de estados (sem acento) em uma única trie
+        self.places = PlaceTrie()
+        for code, name in self.estados.items():
+            self.places.insert(code, (code, None))
+            self.places.insert(strip_accents(name), (code, None))
+        for city, state in self.cidades_estados.items():
+            self.places.insert(city, (state, city))
 
     def clean_text(self, text: str) -> str:
-        text = self.clean_text(text)
-        
-        mercosul_match = re.search(r'([A-Z]{3}[0-9][A-Z][0-9]{2})', text)
-        if mercosul_match:
-            return mercosul_match.group(1)
-        
-        conv_match = re.search(r'([A-Z]{3})[-\s]*([0-9]{4})', text)
-        if conv_match:
-            return f"{conv_match.group(1)}-{conv_match.group(2)}"
-        
-        generic_match = re.search(r'([A-Z]{2,3}[-\s]*[0-9A-Z]{3,4})', text)
-        if generic_match:
-            return generic_match.group(1)
-        
-        return None
+        """Maiúsculas, sem acentos, apenas letras, dígitos e espaços simples"""
+        return _SPACES.sub(' ', _NON_WORD.sub(' ', strip_accents(text))).strip()
+
+    def normalize_batch(self, texts: Iterable[str], confidences: Optional[Iterable[float]] = None) -> List[PlateInfo]:
+        """Normaliza, valida e classifica cada leitura; leituras inválidas saem com number=None"""
+        texts = list(texts)
+        confidences = [1.0] * len(texts) if confidences is None else list(confidences)
+        penalty = self.correction_penalty
+
+        results = []
+        for raw_text, confidence in zip(texts, confidences):
+            reading = normalize_plate_text(raw_text)
+            if reading is None:
+                results.append(PlateInfo(None, UNKNOWN_TYPE, None, None, 0.0, False, raw_text, 0))
+                continue
+
+            kind, plate, corrections = reading
+            results.append(PlateInfo(
+                number=format_number(kind, plate),
+                type=_PLATE_TYPES[kind],
+                state=None,
+                city=None,
+                confidence=max(confidence * (1.0 - penalty * corrections), 0.0),
+                pattern_match=corrections == 0,
+                raw_text=raw_text,
+                corrections=corrections
+            ))
+        return results
+
+    def extract_plate_number(self, text: str) -> Optional[str]:
+        """Número da placa na grafia oficial, ou None"""
+        reading = normalize_plate_text(text)
+        return format_number(reading[0], reading[1]) if reading else None
 
     def identify_plate_type(self, plate_number: str) -> str:
-        text_upper = text.upper()
-        
-        for cidade, estado in self.cidades_estados.items():
-            if cidade in text_upper:
-                return estado
-        
-        return None
+        reading = normalize_plate_text(plate_number)
+        return _PLATE_TYPES[reading[0]] if reading else UNKNOWN_TYPE
 
     def identify_state_from_text(self, text: str) -> Optional[str]:
+        places = self.places.find_all(self.clean_text(text))
+        return places[0][0] if places else None
+
+    def identify_state_from_city(self, text: str) -> Optional[str]:
+        cities = [place for place in self.places.find_all(self.clean_text(text)) if place[1]]
+        return cities[0][0] if cities else None
+
+    def extract_context(self, all_texts: List[str]) -> Dict[str, Any]:
+        """Estado, cidade e demais textos encontrados nas leituras"""
         context = {
             'state': None,
             'city': None,
             'additional_info': []
         }
-        
+
         for text in all_texts:
             text_clean = self.clean_text(text)
-            
-            if not context['state']:
-                context['state'] = self.identify_state_from_text(text_clean)
-            
-            city_found = self.identify_state_from_city(text_clean)
-            if city_found and not context['city']:
-                for cidade, estado in self.cidades_estados.items():
-                    if cidade in text_clean.upper():
-                        context['city'] = cidade
-                        break
-            
+
+            for state, city in self.places.find_all(text_clean):
+                if city and not context['city']:
+                    context['city'] = city
+                    context['state'] = state
+                elif not context['state']:
+                    context['state'] = state
+
             if len(text_clean) > 3 and text_clean not in context['additional_info']:
                 context['additional_info'].append(text_clean)
-        
+
         return context
 
     def classify_plate(self, ocr_results: List[Dict]) -> PlateInfo:
+        """Placa de maior confiança entre as leituras OCR, com estado e cidade do contexto"""
+        texts = [result.get('text', '') for result in ocr_results]
+        candidates = self.normalize_batch(texts, [result.get('confidence', 0.0) for result in ocr_results])
+        valid = [candidate for candidate in candidates if candidate.number]
+
+        if valid:
+            plate_info = max(valid, key=lambda candidate: candidate.confidence)
+        else:
+            plate_info = PlateInfo(None, UNKNOWN_TYPE, None, None, 0.0, False, ' '.join(texts), 0)
+
+        context = self.extract_context(texts)
+        plate_info.state = context['state']
+        plate_info.city = context['city']
+        return plate_info
+
+    def get_plate_details(self, plate_info: PlateInfo) -> Dict[str, str]:
         details = {
             'numero': plate_info.number,
             'tipo': plate_info.type,
             'confianca': f"{plate_info.confidence:.1%}",
             'padrao_valido': "Sim" if plate_info.pattern_match else "Não"
         }
-        
+
         if plate_info.state:
             details['estado'] = f"{plate_info.state} ({self.estados.get(plate_info.state, 'Desconhecido')})"
         else:
             details['estado'] = "Não identificado"
-        
+
         if plate_info.city:
             details['cidade'] = plate_info.city
-        
-        if plate_info.type == "mercosul":
+
+        if plate_info.type == MERCOSUL_TYPE:
             details['formato'] = "Mercosul (ABC1D23)"
             details['caracteristicas'] = "Padrão atual brasileiro desde 2018"
-        elif plate_info.type == "convencional":
+        elif plate_info.type == CONVENTIONAL_TYPE:
             details['formato'] = "Convencional (ABC-1234)"
             details['caracteristicas'] = "Padrão brasileiro até 2018"
         else:
             details['formato'] = "Não identificado"
             details['caracteristicas'] = "Formato não reconhecido"
-        
+
         return details
 
 plate_classifier = PlateClassifier()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Gramática de Placas Brasileiras
+===============================
+
+Validação do texto lido contra os formatos de placa brasileiros: Mercosul
+(AAA0A00) e o padrão anterior (AAA-0000), e o tipo (letra ou dígito) de
+cada posição nos dois formatos. O texto é normalizado antes da
+comparação (maiúsculas, sem separadores).
+"""
+
+import re
+from typing import Optional
+
+MERCOSUL = "mercosul"
+LEGACY = "legacy"
+
+_NON_ALNUM = re.compile(r'[^A-Z0-9]')
+
+# Tipo de cada posição: L = letra, D = dígito
+PLATE_TEMPLATES = {
+    MERCOSUL: "LLLDLDD",
+    LEGACY: "LLLDDDD"
+}
+
+PLATE_PATTERNS = {
+    MERCOSUL: re.compile(r'[A-Z]{3}[0-9][A-Z][0-9]{2}'),
+    LEGACY: re.compile(r'[A-Z]{3}[0-9]{4}')
+}
+
+def normalize_plate(text: str) -> str:
+    """Maiúsculas, apenas letras e dígitos"""
+    return _NON_ALNUM.sub('', text.upper())
+
+def plate_format(text: str) -> Optional[str]:
+    """Formato da placa (MERCOSUL ou LEGACY) ou None se o texto não for uma placa válida"""
+    plate = normalize_plate(text)
+    for name, pattern in PLATE_PATTERNS.items():
+        if pattern.fullmatch(plate):
+            return name
+    return None
+
+def is_valid_plate(text: str) -> bool:
+    return plate_format(text) is not None
+
+def format_plate(text: str) -> Optional[str]:
+    """Placa na grafia oficial (AAA0A00 ou AAA-0000) ou None se inválida"""
+    plate = normalize_plate(text)
+    kind = plate_format(plate)
+    if kind == LEGACY:
+        return f"{plate[:3]}-{plate[3:]}"
+    return plate if kind else None
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Lista de Placas Monitoradas
+===========================
+
+Confronta cada leitura de placa com listas de centenas de milhares de
+placas, tolerando até dois caracteres errados pelo OCR.
+
+As placas têm sempre 7 caracteres após a normalização, então o erro do OCR
+é uma substituição e a distância é a de Hamming. O índice divide as
+posições em 4 blocos; com até 2 posições erradas, pelo menos 2 blocos
+ficam intactos, e basta indexar os 6 pares de blocos. Os pares ficam em um
+único vetor ordenado de chaves inteiras: a consulta é uma busca binária
+pelos 6 pares e uma comparação vetorizada dos poucos candidatos.
+
+Placas do padrão anterior e suas versões Mercosul (ABC1234 -> ABC1C34) são
+comparadas na forma Mercosul, de modo que uma lista com a placa antiga
+também encontra o veículo já convertido.
+"""
+
+import re
+import logging
+import threading
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+from dataclasses import dataclass
+
+from .plate_grammar import normalize_plate, plate_format
+
+logger = logging.getLogger(__name__)
+
+PLATE_LENGTH = 7
+MAX_DISTANCE = 2
+
+_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_BASE = len(_ALPHABET)
+_CODES = np.zeros(256, dtype=np.uint8)
+_CODES[np.frombuffer(_ALPHABET.encode(), dtype=np.uint8)] = np.arange(_BASE, dtype=np.uint8)
+
+# Blocos de posições; as posições de cada bloco se alternam entre letras e dígitos para espalhar as chaves
+_BLOCKS = [(0, 5), (1, 6), (2, 3), (4,)]
+_PAIRS = [(a, b) for a in range(len(_BLOCKS)) for b in range(a + 1, len(_BLOCKS))]
+
+def _pair_weights() -> np.ndarray:
+    """Matriz (pares, posições) que transforma os códigos da placa na chave inteira de cada par"""
+    weights = np.zeros((len(_PAIRS), PLATE_LENGTH), dtype=np.int64)
+    for row, (a, b) in enumerate(_PAIRS):
+        for power, position in enumerate(_BLOCKS[a] + _BLOCKS[b]):
+            weights[row, position] = _BASE ** power
+    return weights
+
+_PAIR_WEIGHTS = _pair_weights()
+_PAIR_OFFSETS = np.arange(len(_PAIRS), dtype=np.int64) * _BASE ** 4
+
+_FIELD_SEPARATOR = re.compile(r'[,;\t]')
+
+def canonical_plate(text: str) -> Optional[str]:
+    """Forma de comparação: normalizada e, no padrão anterior, convertida para Mercosul; None se não tiver 7 caracteres"""
+    plate = normalize_plate(text)
+    if len(plate) != PLATE_LENGTH:
+        return None
+    if plate[4].isdigit():
+        plate = plate[:4] + chr(ord('A') + int(plate[4])) + plate[5:]
+    return plate
+
+def _encode(plates: List[str]) -> np.ndarray:
+    if not plates:
+        return np.zeros((0, PLATE_LENGTH), dtype=np.uint8)
+    raw = np.frombuffer(''.join(plates).encode('ascii'), dtype=np.uint8)
+    return _CODES[raw].reshape(len(plates), PLATE_LENGTH)
+
+@dataclass
+class HotlistMatch:
+    """Placa da lista encontrada para uma leitura"""
+    plate: str
+    distance: int
+    info: str
+    query: str
+
+class PlateHotlistIndex:
+    """Índice imutável de uma lista de placas para busca com até MAX_DISTANCE substituições"""
+
+    def __init__(self, entries: Iterable[Tuple[str, str]]):
+        self.plates: List[str] = []
+        self.infos: List[str] = []
+        self._exact: Dict[str, int] = {}
+        self.invalid = 0
+        self.duplicates = 0
+
+        canonical = []
+        for plate, info in entries:
+            key = canonical_plate(plate)
+            if key is None or plate_format(plate) is None:
+                self.invalid += 1
+                continue
+            if key in self._exact:
+                self.duplicates += 1
+                continue
+            self._exact[key] = len(self.plates)
+            self.plates.append(plate.strip().upper())
+            self.infos.append(info)
+            canonical.append(key)
+
+        self._codes = _encode(canonical)
+        keys = (self._codes.astype(np.int64) @ _PAIR_WEIGHTS.T + _PAIR_OFFSETS).T.ravel()
+        ids = np.tile(np.arange(len(canonical), dtype=np.int32), len(_PAIRS))
+        order = np.argsort(keys, kind='stable')
+        self._keys = keys[order]
+        self._ids = ids[order]
+
+    @classmethod
+    def from_file(cls, path: str) -> 'PlateHotlistIndex':
+        """Uma placa por linha, com descrição opcional após ',', ';' ou tab; linhas com # são ignoradas"""
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                fields = _FIELD_SEPARATOR.split(line, maxsplit=1)
+                entries.append((fields[0], fields[1].strip() if len(fields) > 1 else ''))
+        return cls(entries)
+
+    def __len__(self) -> int:
+        return len(self.plates)
+
+    def __contains__(self, plate: str) -> bool:
+        key = canonical_plate(plate)
+        return key is not None and key in self._exact
+
+    def match(self, plate: str, max_distance: int = MAX_DISTANCE) -> List[HotlistMatch]:
+        """Placas da lista a até max_distance substituições da leitura, da mais próxima à mais distante"""
+        if max_distance > MAX_DISTANCE:
+            raise ValueError(f"O índice suporta no máximo {MAX_DISTANCE} substituições")
+
+        key = canonical_plate(plate)
+        if key is None or not self.plates:
+            return []
+
+        exact = self._exact.get(key)
+        if max_distance <= 0:
+            return [HotlistMatch(self.plates[exact], 0, self.infos[exact], plate)] if exact is not None else []
+
+        code = _CODES[np.frombuffer(key.encode('ascii'), dtype=np.uint8)]
+        pair_keys = _PAIR_WEIGHTS @ code + _PAIR_OFFSETS
+        bounds = np.searchsorted(self._keys, np.concatenate([pair_keys, pair_keys + 1])).tolist()
+        count = len(_PAIRS)
+        candidates = np.concatenate([self._ids[bounds[i]:bounds[i + count]] for i in range(count)])
+
+        distances = np.count_nonzero(self._codes[candidates] != code, axis=1)
+        close = np.flatnonzero(distances <= max_distance)
+
+        # Um candidato aparece uma vez por par de blocos intacto
+        found = sorted({(int(distances[i]), int(candidates[i])) for i in close.tolist()})
+        return [HotlistMatch(self.plates[index], distance, self.infos[index], plate) for distance, index in found]
+
+    def match_batch(self, plates: Iterable[str], max_distance: int = MAX_DISTANCE) -> List[List[HotlistMatch]]:
+        return [self.match(plate, max_distance) for plate in plates]
+
+class PlateHotlist:
+    """Lista monitorada carregada de arquivo, recarregada em segundo plano sem bloquear as consultas
+
+    O novo índice é construído fora do caminho das consultas e trocado por
+    uma única atribuição; consultas em andamento terminam no índice antigo.
+    O arquivo só é relido quando o tamanho ou a data de modificação mudam.
+    """
+
+    def __init__(self, path: str, max_distance: int = MAX_DISTANCE, reload_interval: Optional[float] = None):
+        self.path = Path(path)
+        self.max_distance = max_distance
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._reload_lock = threading.Lock()
+        self._reload_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.reloads = 0
+        self.reload_errors = 0
+        self.last_reload_time = 0.0
+        self.queries = 0
+        self.hits = 0
+
+        self._signature = self._file_signature()
+        self._index = PlateHotlistIndex.from_file(str(self.path))
+        self.loaded_at = time.time()
+
+        if reload_interval:
+            threading.Thread(target=self._watch, args=(reload_interval,), name="HotlistWatcher", daemon=True).start()
+
+    @property
+    def index(self) -> PlateHotlistIndex:
+        return self._index
+
+    def _file_signature(self) -> Tuple[int, int]:
+        stat = self.path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def match(self, plate: str, max_distance: Optional[int] = None) -> List[HotlistMatch]:
+        matches = self._index.match(plate, self.max_distance if max_distance is None else max_distance)
+        self.queries += 1
+        if matches:
+            self.hits += 1
+        return matches
+
+    def match_batch(self, plates: Iterable[str], max_distance: Optional[int] = None) -> List[List[HotlistMatch]]:
+        index = self._index
+        distance = self.max_distance if max_distance is None else max_distance
+        results = [index.match(plate, distance) for plate in plates]
+        self.queries += len(results)
+        self.hits += sum(1 for matches in results if matches)
+        return results
+
+    def reload(self, wait: bool = False, force: bool = False) -> bool:
+        """Reconstrói o índice em uma thread se o arquivo mudou; retorna True se uma recarga foi iniciada"""
+        with self._reload_lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                thread = self._reload_thread
+            else:
+                try:
+                    signature = self._file_signature()
+                except OSError as e:
+                    self.logger.error(f"Lista de placas inacessível: {e}")
+                    return False
+                if signature == self._signature and not force:
+                    return False
+
+                thread = threading.Thread(target=self._rebuild, args=(signature,), name="HotlistReload", daemon=True)
+                self._reload_thread = thread
+                thread.start()
+
+        if wait:
+            thread.join()
+        return True
+
+    def _rebuild(self, signature: Tuple[int, int]):
+        start_time = time.time()
+        try:
+            index = PlateHotlistIndex.from_file(str(self.path))
+        except Exception as e:
+            self.reload_errors += 1
+            self.logger.error(f"Erro ao recarregar lista de placas: {e}")
+            return
+
+        self._index = index
+        self._signature = signature
+        self.reloads += 1
+        self.loaded_at = time.time()
+        self.last_reload_time = self.loaded_at - start_time
+        self.logger.info(f"Lista de placas recarregada: {len(index)} placas em {self.last_reload_time:.2f}s")
+
+    def _watch(self, interval: float):
+        while not self._stop.wait(interval):
+            self.reload()
+
+    def close(self):
+        self._stop.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        index = self._index
+        return {
+            'path': str(self.path),
+            'plates': len(index),
+            'invalid_entries': index.invalid,
+            'duplicate_entries': index.duplicates,
+            'max_distance': self.max_distance,
+            'queries': self.queries,
+            'hits': self.hits,
+            'reloads': self.reloads,
+            'reload_errors': self.reload_errors,
+            'last_reload_time': self.last_reload_time,
+            'loaded_at': self.loaded_at
+        }
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Reconhecedor de Placas CRNN/CTC (ONNX)
+======================================
+
+Reconhecedor compacto específico para placas brasileiras: recortes de placa
+em tamanho fixo, inferência em lote via ONNX Runtime e decodificação CTC
+restrita aos formatos Mercosul (AAA0A00) e anterior (AAA-0000). O modelo é
+treinado e exportado por scripts/train_plate_recognizer.py.
+
+Saída esperada do modelo: (lote, passos de tempo, 1 + len(PLATE_ALPHABET)),
+com o índice 0 reservado ao branco do CTC.
+"""
+
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import List, Tuple, Optional
+
+from .plate_grammar import format_plate, PLATE_TEMPLATES
+
+PLATE_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+BLANK = 0
+
+# Entrada do modelo (largura, altura) em tons de cinza
+PLATE_INPUT_SIZE = (128, 32)
+
+def _slot_masks(template: str) -> np.ndarray:
+    """Máscara (posições, classes) dos caracteres permitidos em cada posição do formato"""
+    masks = np.zeros((len(template), len(PLATE_ALPHABET) + 1), dtype=bool)
+    for position, kind in enumerate(template):
+        for index, char in enumerate(PLATE_ALPHABET):
+            masks[position, index + 1] = char.isdigit() if kind == 'D' else char.isalpha()
+    return masks
+
+_TEMPLATE_MASKS = {name: _slot_masks(template) for name, template in PLATE_TEMPLATES.items()}
+
+def encode_plate(text: str) -> List[int]:
+    """Índices de classe (1..36) do texto da placa, ignorando separadores"""
+    return [PLATE_ALPHABET.index(char) + 1 for char in text.upper() if char in PLATE_ALPHABET]
+
+def preprocess_plates(rois: List[np.ndarray], input_size: Tuple[int, int] = PLATE_INPUT_SIZE) -> np.ndarray:
+    """Lote (N, 1, altura, largura) float32 em [0, 1] com os recortes redimensionados ao tamanho fixo"""
+    width, height = input_size
+    batch = np.empty((len(rois), 1, height, width), dtype=np.float32)
+    for index, roi in enumerate(rois):
+        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if roi.ndim == 3 else roi
+        interpolation = cv2.INTER_AREA if gray.shape[0] > height else cv2.INTER_LINEAR
+        batch[index, 0] = cv2.resize(gray, (width, height), interpolation=interpolation)
+    batch *= 1.0 / 255.0
+    return batch
+
+def log_softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    return shifted - np.log(np.exp(shifted).sum(axis=-1, keepdims=True))
+
+def ctc_greedy_decode(log_probs: np.ndarray) -> List[Tuple[str, float]]:
+    """Decodificação CTC sem restrição (melhor classe por passo, colapso de repetições e brancos)"""
+    best = log_probs.argmax(axis=-1)
+    decoded = []
+    for sequence, scores in zip(best, log_probs):
+        chars = []
+        probabilities = []
+        previous = BLANK
+        for step, label in enumerate(sequence):
+            if label != BLANK and label != previous:
+                chars.append(PLATE_ALPHABET[label - 1])
+                probabilities.append(float(np.exp(scores[step, label])))
+            previous = label
+        decoded.append((''.join(chars), min(probabilities) if probabilities else 0.0))
+    return decoded
+
+def _align_template(log_probs: np.ndarray, masks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Viterbi CTC com exatamente len(masks) caracteres, cada um restrito à classe da sua posição
+
+    Estados pares são brancos e ímpares as posições do formato. A emissão de
+    uma posição em cada passo é a melhor classe permitida. Retorna a
+    pontuação do melhor caminho (N,) e a posição (ou -1 para branco) de cada
+    passo (N, T).
+    """
+    count, steps, _ = log_probs.shape
+    slots = masks.shape[0]
+    states = 2 * slots + 1
+
+    emissions = np.empty((count, steps, states), dtype=np.float32)
+    emissions[:, :, 0::2] = log_probs[:, :, BLANK:BLANK + 1]
+    emissions[:, :, 1::2] = np.where(masks[None, None], log_probs[:, :, None, :], -np.inf).max(axis=-1)
+
+    # O salto de dois estados (pular o branco) só é permitido chegando a uma posição
+    can_skip = np.zeros(states, dtype=bool)
+    can_skip[3::2] = True
+
+    score = np.full((count, states), -np.inf, dtype=np.float32)
+    score[:, 0] = emissions[:, 0, 0]
+    score[:, 1] = emissions[:, 0, 1]
+    backpointers = np.zeros((count, steps, states), dtype=np.int8)
+
+    for step in range(1, steps):
+        stay = score
+        advance = np.concatenate([np.full((count, 1), -np.inf, dtype=np.float32), score[:, :-1]], axis=1)
+        skip = np.concatenate([np.full((count, 2), -np.inf, dtype=np.float32), score[:, :-2]], axis=1)
+        skip[:, ~can_skip] = -np.inf
+
+        candidates = np.stack([stay, advance, skip], axis=-1)
+        choice = candidates.argmax(axis=-1)
+        backpointers[:, step] = choice
+        score = np.take_along_axis(candidates, choice[..., None], axis=-1)[..., 0] + emissions[:, step]
+
+    final = np.stack([score[:, -1], score[:, -2]], axis=-1)
+    state = np.where(final[:, 0] >= final[:, 1], states - 1, states - 2)
+    best = final.max(axis=-1)
+
+    positions = np.empty((count, steps), dtype=np.int16)
+    for step in range(steps - 1, -1, -1):
+        positions[:, step] = np.where(state % 2 == 1, (state - 1) // 2, -1)
+        state = state - backpointers[np.arange(count), step, state]
+    return best, positions
+
+def constrained_ctc_decode(log_probs: np.ndarray) -> List[Tuple[str, float]]:
+    """Decodifica cada saída como a melhor placa Mercosul ou anterior
+
+    O caractere de cada posição é a classe permitida com maior soma de
+    log-probabilidades nos passos alinhados a ela; a confiança da placa é a
+    da posição mais fraca (probabilidade média do caractere nos seus passos).
+    """
+    count = log_probs.shape[0]
+    if count == 0:
+        return []
+
+    alignments = {name: _align_template(log_probs, masks) for name, masks in _TEMPLATE_MASKS.items()}
+    scores = np.stack([alignments[name][0] for name in PLATE_TEMPLATES], axis=-1)
+    winners = scores.argmax(axis=-1)
+    names = list(PLATE_TEMPLATES)
+
+    decoded = []
+    for index in range(count):
+        name = names[winners[index]]
+        if not np.isfinite(scores[index, winners[index]]):
+            decoded.append(('', 0.0))
+            continue
+
+        masks = _TEMPLATE_MASKS[name]
+        positions = alignments[name][1][index]
+        chars = []
+        confidence = 1.0
+        for slot in range(masks.shape[0]):
+            frames = log_probs[index, positions == slot]
+            totals = np.where(masks[slot], frames.sum(axis=0), -np.inf)
+            label = int(totals.argmax())
+            chars.append(PLATE_ALPHABET[label - 1])
+            confidence = min(confidence, float(np.exp(frames[:, label]).mean()))
+
+        decoded.append((format_plate(''.join(chars)), confidence))
+    return decoded
+
+class PlateCRNNRecognizer:
+    """Sessão ONNX Runtime do reconhecedor CRNN de placas, com inferência em lote"""
+
+    def __init__(self, model_path: str, input_size: Tuple[int, int] = PLATE_INPUT_SIZE,
+                 batch_size: int = 64, num_threads: Optional[int] = None, constrained: bool = True):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("onnxruntime não está disponível")
+
+        if not model_path or not Path(model_path).exists():
+            raise ImportError(f"Modelo de placas não encontrado: {model_path}")
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(str(model_path), sess_options=options,
+                                            providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.input_size = tuple(input_size)
+        self.batch_size = max(int(batch_size), 1)
+        self.constrained = constrained
+
+    def recognize(self, rois: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """(texto, confiança) de cada recorte, na ordem dos recortes"""
+        decode = constrained_ctc_decode if self.constrained else ctc_greedy_decode
+        recognized = []
+        for start in range(0, len(rois), self.batch_size):
+            batch = preprocess_plates(rois[start:start + self.batch_size], self.input_size)
+            logits = self.session.run(None, {self.input_name: batch})[0]
+            recognized.extend(decode(log_softmax(logits.astype(np.float32))))
+        return recognized
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Leitura de Placas por Track
+===========================
+
+Agenda o OCR de placas por track em vídeo: a primeira leitura ocorre quando
+o recorte do track está nítido e grande o suficiente, as seguintes apenas
+até a votação por caractere atingir a confiança desejada, e então o track
+é travado. O texto final e a distribuição de votos são emitidos uma única
+vez por track.
+"""
+
+import cv2
+import numpy as np
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from .plate_grammar import normalize_plate
+
+@dataclass
+class PlateReadResult:
+    """Placa consolidada de um track"""
+    track_id: int
+    plate_text: str
+    confidence: float
+    votes: List[Dict[str, float]]
+    reads: int
+    ocr_calls: int
+    first_frame: int
+    last_frame: int
+    locked: bool
+
+@dataclass
+class _PlateTrackState:
+    track_id: int
+    first_frame: int
+    last_frame: int = 0
+    last_read_frame: Optional[int] = None
+    ocr_calls: int = 0
+    reads: List[Tuple[str, float]] = field(default_factory=list)
+    locked: bool = False
+    emitted: bool = False
+
+def plate_consensus(reads: List[Tuple[str, float]]) -> Tuple[str, float, List[Dict[str, float]]]:
+    """Votação por caractere entre leituras (texto, confiança)
+
+    Vence o comprimento com maior peso; em cada posição vence o caractere
+    com maior soma de confianças. A confiança da posição combina as
+    leituras concordantes (1 - prod(1 - c)) e é reduzida pela fração de peso
+    discordante; a confiança da placa é a da posição mais fraca.
+    """
+    if not reads:
+        return '', 0.0, []
+
+    by_length: Dict[int, List[Tuple[str, float]]] = defaultdict(list)
+    for text, confidence in reads:
+        by_length[len(text)].append((text, confidence))
+    length, candidates = max(by_length.items(), key=lambda item: sum(c for _, c in item[1]))
+
+    total_weight = sum(c for _, c in reads)
+    length_share = sum(c for _, c in candidates) / total_weight if total_weight else 0.0
+
+    text = []
+    votes = []
+    confidence = 1.0
+    for position in range(length):
+        weights: Dict[str, float] = defaultdict(float)
+        for candidate, weight in candidates:
+            weights[candidate[position]] += weight
+
+        winner = max(weights.items(), key=lambda item: item[1])[0]
+        agreeing = [c for candidate, c in candidates if candidate[position] == winner]
+        combined = 1.0 - float(np.prod([1.0 - min(c, 1.0) for c in agreeing]))
+        position_weight = sum(weights.values())
+        share = weights[winner] / position_weight if position_weight else 0.0
+
+        text.append(winner)
+        votes.append(dict(weights))
+        confidence = min(confidence, combined * share)
+
+    return ''.join(text), confidence * length_share, votes
+
+class PlateOCRScheduler:
+    """Agenda leituras OCR por track e consolida o texto por votação
+
+    As detecções precisam ter 'bbox' (x1, y1, x2, y2) e 'track_id'. Todas as
+    leituras de um frame são feitas em uma única chamada a
+    text_extractor.extract_text com as regiões (x, y, w, h).
+    """
+
+    def __init__(self, text_extractor, config: Dict[str, Any] = None):
+        self.text_extractor = text_extractor
+        self.config = config or {}
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.min_plate_height = self.config.get('min_plate_height', 16)
+        self.min_sharpness = self.config.get('min_sharpness', 50.0)
+        self.read_interval = self.config.get('read_interval', 3)
+        self.lock_confidence = self.config.get('lock_confidence', 0.9)
+        self.max_reads = self.config.get('max_reads', 3)
+        self.min_chars = self.config.get('min_chars', 4)
+        self.crop_margin = self.config.get('crop_margin', 0.05)
+
+        self.tracks: Dict[int, _PlateTrackState] = {}
+        self.ocr_calls = 0
+        self.frames_with_reads = 0
+        self.gated_crops = 0
+        self.emitted = 0
+
+    def _region(self, bbox, shape) -> Optional[Tuple[int, int, int, int]]:
+        x1, y1, x2, y2 = [int(v) for v in bbox]
+        margin_x = int((x2 - x1) * self.crop_margin)
+        margin_y = int((y2 - y1) * self.crop_margin)
+        x1, y1 = max(x1 - margin_x, 0), max(y1 - margin_y, 0)
+        x2, y2 = min(x2 + margin_x, shape[1]), min(y2 + margin_y, shape[0])
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return x1, y1, x2 - x1, y2 - y1
+
+    def _crop_ready(self, image: np.ndarray, region: Tuple[int, int, int, int]) -> bool:
+        """Recorte alto e nítido o suficiente para valer uma chamada OCR"""
+        x, y, w, h = region
+        if h < self.min_plate_height:
+            return False
+        crop = image[y:y+h, x:x+w]
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+        return cv2.Laplacian(gray, cv2.CV_64F).var() >= self.min_sharpness
+
+    def update(self, image: np.ndarray, frame_number: int, detections: Iterable[Any],
+               removed_track_ids: Iterable[int] = ()) -> List[PlateReadResult]:
+        """Agenda as leituras do frame; retorna os tracks travados ou encerrados neste frame"""
+        pending = []
+        for detection in detections:
+            track_id = getattr(detection, 'track_id', None)
+            if track_id is None:
+                continue
+
+            state = self.tracks.get(track_id)
+            if state is None:
+                state = self.tracks[track_id] = _PlateTrackState(track_id=track_id, first_frame=frame_number)
+            state.last_frame = frame_number
+
+            if state.locked or state.ocr_calls >= self.max_reads:
+                continue
+            if state.last_read_frame is not None and frame_number - state.last_read_frame < self.read_interval:
+                continue
+
+            region = self._region(detection.bbox, image.shape)
+            if region is None or not self._crop_ready(image, region):
+                self.gated_crops += 1
+                continue
+            pending.append((state, region))
+
+        emitted = []
+        if pending:
+            emitted.extend(self._read(image, frame_number, pending))
+
+        for track_id in removed_track_ids:
+            state = self.tracks.pop(track_id, None)
+            if state is not None and not state.emitted and state.reads:
+                emitted.append(self._emit(state))
+
+        return emitted
+
+    def _read(self, image: np.ndarray, frame_number: int,
+              pending: List[Tuple[_PlateTrackState, Tuple[int, int, int, int]]]) -> List[PlateReadResult]:
+        result = self.text_extractor.extract_text(image, [{'bbox': region} for _, region in pending])
+        by_bbox = {tuple(text_result.bbox): text_result for text_result in result.text_results}
+        self.ocr_calls += 1
+        self.frames_with_reads += 1
+
+        emitted = []
+        for state, region in pending:
+            state.ocr_calls += 1
+            state.last_read_frame = frame_number
+
+            text_result = by_bbox.get(tuple(region))
+            if text_result is not None:
+                text = normalize_plate(text_result.text)
+                if len(text) >= self.min_chars:
+                    state.reads.append((text, float(text_result.confidence)))
+
+            _, confidence, _ = plate_consensus(state.reads)
+            if state.reads and (confidence >= self.lock_confidence or state.ocr_calls >= self.max_reads):
+                state.locked = True
+                emitted.append(self._emit(state))
+
+        return emitted
+
+    def _emit(self, state: _PlateTrackState) -> PlateReadResult:
+        state.emitted = True
+        self.emitted += 1
+        return self._result(state)
+
+    def _result(self, state: _PlateTrackState) -> PlateReadResult:
+        text, confidence, votes = plate_consensus(state.reads)
+        return PlateReadResult(
+            track_id=state.track_id,
+            plate_text=text,
+            confidence=confidence,
+            votes=votes,
+            reads=len(state.reads),
+            ocr_calls=state.ocr_calls,
+            first_frame=state.first_frame,
+            last_frame=state.last_frame,
+            locked=state.locked
+        )
+
+    def get_result(self, track_id: int) -> Optional[PlateReadResult]:
+        """Consenso atual de um track ativo (travado ou não)"""
+        state = self.tracks.get(track_id)
+        if state is None or not state.reads:
+            return None
+        return self._result(state)
+
+    def flush(self) -> List[PlateReadResult]:
+        """Emite os tracks ainda não emitidos (fim do vídeo) e limpa o estado"""
+        emitted = [self._emit(state) for state in self.tracks.values() if not state.emitted and state.reads]
+        self.tracks.clear()
+        return emitted
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Chamadas OCR, recortes descartados e placas emitidas"""
+        return {
+            'ocr_calls': self.ocr_calls,
+            'track_reads': sum(state.ocr_calls for state in self.tracks.values()),
+            'gated_crops': self.gated_crops,
+            'emitted_plates': self.emitted,
+            'active_tracks': len(self.tracks),
+            'locked_tracks': sum(1 for state in self.tracks.values() if state.locked)
+        }
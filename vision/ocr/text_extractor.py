@@ -10,16 +10,39 @@ import cv2
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import time
+import asyncio
+import threading
 from enum import Enum
 
+from .worker_pool import OCRWorkerPool
+from .crop_cache import CropResultCache
+from .crop_quality import CropQualityGate
+from .plate_grammar import is_valid_plate
+
 class OCRType(str, Enum):
     """Tipos de motores OCR disponíveis"""
     PADDLEOCR = "paddleocr"
     TESSERACT = "tesseract"
     EASYOCR = "easyocr"
     TRANSFORMER_OCR = "transformer_ocr"
+    PLATE_CRNN = "plate_crnn"
+
+# Altura de entrada do reconhecedor de cada motor (recortes são normalizados para ela no lote)
+RECOGNITION_HEIGHTS = {
+    OCRType.PADDLEOCR: 48,
+    OCRType.EASYOCR: 64,
+    OCRType.TESSERACT: 48
+}
+
+# Custo relativo por recorte de placa em CPU (ordem da cascata: o mais barato lê primeiro)
+ENGINE_COSTS = {
+    OCRType.PLATE_CRNN: 0.1,
+    OCRType.PADDLEOCR: 1.0,
+    OCRType.TESSERACT: 2.0,
+    OCRType.EASYOCR: 4.0
+}
 
 @dataclass
 class TextResult:
@@ -47,10 +70,69 @@ class TextExtractor:
         self.logger = logging.getLogger(self.__class__.__name__)
         self.ocr_engines = {}
         self.current_ocr = None
-        self.initialize()
+        
+        # Reconhecimento em lote das regiões (uma chamada ao motor por imagem)
+        self.batch_recognition = config.get('batch_recognition', True)
+        self.recognition_height = config.get('recognition_height')
+        
+        # Modo placa (PaddleOCR): recortes já justos à placa vão direto ao reconhecedor,
+        # sem detecção de texto nem classificador de ângulo; pipeline completo só com baixa confiança
+        self.plate_mode = config.get('plate_mode', False)
+        self.plate_min_confidence = config.get('plate_min_confidence', 0.85)
+        self.plate_fast_path_count = 0
+        self.plate_fallback_count = 0
+        
+        # Cache de resultados por hash perceptual do recorte
+        self.crop_cache = None
+        if config.get('crop_cache', False):
+            self.crop_cache = CropResultCache(
+                max_entries=config.get('crop_cache_size', 2048),
+                max_distance=config.get('crop_cache_max_distance', 6),
+                hash_shape=tuple(config.get('crop_cache_hash_shape', (8, 32)))
+            )
+        
+        # Cascata de motores (enable_fallback + fallback_order): o motor mais barato lê primeiro e
+        # só as leituras fora da gramática de placa ou abaixo da confiança sobem para o próximo
+        self.enable_fallback = config.get('enable_fallback', False)
+        self.cascade_min_confidence = config.get('cascade_min_confidence', config.get('confidence_threshold', 0.5))
+        self.cascade_plate_grammar = config.get('cascade_plate_grammar', True)
+        self.cascade: List[OCRType] = []
+        self.cascade_escalations = 0
+        self.engine_stats: Dict[str, Dict[str, float]] = {}
+        
+        # Filtro de qualidade: recortes pequenos, borrados ou mal expostos não vão ao motor
+        self.quality_gate = CropQualityGate.from_config(config) if config.get('quality_gate', False) else None
+        
+        # Pool de processos OCR: com ocr_workers > 0 o motor roda apenas nos workers
+        self.ocr_workers = config.get('ocr_workers', 0)
+        self.worker_pool = None
+        self._engine_lock = threading.Lock()
+        
+        if self.ocr_workers:
+            self.worker_pool = OCRWorkerPool(
+                config,
+                num_workers=self.ocr_workers,
+                queue_size=config.get('ocr_queue_size', 16),
+                timeout=config.get('ocr_timeout', 10.0),
+                start_method=config.get('ocr_worker_start_method', 'spawn')
+            )
+        else:
+            self.initialize()
     
     def initialize(self):
         """Inicializa os motores OCR disponíveis"""
+        if self.enable_fallback and self.config.get('fallback_order'):
+            self._initialize_cascade()
+            return
+        
+        if self.config.get('plate_model_path'):
+            try:
+                # Reconhecedor de placas dedicado, quando há modelo configurado
+                self._initialize_plate_crnn()
+                return
+            except ImportError as e:
+                self.logger.warning(f"{e}; usando motores de uso geral")
+        
         try:
             # Tentar PaddleOCR primeiro
             self._initialize_paddleocr()
@@ -66,6 +148,37 @@ class TextExtractor:
                     self.logger.warning("Nenhum motor OCR disponível, usando simulador")
                     self._initialize_simulator()
     
+    def _initialize_cascade(self):
+        """Inicializa todos os motores de fallback_order disponíveis, ordenados por custo"""
+        initializers = {
+            OCRType.PLATE_CRNN: self._initialize_plate_crnn,
+            OCRType.PADDLEOCR: self._initialize_paddleocr,
+            OCRType.EASYOCR: self._initialize_easyocr,
+            OCRType.TESSERACT: self._initialize_tesseract
+        }
+        
+        for value in self.config.get('fallback_order', []):
+            try:
+                engine = OCRType(getattr(value, 'value', value))
+            except ValueError:
+                self.logger.warning(f"Motor OCR desconhecido na cascata: {value}")
+                continue
+            if engine not in initializers or engine in self.ocr_engines:
+                continue
+            try:
+                initializers[engine]()
+            except ImportError as e:
+                self.logger.warning(f"{e}; motor fora da cascata")
+        
+        if not self.ocr_engines:
+            self.logger.warning("Nenhum motor OCR disponível, usando simulador")
+            self._initialize_simulator()
+            return
+        
+        self.cascade = sorted(self.ocr_engines, key=lambda engine: ENGINE_COSTS.get(engine, 0.0))
+        self.current_ocr = self.cascade[0]
+        self.logger.info(f"Cascata OCR: {' -> '.join(engine.value for engine in self.cascade)}")
+    
     def _initialize_paddleocr(self):
         """Inicializa PaddleOCR"""
         try:
@@ -114,6 +227,20 @@ class TextExtractor:
         except ImportError:
             raise ImportError("Tesseract não está disponível")
     
+    def _initialize_plate_crnn(self):
+        """Inicializa o reconhecedor CRNN/CTC de placas (ONNX)"""
+        from .plate_recognizer import PlateCRNNRecognizer
+        
+        self.ocr_engines[OCRType.PLATE_CRNN] = PlateCRNNRecognizer(
+            self.config.get('plate_model_path'),
+            input_size=tuple(self.config.get('plate_model_input_size', (128, 32))),
+            batch_size=self.config.get('plate_model_batch_size', 64),
+            num_threads=self.config.get('plate_model_threads'),
+            constrained=self.config.get('plate_model_constrained', True)
+        )
+        self.current_ocr = OCRType.PLATE_CRNN
+        self.logger.info("Reconhecedor de placas CRNN inicializado com sucesso")
+    
     def _initialize_simulator(self):
         """Inicializa simulador OCR para testes"""
         self.current_ocr = OCRType.TRANSFORMER_OCR
@@ -126,6 +253,8 @@ class TextExtractor:
         try:
             if regions:
                 return self._extract_from_regions(image, regions)
+            elif self.worker_pool is not None:
+                return self.worker_pool.extract([image])
             else:
                 return self._extract_from_full_image(image)
                 
@@ -133,29 +262,427 @@ class TextExtractor:
             self.logger.error(f"Erro na extração de texto: {e}")
             return self._create_error_result(str(e), time.time() - start_time)
     
+    async def extract_text_async(self, image: np.ndarray, regions: List[Dict[str, Any]] = None) -> OCRBatchResult:
+        """Versão assíncrona de extract_text (pool de workers ou motor local em thread)"""
+        start_time = time.time()
+        
+        try:
+            if self.worker_pool is not None:
+                if not regions:
+                    return await self.worker_pool.extract_async([image])
+                
+                rois, bboxes = self._crop_regions(image, regions)
+                rois, bboxes, gated = self._gate_rois(rois, bboxes)
+                if self.crop_cache is None:
+                    batch = await self.worker_pool.extract_async(rois, bboxes) if rois else None
+                    return self._with_gated(batch, gated, start_time)
+                
+                crop_hashes, cached = self._cache_lookup(rois)
+                pending = [i for i, result in enumerate(cached) if result is None]
+                batch = await self.worker_pool.extract_async(
+                    [rois[i] for i in pending], [bboxes[i] for i in pending]
+                ) if pending else None
+                return self._with_gated(
+                    self._merge_cached_results(bboxes, crop_hashes, cached, batch, start_time), gated, start_time
+                )
+            
+            def run_locked():
+                with self._engine_lock:
+                    return self.extract_text(image, regions)
+            
+            return await asyncio.get_running_loop().run_in_executor(None, run_locked)
+            
+        except Exception as e:
+            self.logger.error(f"Erro na extração de texto: {e}")
+            return self._create_error_result(str(e), time.time() - start_time)
+    
+    def extract_text_batch(self, image: np.ndarray, regions: List[Dict[str, Any]]) -> List[TextResult]:
+        """Extrai o texto de todas as regiões da imagem, na ordem das regiões"""
+        return self.extract_text(image, regions).text_results
+    
     def _extract_from_regions(self, image: np.ndarray, regions: List[Dict[str, Any]]) -> OCRBatchResult:
         """Extrai texto de regiões específicas da imagem"""
+        start_time = time.time()
+        rois, bboxes = self._crop_regions(image, regions)
+        rois, bboxes, gated = self._gate_rois(rois, bboxes)
+        if self.crop_cache is None:
+            return self._with_gated(self._run_rois(rois, bboxes) if rois else None, gated, start_time)
+        
+        # Apenas os recortes ausentes do cache vão ao motor
+        crop_hashes, cached = self._cache_lookup(rois)
+        pending = [i for i, result in enumerate(cached) if result is None]
+        batch = self._run_rois([rois[i] for i in pending], [bboxes[i] for i in pending]) if pending else None
+        return self._with_gated(
+            self._merge_cached_results(bboxes, crop_hashes, cached, batch, start_time), gated, start_time
+        )
+    
+    def _run_rois(self, rois: List[np.ndarray], bboxes: List[Tuple[int, int, int, int]]) -> OCRBatchResult:
+        if self.worker_pool is not None:
+            return self.worker_pool.extract(rois, bboxes)
+        return self._extract_from_rois(rois, bboxes)
+    
+    def _gate_rois(self, rois: List[np.ndarray], bboxes: List[Tuple[int, int, int, int]]):
+        """Separa os recortes aprovados pelo filtro de qualidade dos descartados (bbox, motivo e medidas)"""
+        if self.quality_gate is None:
+            return rois, bboxes, []
+        
+        kept_rois, kept_bboxes, gated = [], [], []
+        for roi, bbox in zip(rois, bboxes):
+            quality = self.quality_gate.assess(roi)
+            if quality.passed:
+                kept_rois.append(roi)
+                kept_bboxes.append(bbox)
+                continue
+            gated.append({
+                'bbox': bbox,
+                'reason': quality.reason,
+                'metrics': {
+                    'height': quality.height,
+                    'sharpness': quality.sharpness,
+                    'dark_fraction': quality.dark_fraction,
+                    'bright_fraction': quality.bright_fraction,
+                    'contrast': quality.contrast
+                }
+            })
+        return kept_rois, kept_bboxes, gated
+    
+    def _with_gated(self, batch: Optional[OCRBatchResult], gated: List[Dict[str, Any]],
+                    start_time: float) -> OCRBatchResult:
+        """Anexa as regiões descartadas pelo filtro ao resultado (vazio se nenhuma região foi ao motor)"""
+        if batch is None:
+            batch = self._create_batch_result([], time.time() - start_time)
+        if self.quality_gate is not None:
+            batch.metadata['gated_regions'] = gated
+        return batch
+    
+    def _cache_lookup(self, rois: List[np.ndarray]) -> Tuple[List[np.ndarray], List[Optional[TextResult]]]:
+        crop_hashes = [self.crop_cache.hash_crop(roi) for roi in rois]
+        return crop_hashes, [self.crop_cache.get(crop_hash) for crop_hash in crop_hashes]
+    
+    def _merge_cached_results(self, bboxes: List[Tuple[int, int, int, int]], crop_hashes: List[np.ndarray],
+                              cached: List[Optional[TextResult]], batch: Optional[OCRBatchResult],
+                              start_time: float) -> OCRBatchResult:
+        """Combina acertos do cache e resultados do motor na ordem das regiões, alimentando o cache"""
+        recognized = {tuple(result.bbox): result for result in batch.text_results} if batch else {}
+        
         text_results = []
+        for index, bbox in enumerate(bboxes):
+            if cached[index] is not None:
+                text_results.append(replace(cached[index], bbox=bbox))
+                continue
+            
+            result = recognized.get(tuple(bbox))
+            if result is not None:
+                self.crop_cache.put(crop_hashes[index], result)
+                text_results.append(result)
+        
+        batch_result = self._create_batch_result(text_results, time.time() - start_time)
+        batch_result.metadata['cache_hits'] = sum(result is not None for result in cached)
+        if batch is not None and 'error' in batch.metadata:
+            batch_result.metadata['error'] = batch.metadata['error']
+        return batch_result
+    
+    def _crop_regions(self, image: np.ndarray,
+                      regions: List[Dict[str, Any]]) -> Tuple[List[np.ndarray], List[Tuple[int, int, int, int]]]:
+        """Recorta as regiões (x, y, w, h) da imagem, ignorando as vazias"""
+        rois = []
+        bboxes = []
         
         for region in regions:
+            bbox = region['bbox']
+            x, y, w, h = bbox
+            
+            # Extrair ROI (Region of Interest)
+            roi = image[max(y, 0):y+h, max(x, 0):x+w]
+            if roi.size == 0:
+                self.logger.error(f"Região vazia ou fora da imagem: {bbox}")
+                continue
+            rois.append(roi)
+            bboxes.append(bbox)
+        
+        return rois, bboxes
+    
+    def _extract_from_rois(self, rois: List[np.ndarray], bboxes: List[Tuple[int, int, int, int]]) -> OCRBatchResult:
+        """Extrai texto de recortes já feitos, em lote quando possível"""
+        start_time = time.time()
+        if len(self.cascade) > 1:
+            text_results, escalated = self._extract_cascade(rois, bboxes)
+            batch_result = self._create_batch_result(text_results, time.time() - start_time)
+            batch_result.metadata['cascade_escalations'] = escalated
+            return batch_result
+        
+        text_results = self._run_engine(self.current_ocr, rois, bboxes)
+        processing_time = time.time() - start_time
+        return self._create_batch_result(text_results, processing_time)
+    
+    def _extract_cascade(self, rois: List[np.ndarray],
+                         bboxes: List[Tuple[int, int, int, int]]) -> Tuple[List[TextResult], int]:
+        """Lê com o motor mais barato e reenvia ao próximo apenas as leituras rejeitadas
+        
+        Retorna a melhor leitura de cada região (válida na gramática e, depois, a de
+        maior confiança) e o número de regiões que precisaram de um segundo motor.
+        """
+        best: Dict[int, TextResult] = {}
+        pending = list(range(len(rois)))
+        escalated = 0
+        
+        for stage, engine in enumerate(self.cascade):
+            if not pending:
+                break
+            if stage == 1:
+                escalated = len(pending)
+            
+            results = self._run_engine(engine, [rois[i] for i in pending], [bboxes[i] for i in pending])
+            by_bbox = {tuple(result.bbox): result for result in results}
+            
+            rejected = []
+            for index in pending:
+                result = by_bbox.get(tuple(bboxes[index]))
+                if result is not None and self._read_rank(result) > self._read_rank(best.get(index)):
+                    best[index] = result
+                if result is None or not self._accept_read(result):
+                    rejected.append(index)
+            
+            self.engine_stats[engine.value]['accepted'] += len(pending) - len(rejected)
+            pending = rejected
+        
+        self.cascade_escalations += escalated
+        return [best[index] for index in range(len(rois)) if index in best], escalated
+    
+    def _accept_read(self, result: TextResult) -> bool:
+        if result.confidence < self.cascade_min_confidence:
+            return False
+        return not self.cascade_plate_grammar or is_valid_plate(result.text)
+    
+    def _read_rank(self, result: Optional[TextResult]) -> Tuple[bool, float]:
+        if result is None:
+            return False, -1.0
+        return (not self.cascade_plate_grammar or is_valid_plate(result.text)), result.confidence
+    
+    def _run_engine(self, engine: OCRType, rois: List[np.ndarray],
+                    bboxes: List[Tuple[int, int, int, int]]) -> List[TextResult]:
+        """Reconhece os recortes com o motor indicado, registrando chamadas e latência"""
+        previous = self.current_ocr
+        self.current_ocr = engine
+        start_time = time.time()
+        try:
+            return self._recognize_rois(rois, bboxes)
+        finally:
+            self.current_ocr = previous
+            stats = self.engine_stats.setdefault(
+                getattr(engine, 'value', str(engine)),
+                {'calls': 0, 'regions': 0, 'accepted': 0, 'total_time': 0.0}
+            )
+            stats['calls'] += 1
+            stats['regions'] += len(rois)
+            stats['total_time'] += time.time() - start_time
+    
+    def _recognize_rois(self, rois: List[np.ndarray], bboxes: List[Tuple[int, int, int, int]]) -> List[TextResult]:
+        text_results = None
+        if self.batch_recognition and len(rois) > 1:
             try:
-                bbox = region['bbox']
-                x, y, w, h = bbox
-                
-                # Extrair ROI (Region of Interest)
-                roi = image[y:y+h, x:x+w]
-                
-                # Extrair texto da ROI
-                text_result = self._extract_from_roi(roi, bbox)
-                if text_result:
-                    text_results.append(text_result)
-                    
+                text_results = self._extract_batch(rois, bboxes)
             except Exception as e:
-                self.logger.error(f"Erro ao processar região {bbox}: {e}")
+                self.logger.warning(f"Reconhecimento em lote falhou, processando região a região: {e}")
+        
+        if text_results is None:
+            text_results = []
+            for roi, bbox in zip(rois, bboxes):
+                try:
+                    # Extrair texto da ROI
+                    text_result = self._extract_from_roi(roi, bbox)
+                    if text_result:
+                        text_results.append(text_result)
+                        
+                except Exception as e:
+                    self.logger.error(f"Erro ao processar região {bbox}: {e}")
+                    continue
+        
+        return text_results
+    
+    def _extract_batch(self, rois: List[np.ndarray], bboxes: List[Tuple[int, int, int, int]]) -> List[TextResult]:
+        """Reconhece todas as ROIs com uma única chamada ao motor OCR"""
+        if self.current_ocr == OCRType.PADDLEOCR:
+            recognized = self._recognize_batch_paddleocr(rois)
+        elif self.current_ocr == OCRType.EASYOCR:
+            recognized = self._recognize_batch_easyocr(rois)
+        elif self.current_ocr == OCRType.TESSERACT:
+            recognized = self._recognize_batch_tesseract(rois)
+        elif self.current_ocr == OCRType.PLATE_CRNN:
+            recognized = self.ocr_engines[OCRType.PLATE_CRNN].recognize(rois)
+        else:
+            return [r for r in (self._extract_with_simulator(roi, bbox) for roi, bbox in zip(rois, bboxes)) if r]
+        
+        if len(recognized) != len(rois):
+            raise ValueError(f"Motor retornou {len(recognized)} resultados para {len(rois)} regiões")
+        
+        return [
+            TextResult(
+                text=text.strip(),
+                confidence=float(confidence),
+                bbox=bbox,
+                language=self.config.get('language', 'pt'),
+                processing_time=0.0
+            )
+            for (text, confidence), bbox in zip(recognized, bboxes)
+            if text and text.strip()
+        ]
+    
+    def _batch_height(self) -> int:
+        return int(self.recognition_height or RECOGNITION_HEIGHTS.get(self.current_ocr, 48))
+    
+    @staticmethod
+    def _normalize_crops(rois: List[np.ndarray], height: int) -> List[np.ndarray]:
+        """Redimensiona os recortes para a altura do reconhecedor, mantendo a proporção"""
+        crops = []
+        for roi in rois:
+            h, w = roi.shape[:2]
+            width = max(int(round(w * height / h)), 1)
+            interpolation = cv2.INTER_AREA if h > height else cv2.INTER_LINEAR
+            crops.append(cv2.resize(roi, (width, height), interpolation=interpolation))
+        return crops
+    
+    @staticmethod
+    def _stack_crops(crops: List[np.ndarray], gap: int, fill: int) -> Tuple[np.ndarray, List[int]]:
+        """Empilha recortes de mesma altura verticalmente; retorna a imagem e o topo de cada faixa"""
+        height = crops[0].shape[0]
+        width = max(crop.shape[1] for crop in crops)
+        canvas = np.full((len(crops) * (height + gap), width), fill, dtype=np.uint8)
+        tops = []
+        for index, crop in enumerate(crops):
+            top = index * (height + gap)
+            gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+            canvas[top:top + height, :gray.shape[1]] = gray
+            tops.append(top)
+        return canvas, tops
+    
+    def _recognize_batch_paddleocr(self, rois: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """Apenas reconhecimento (sem detecção de texto), em lote, sobre os recortes normalizados"""
+        if self.plate_mode:
+            return self._recognize_plates_paddleocr(rois)
+        
+        engine = self.ocr_engines[OCRType.PADDLEOCR]
+        crops = self._normalize_crops(rois, self._batch_height())
+        # O PaddleOCR trata uma lista de imagens como páginas (uma chamada ao reconhecedor por item);
+        # a lista de recortes embrulhada como uma única página chega inteira ao text_recognizer
+        results = engine.ocr([crops], det=False, cls=self.config.get('use_angle_cls', True))
+        return [(text, confidence) for text, confidence in (results[0] if results else [])]
+    
+    def _recognize_plates_paddleocr(self, rois: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """Reconhecimento direto dos recortes de placa retificados; pipeline completo só abaixo de plate_min_confidence"""
+        engine = self.ocr_engines[OCRType.PADDLEOCR]
+        crops = self._normalize_crops([self._rectify_plate(roi) for roi in rois], self._batch_height())
+        results = engine.ocr([crops], det=False, cls=False)
+        recognized = [(text, confidence) for text, confidence in (results[0] if results else [])]
+        if len(recognized) != len(rois):
+            raise ValueError(f"Reconhecedor retornou {len(recognized)} resultados para {len(rois)} placas")
+        
+        for index, (text, confidence) in enumerate(recognized):
+            if text.strip() and confidence >= self.plate_min_confidence:
+                self.plate_fast_path_count += 1
                 continue
+            
+            self.plate_fallback_count += 1
+            full_result = self._paddleocr_full_pipeline(rois[index])
+            if full_result[1] > confidence:
+                recognized[index] = full_result
         
-        processing_time = time.time() - time.time()
-        return self._create_batch_result(text_results, processing_time)
+        return recognized
+    
+    def _paddleocr_full_pipeline(self, roi: np.ndarray) -> Tuple[str, float]:
+        """Detecção + classificação de ângulo + reconhecimento; retorna a linha de maior confiança"""
+        engine = self.ocr_engines[OCRType.PADDLEOCR]
+        results = engine.ocr(roi, cls=True)
+        
+        if not results or not results[0]:
+            return '', 0.0
+        
+        # Cada linha é [caixa, (texto, confiança)]
+        _, (text, confidence) = max(results[0], key=lambda line: line[1][1])
+        return text, float(confidence)
+    
+    @staticmethod
+    def _rectify_plate(roi: np.ndarray) -> np.ndarray:
+        """Corrige a perspectiva da placa pelo contorno quadrilátero do seu fundo, se encontrado"""
+        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if roi.ndim == 3 else roi
+        h, w = gray.shape[:2]
+        if h < 8 or w < 16:
+            return roi
+        
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        contours = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
+        if not contours:
+            return roi
+        
+        plate = max(contours, key=cv2.contourArea)
+        if cv2.contourArea(plate) < 0.3 * h * w:
+            return roi
+        
+        corners = cv2.approxPolyDP(plate, 0.02 * cv2.arcLength(plate, True), True)
+        if len(corners) != 4:
+            return roi
+        
+        # Ordenar: superior esquerdo, superior direito, inferior direito, inferior esquerdo
+        points = corners.reshape(4, 2).astype(np.float32)
+        sums = points.sum(axis=1)
+        diffs = np.diff(points, axis=1).ravel()
+        ordered = np.array([
+            points[np.argmin(sums)], points[np.argmin(diffs)],
+            points[np.argmax(sums)], points[np.argmax(diffs)]
+        ], dtype=np.float32)
+        
+        width = int(round(max(np.linalg.norm(ordered[1] - ordered[0]), np.linalg.norm(ordered[2] - ordered[3]))))
+        height = int(round(max(np.linalg.norm(ordered[3] - ordered[0]), np.linalg.norm(ordered[2] - ordered[1]))))
+        if width < height or height < 8:
+            return roi
+        
+        target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+        transform = cv2.getPerspectiveTransform(ordered, target)
+        return cv2.warpPerspective(roi, transform, (width, height), flags=cv2.INTER_LINEAR,
+                                   borderMode=cv2.BORDER_REPLICATE)
+    
+    def _recognize_batch_easyocr(self, rois: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """Faixas empilhadas em uma imagem e reconhecidas com Reader.recognize em um único lote"""
+        engine = self.ocr_engines[OCRType.EASYOCR]
+        height = self._batch_height()
+        crops = self._normalize_crops(rois, height)
+        canvas, tops = self._stack_crops(crops, gap=0, fill=0)
+        
+        horizontal_list = [[0, crop.shape[1], top, top + height] for crop, top in zip(crops, tops)]
+        results = engine.recognize(canvas, horizontal_list=horizontal_list, free_list=[],
+                                   batch_size=len(crops), detail=1)
+        
+        # O EasyOCR reordena as caixas; a faixa é identificada pela coordenada y
+        recognized = [('', 0.0)] * len(crops)
+        for box, text, confidence in results:
+            index = min(int(box[0][1] // height), len(crops) - 1)
+            recognized[index] = (text, confidence)
+        return recognized
+    
+    def _recognize_batch_tesseract(self, rois: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """Faixas empilhadas (separadas por margem branca) lidas com uma única chamada image_to_data"""
+        engine = self.ocr_engines[OCRType.TESSERACT]
+        height = self._batch_height()
+        gap = height // 2
+        canvas, tops = self._stack_crops(self._normalize_crops(rois, height), gap=gap, fill=255)
+        
+        data = engine.image_to_data(canvas, config='--oem 3 --psm 6', lang=self.config.get('language', 'por'),
+                                    output_type=engine.Output.DICT)
+        
+        words = [[] for _ in rois]
+        confidences = [[] for _ in rois]
+        for text, top, word_height, confidence in zip(data['text'], data['top'], data['height'], data['conf']):
+            if not str(text).strip():
+                continue
+            index = min(int((top + word_height / 2) // (height + gap)), len(rois) - 1)
+            words[index].append(str(text).strip())
+            if float(confidence) >= 0:
+                confidences[index].append(float(confidence) / 100.0)
+        
+        return [
+            (' '.join(line), float(np.mean(line_confidences)) if line_confidences else 0.8)
+            for line, line_confidences in zip(words, confidences)
+        ]
     
     def _extract_from_full_image(self, image: np.ndarray) -> OCRBatchResult:
         """Extrai texto de toda a imagem"""
@@ -178,22 +705,22 @@ class TextExtractor:
             return self._extract_with_easyocr(roi, bbox)
         elif self.current_ocr == OCRType.TESSERACT:
             return self._extract_with_tesseract(roi, bbox)
+        elif self.current_ocr == OCRType.PLATE_CRNN:
+            return self._extract_with_plate_crnn(roi, bbox)
         else:
             return self._extract_with_simulator(roi, bbox)
     
     def _extract_with_paddleocr(self, roi: np.ndarray, bbox: Tuple[int, int, int, int]) -> Optional[TextResult]:
         """Extrai texto usando PaddleOCR"""
         try:
-            engine = self.ocr_engines[OCRType.PADDLEOCR]
-            results = engine.ocr(roi, cls=True)
+            if self.plate_mode:
+                text, confidence = self._recognize_plates_paddleocr([roi])[0]
+            else:
+                text, confidence = self._paddleocr_full_pipeline(roi)
             
-            if not results or not results[0]:
+            if not text.strip():
                 return None
             
-            # Pegar o resultado com maior confiança
-            best_result = max(results[0], key=lambda x: x[1][1])
-            text, (confidence, _) = best_result
-            
             return TextResult(
                 text=text.strip(),
                 confidence=float(confidence),
@@ -255,6 +782,26 @@ class TextExtractor:
             self.logger.error(f"Erro no Tesseract: {e}")
             return None
     
+    def _extract_with_plate_crnn(self, roi: np.ndarray, bbox: Tuple[int, int, int, int]) -> Optional[TextResult]:
+        """Extrai texto usando o reconhecedor CRNN de placas"""
+        try:
+            text, confidence = self.ocr_engines[OCRType.PLATE_CRNN].recognize([roi])[0]
+            
+            if not text:
+                return None
+            
+            return TextResult(
+                text=text,
+                confidence=float(confidence),
+                bbox=bbox,
+                language=self.config.get('language', 'pt'),
+                processing_time=0.0
+            )
+            
+        except Exception as e:
+            self.logger.error(f"Erro no reconhecedor de placas: {e}")
+            return None
+    
     def _extract_with_simulator(self, roi: np.ndarray, bbox: Tuple[int, int, int, int]) -> Optional[TextResult]:
         """Simula extração de texto para testes"""
         # Simular texto baseado no tamanho da ROI
@@ -286,9 +833,10 @@ class TextExtractor:
             total_texts=total_texts,
             average_confidence=average_confidence,
             metadata={
-                'ocr_engine': self.current_ocr,
+                'ocr_engine': self.worker_pool.engine if self.worker_pool is not None else self.current_ocr,
                 'language': self.config.get('language', 'pt'),
-                'regions_processed': len(text_results)
+                'regions_processed': len(text_results),
+                'batch_recognition': self.batch_recognition
             }
         )
     
@@ -305,11 +853,47 @@ class TextExtractor:
             }
         )
     
+    def cleanup(self):
+        """Encerra o pool de workers e libera os motores"""
+        if self.worker_pool is not None:
+            self.worker_pool.close()
+            self.worker_pool = None
+        self.ocr_engines.clear()
+        if self.crop_cache is not None:
+            self.crop_cache.clear()
+    
     def get_ocr_info(self) -> Dict[str, Any]:
         """Retorna informações sobre o motor OCR"""
-        return {
+        info = {
             'current_engine': self.current_ocr,
             'available_engines': list(self.ocr_engines.keys()),
             'language': self.config.get('language', 'pt'),
-            'gpu_enabled': self.config.get('use_gpu', False)
-        }
\ No newline at end of file
+            'gpu_enabled': self.config.get('use_gpu', False),
+            'crop_cache': self.crop_cache.get_stats() if self.crop_cache is not None else None,
+            'quality_gate': self.quality_gate.get_stats() if self.quality_gate is not None else None,
+            'plate_mode': {
+                'enabled': self.plate_mode,
+                'min_confidence': self.plate_min_confidence,
+                'fast_path': self.plate_fast_path_count,
+                'fallbacks': self.plate_fallback_count
+            }
+        }
+        info['engines'] = {
+            name: dict(
+                stats,
+                mean_call_latency=stats['total_time'] / stats['calls'] if stats['calls'] else 0.0,
+                mean_region_latency=stats['total_time'] / stats['regions'] if stats['regions'] else 0.0
+            )
+            for name, stats in self.engine_stats.items()
+        }
+        if self.cascade:
+            info['cascade'] = {
+                'order': [engine.value for engine in self.cascade],
+                'min_confidence': self.cascade_min_confidence,
+                'plate_grammar': self.cascade_plate_grammar,
+                'escalations': self.cascade_escalations
+            }
+        if self.worker_pool is not None:
+            info['current_engine'] = self.worker_pool.engine
+            info['worker_pool'] = self.worker_pool.get_stats()
+        return info
\ No newline at end of file
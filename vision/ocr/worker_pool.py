@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Pool de Workers OCR
+===================
+
+Executa o OCR em processos dedicados, cada um com a sua própria instância
+de motor (os motores não são seguros para chamadas concorrentes e retêm o
+GIL). Os recortes são copiados uma única vez para memória compartilhada;
+pelo pipe trafegam apenas o nome do bloco, o layout dos recortes e o
+resultado. A fila de requisições é limitada, cada chamada tem tempo máximo
+e um worker que trava ou morre é reiniciado automaticamente.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import queue
+import threading
+import numpy as np
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Dict, List, Any, Optional, Tuple
+
+_SHUTDOWN = None
+
+def _ocr_worker_main(config: Dict[str, Any], conn):
+    """Loop do processo worker: cria o motor e atende requisições até receber None"""
+    from .text_extractor import TextExtractor
+
+    try:
+        extractor = TextExtractor(dict(config, ocr_workers=0, crop_cache=False, quality_gate=False))
+    except Exception as e:
+        conn.send(('failed', None, str(e)))
+        return
+    conn.send(('ready', None, extractor.current_ocr))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if message is _SHUTDOWN:
+            break
+
+        request_id, shm_name, layout, bboxes, full_image = message
+        shm = None
+        rois = None
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            rois = [
+                np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+                for offset, shape, dtype in layout
+            ]
+            if full_image:
+                result = extractor.extract_text(rois[0])
+            else:
+                result = extractor._extract_from_rois(rois, bboxes)
+            conn.send(('result', request_id, result))
+        except Exception as e:
+            conn.send(('error', request_id, str(e)))
+        finally:
+            # As views precisam ser liberadas antes de fechar o bloco
+            rois = None
+            if shm is not None:
+                shm.close()
+
+class _WorkerSlot:
+    """Processo worker e o pipe usado para falar com ele"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[multiprocessing.Process] = None
+        self.conn = None
+        self.restarts = 0
+        self.requests = 0
+
+class OCRWorkerPool:
+    """Pool de processos OCR com fila limitada, timeout por chamada e reinício automático
+
+    Cada worker é atendido por uma thread do processo principal, que retira
+    requisições da fila compartilhada, envia ao seu processo e aguarda o
+    resultado por até 'timeout' segundos; se o prazo estourar, o processo é
+    encerrado e substituído, e a chamada falha com TimeoutError.
+    """
+
+    def __init__(self, config: Dict[str, Any], num_workers: int = 2, queue_size: int = 16,
+                 timeout: float = 10.0, startup_timeout: float = 120.0, start_method: str = 'spawn'):
+        self.config = config
+        self.num_workers = max(int(num_workers), 1)
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._context = multiprocessing.get_context(start_method)
+        self._requests: queue.Queue = queue.Queue(maxsize=max(int(queue_size), 1))
+        self._slots = [_WorkerSlot(index) for index in range(self.num_workers)]
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+
+        self.engine = None
+        self.completed = 0
+        self.timeouts = 0
+        self.errors = 0
+
+        for slot in self._slots:
+            thread = threading.Thread(target=self._serve, args=(slot,), name=f"OCRWorker-{slot.index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _start_worker(self, slot: _WorkerSlot):
+        parent_conn, child_conn = self._context.Pipe()
+        slot.process = self._context.Process(
+            target=_ocr_worker_main, args=(self.config, child_conn),
+            name=f"ocr-worker-{slot.index}", daemon=True
+        )
+        slot.process.start()
+        child_conn.close()
+        slot.conn = parent_conn
+
+        if not parent_conn.poll(self.startup_timeout):
+            self._stop_worker(slot)
+            raise TimeoutError(f"Worker OCR {slot.index} não inicializou em {self.startup_timeout}s")
+        status, _, payload = parent_conn.recv()
+        if status != 'ready':
+            self._stop_worker(slot)
+            raise RuntimeError(f"Worker OCR {slot.index} falhou ao inicializar: {payload}")
+        self.engine = payload
+
+    def _stop_worker(self, slot: _WorkerSlot, graceful: bool = False):
+        if slot.process is None:
+            return
+        if graceful and slot.process.is_alive():
+            try:
+                slot.conn.send(_SHUTDOWN)
+                slot.process.join(timeout=2.0)
+            except (OSError, BrokenPipeError):
+                pass
+        if slot.process.is_alive():
+            slot.process.kill()
+        slot.process.join()
+        slot.conn.close()
+        slot.process = None
+        slot.conn = None
+
+    def _restart_worker(self, slot: _WorkerSlot, reason: str):
+        self.logger.warning(f"Reiniciando worker OCR {slot.index}: {reason}")
+        self._stop_worker(slot)
+        slot.restarts += 1
+
+    def _serve(self, slot: _WorkerSlot):
+        while True:
+            item = self._requests.get()
+            if item is _SHUTDOWN:
+                break
+
+            future, shm, layout, bboxes, full_image, timeout = item
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                if slot.process is None or not slot.process.is_alive():
+                    self._start_worker(slot)
+
+                request_id = id(future)
+                slot.conn.send((request_id, shm.name, layout, bboxes, full_image))
+                slot.requests += 1
+
+                if not slot.conn.poll(timeout):
+                    self.timeouts += 1
+                    self._restart_worker(slot, f"tempo limite de {timeout}s excedido")
+                    future.set_exception(TimeoutError(f"OCR excedeu {timeout}s"))
+                    continue
+
+                status, _, payload = slot.conn.recv()
+                if status == 'result':
+                    self.completed += 1
+                    future.set_result(payload)
+                else:
+                    self.errors += 1
+                    future.set_exception(RuntimeError(payload))
+
+            except (EOFError, OSError) as e:
+                self.errors += 1
+                self._restart_worker(slot, f"processo encerrado ({e})")
+                if not future.done():
+                    future.set_exception(RuntimeError(f"Worker OCR encerrado durante a requisição: {e}"))
+            except Exception as e:
+                self.errors += 1
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                shm.close()
+                shm.unlink()
+
+        self._stop_worker(slot, graceful=True)
+
+    @staticmethod
+    def _pack(rois: List[np.ndarray]) -> Tuple[shared_memory.SharedMemory, List[Tuple[int, Tuple[int, ...], str]]]:
+        """Copia os recortes para um bloco de memória compartilhada; retorna o bloco e o layout"""
+        layout = []
+        offset = 0
+        for roi in rois:
+            layout.append((offset, roi.shape, roi.dtype.str))
+            offset += roi.nbytes
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for roi, (offset, shape, dtype) in zip(rois, layout):
+            np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)[...] = roi
+        return shm, layout
+
+    def submit(self, rois: List[np.ndarray], bboxes: Optional[List[Tuple[int, int, int, int]]] = None,
+               timeout: Optional[float] = None, block: bool = True) -> Future:
+        """Enfileira o OCR dos recortes; bboxes=None indica uma imagem inteira (um único recorte)
+
+        Com a fila cheia, bloqueia (block=True) ou levanta queue.Full.
+        """
+        if self._closed:
+            raise RuntimeError("Pool OCR encerrado")
+
+        shm, layout = self._pack(rois)
+        future = Future()
+        item = (future, shm, layout, bboxes, bboxes is None, self.timeout if timeout is None else timeout)
+        try:
+            self._requests.put(item, block=block)
+        except queue.Full:
+            shm.close()
+            shm.unlink()
+            raise
+        return future
+
+    def extract(self, rois: List[np.ndarray], bboxes: Optional[List[Tuple[int, int, int, int]]] = None,
+                timeout: Optional[float] = None):
+        """Interface síncrona: aguarda o OCRBatchResult do worker"""
+        return self.submit(rois, bboxes, timeout).result()
+
+    async def extract_async(self, rois: List[np.ndarray], bboxes: Optional[List[Tuple[int, int, int, int]]] = None,
+                            timeout: Optional[float] = None):
+        """Interface assíncrona; com a fila cheia, a espera ocorre fora do event loop"""
+        try:
+            future = self.submit(rois, bboxes, timeout, block=False)
+        except queue.Full:
+            loop = asyncio.get_running_loop()
+            future = await loop.run_in_executor(None, self.submit, rois, bboxes, timeout)
+        return await asyncio.wrap_future(future)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._requests.qsize()
+
+    def close(self):
+        """Processa as requisições já enfileiradas e encerra os workers"""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._requests.put(_SHUTDOWN)
+        for thread in self._threads:
+            thread.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de requisições, timeouts, erros e reinícios por worker"""
+        return {
+            'engine': self.engine,
+            'workers': self.num_workers,
+            'queue_depth': self.queue_depth,
+            'completed': self.completed,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'restarts': sum(slot.restarts for slot in self._slots),
+            'per_worker': [
+                {
+                    'index': slot.index,
+                    'alive': slot.process is not None and slot.process.is_alive(),
+                    'requests': slot.requests,
+                    'restarts': slot.restarts
+                }
+                for slot in self._slots
+            ]
+        }
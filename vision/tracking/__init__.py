@@ -0,0 +1,22 @@
+from .tracker import (
+    MultiObjectTracker,
+    KalmanBoxFilter,
+    Track,
+    TrackState,
+    TrackingUpdate,
+    iou_matrix,
+    solve_assignment
+)
+from .interpolation import InterpolatedBox, interpolate_track_boxes
+
+__all__ = [
+    'MultiObjectTracker',
+    'KalmanBoxFilter',
+    'Track',
+    'TrackState',
+    'TrackingUpdate',
+    'iou_matrix',
+    'solve_assignment',
+    'InterpolatedBox',
+    'interpolate_track_boxes'
+]
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Rastreador Multi-Objeto
+=======================
+
+Rastreador no estilo SORT/ByteTrack compartilhado pelos detectores
+especializados: matriz de custo IoU vetorizada, associação ótima
+(algoritmo húngaro) e predição de movimento com filtro de Kalman de
+velocidade constante.
+"""
+
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple, Sequence
+import logging
+from dataclasses import dataclass, field
+from enum import Enum
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+    linear_sum_assignment = None
+
+class TrackState(str, Enum):
+    """Estados do ciclo de vida de um track"""
+    TENTATIVE = "tentative"
+    CONFIRMED = "confirmed"
+    REMOVED = "removed"
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Calcula a matriz IoU (N x M) entre dois conjuntos de caixas (x1, y1, x2, y2)"""
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)), dtype=np.float32)
+
+    x_left = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y_top = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x_right = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y_bottom = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+
+    intersection = np.clip(x_right - x_left, 0, None) * np.clip(y_bottom - y_top, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+
+    return np.where(union > 0, intersection / np.maximum(union, 1e-6), 0.0).astype(np.float32)
+
+def solve_assignment(cost: np.ndarray, max_cost: float) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
+    """Resolve a associação de custo mínimo descartando pares acima de max_cost"""
+    num_rows, num_cols = cost.shape
+    if num_rows == 0 or num_cols == 0:
+        return [], list(range(num_rows)), list(range(num_cols))
+
+    if SCIPY_AVAILABLE:
+        rows, cols = linear_sum_assignment(cost)
+    else:
+        # Fallback guloso pela ordem de custo quando o SciPy não está instalado
+        order = np.argsort(cost, axis=None)
+        used_rows, used_cols = set(), set()
+        rows, cols = [], []
+        for flat_index in order:
+            row, col = divmod(int(flat_index), num_cols)
+            if row in used_rows or col in used_cols:
+                continue
+            used_rows.add(row)
+            used_cols.add(col)
+            rows.append(row)
+            cols.append(col)
+
+    matches = [(int(r), int(c)) for r, c in zip(rows, cols) if cost[r, c] <= max_cost]
+    matched_rows = {r for r, _ in matches}
+    matched_cols = {c for _, c in matches}
+    unmatched_rows = [r for r in range(num_rows) if r not in matched_rows]
+    unmatched_cols = [c for c in range(num_cols) if c not in matched_cols]
+
+    return matches, unmatched_rows, unmatched_cols
+
+class KalmanBoxFilter:
+    """Filtro de Kalman de velocidade constante sobre (cx, cy, w, h)"""
+
+    def __init__(self, bbox: Sequence[float], position_noise: float = 1.0 / 20,
+                 velocity_noise: float = 1.0 / 160):
+        self.position_noise = position_noise
+        self.velocity_noise = velocity_noise
+
+        self.mean = np.zeros(8, dtype=np.float64)
+        self.mean[:4] = self._bbox_to_measurement(bbox)
+
+        w, h = self.mean[2], self.mean[3]
+        std = np.array([
+            2 * position_noise * w, 2 * position_noise * h,
+            2 * position_noise * w, 2 * position_noise * h,
+            10 * velocity_noise * w, 10 * velocity_noise * h,
+            10 * velocity_noise * w, 10 * velocity_noise * h
+        ])
+        self.covariance = np.diag(np.square(std))
+        self._measurement_matrix = np.eye(4, 8)
+
+    @staticmethod
+    def _bbox_to_measurement(bbox: Sequence[float]) -> np.ndarray:
+        x1, y1, x2, y2 = [float(v) for v in bbox]
+        return np.array([(x1 + x2) / 2, (y1 + y2) / 2, max(x2 - x1, 1.0), max(y2 - y1, 1.0)])
+
+    @staticmethod
+    def _state_to_bbox(state: np.ndarray) -> np.ndarray:
+        cx, cy, w, h = state[:4]
+        w, h = max(w, 1.0), max(h, 1.0)
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2])
+
+    def _process_noise(self, dt: float) -> np.ndarray:
+        w, h = max(self.mean[2], 1.0), max(self.mean[3], 1.0)
+        std = np.array([
+            self.position_noise * w, self.position_noise * h,
+            self.position_noise * w, self.position_noise * h,
+            self.velocity_noise * w, self.velocity_noise * h,
+            self.velocity_noise * w, self.velocity_noise * h
+        ]) * max(dt, 1.0)
+        return np.diag(np.square(std))
+
+    def predict(self, dt: float = 1.0) -> np.ndarray:
+        """Propaga o estado dt frames à frente e retorna a caixa prevista"""
+        transition = np.eye(8)
+        transition[:4, 4:] = np.eye(4) * dt
+
+        self.mean = transition @ self.mean
+        self.covariance = transition @ self.covariance @ transition.T + self._process_noise(dt)
+
+        return self.bbox
+
+    def update(self, bbox: Sequence[float]):
+        """Corrige o estado com uma nova medição"""
+        measurement = self._bbox_to_measurement(bbox)
+        w, h = max(self.mean[2], 1.0), max(self.mean[3], 1.0)
+        measurement_noise = np.diag(np.square([
+            self.position_noise * w, self.position_noise * h,
+            self.position_noise * w, self.position_noise * h
+        ]))
+
+        H = self._measurement_matrix
+        projected_cov = H @ self.covariance @ H.T + measurement_noise
+        kalman_gain = np.linalg.solve(projected_cov, H @ self.covariance).T
+
+        self.mean = self.mean + kalman_gain @ (measurement - H @ self.mean)
+        self.covariance = self.covariance - kalman_gain @ H @ self.covariance
+
+    @property
+    def bbox(self) -> np.ndarray:
+        return self._state_to_bbox(self.mean)
+
+    @property
+    def velocity(self) -> np.ndarray:
+        return self.mean[4:6].copy()
+
+@dataclass
+class Track:
+    """Estado de movimento de um objeto rastreado"""
+    track_id: int
+    kalman: KalmanBoxFilter
+    first_frame: int
+    last_frame: int
+    confidence: float
+    state: TrackState = TrackState.TENTATIVE
+    hits: int = 1
+    age: int = 0
+    time_since_update: int = 0
+    predicted_frame: int = 0
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        return tuple(int(round(v)) for v in self.kalman.bbox)
+
+    @property
+    def is_confirmed(self) -> bool:
+        return self.state == TrackState.CONFIRMED
+
+@dataclass
+class TrackingUpdate:
+    """Resultado de uma atualização do rastreador"""
+    matches: List[Tuple[int, Track]]
+    new_tracks: List[Tuple[int, Track]]
+    removed_tracks: List[Track]
+    unmatched_detections: List[int]
+
+class MultiObjectTracker:
+    """Rastreador multi-objeto genérico baseado em caixas e confianças"""
+
+    def __init__(self, config: Dict[str, Any] = None):
+        config = config or {}
+        self.config = config
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.iou_threshold = config.get('iou_threshold', 0.3)
+        self.high_confidence_threshold = config.get('high_confidence_threshold', 0.5)
+        self.low_iou_threshold = config.get('low_iou_threshold', 0.5)
+        self.min_hits = config.get('min_hits', 3)
+        self.max_age = config.get('max_age', 30)
+        self.max_tracks = config.get('max_tracks', 100)
+
+        self.tracks: Dict[int, Track] = {}
+        self.next_track_id = 0
+        self.frame_number: Optional[int] = None
+
+        if not SCIPY_AVAILABLE:
+            self.logger.warning("SciPy não disponível, usando associação gulosa no rastreador")
+
+    def predict(self, frame_number: int):
+        """Avança todos os tracks ativos até frame_number"""
+        for track in self.tracks.values():
+            dt = frame_number - track.predicted_frame
+            if dt > 0:
+                track.kalman.predict(dt)
+                track.predicted_frame = frame_number
+
+    def update(self, boxes: Sequence[Sequence[float]], confidences: Sequence[float],
+               frame_number: int) -> TrackingUpdate:
+        """Associa as detecções do frame aos tracks e gerencia nascimento/morte"""
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        confidences = np.asarray(confidences, dtype=np.float32).reshape(-1)
+
+        elapsed = 1 if self.frame_number is None else max(frame_number - self.frame_number, 1)
+        self.frame_number = frame_number
+        self.predict(frame_number)
+
+        track_ids = list(self.tracks.keys())
+        predicted = np.array([self.tracks[tid].kalman.bbox for tid in track_ids], dtype=np.float32).reshape(-1, 4)
+
+        # Primeira associação: detecções de alta confiança contra todos os tracks
+        high_idx = np.flatnonzero(confidences >= self.high_confidence_threshold)
+        low_idx = np.flatnonzero(confidences < self.high_confidence_threshold)
+
+        cost = 1.0 - iou_matrix(predicted, boxes[high_idx])
+        first_matches, unmatched_tracks, unmatched_high = solve_assignment(cost, 1.0 - self.iou_threshold)
+        matches = [(track_ids[t], int(high_idx[d])) for t, d in first_matches]
+
+        # Segunda associação: detecções de baixa confiança contra tracks confirmados restantes
+        remaining = [t for t in unmatched_tracks if self.tracks[track_ids[t]].is_confirmed]
+        if len(low_idx) and remaining:
+            cost = 1.0 - iou_matrix(predicted[remaining], boxes[low_idx])
+            second_matches, _, _ = solve_assignment(cost, 1.0 - self.low_iou_threshold)
+            matches.extend((track_ids[remaining[t]], int(low_idx[d])) for t, d in second_matches)
+
+        matched_track_ids = set()
+        result_matches = []
+        for track_id, det_index in matches:
+            track = self.tracks[track_id]
+            track.kalman.update(boxes[det_index])
+            track.last_frame = frame_number
+            track.confidence = float(confidences[det_index])
+            track.hits += 1
+            track.age += elapsed
+            track.time_since_update = 0
+            if track.state == TrackState.TENTATIVE and track.hits >= self.min_hits:
+                track.state = TrackState.CONFIRMED
+            matched_track_ids.add(track_id)
+            result_matches.append((det_index, track))
+
+        # Morte: tentativos que falharam e confirmados acima de max_age
+        removed_tracks = []
+        for track_id in track_ids:
+            if track_id in matched_track_ids:
+                continue
+            track = self.tracks[track_id]
+            track.age += elapsed
+            track.time_since_update += elapsed
+            if track.state == TrackState.TENTATIVE or track.time_since_update > self.max_age:
+                track.state = TrackState.REMOVED
+                removed_tracks.append(self.tracks.pop(track_id))
+
+        # Nascimento: apenas detecções de alta confiança criam tracks
+        new_tracks = []
+        for local_index in unmatched_high:
+            det_index = int(high_idx[local_index])
+            track = self._create_track(boxes[det_index], float(confidences[det_index]), frame_number)
+            new_tracks.append((det_index, track))
+
+        removed_tracks.extend(self._enforce_max_tracks())
+
+        matched_or_new = {d for d, _ in result_matches} | {d for d, _ in new_tracks}
+        unmatched_detections = [d for d in range(len(boxes)) if d not in matched_or_new]
+
+        return TrackingUpdate(
+            matches=result_matches,
+            new_tracks=new_tracks,
+            removed_tracks=removed_tracks,
+            unmatched_detections=unmatched_detections
+        )
+
+    def update_detections(self, detections: List[Any], frame_number: int) -> TrackingUpdate:
+        """Atalho para listas de detecções com atributos bbox (x1, y1, x2, y2) e confidence"""
+        boxes = [det.bbox for det in detections]
+        confidences = [det.confidence for det in detections]
+        update = self.update(boxes, confidences, frame_number)
+
+        for det_index, track in update.matches + update.new_tracks:
+            if hasattr(detections[det_index], 'track_id'):
+                detections[det_index].track_id = track.track_id
+
+        return update
+
+    def _create_track(self, bbox: np.ndarray, confidence: float, frame_number: int) -> Track:
+        track = Track(
+            track_id=self.next_track_id,
+            kalman=KalmanBoxFilter(bbox),
+            first_frame=frame_number,
+            last_frame=frame_number,
+            confidence=confidence,
+            predicted_frame=frame_number
+        )
+        if self.min_hits <= 1:
+            track.state = TrackState.CONFIRMED
+
+        self.tracks[track.track_id] = track
+        self.next_track_id += 1
+        return track
+
+    def _enforce_max_tracks(self) -> List[Track]:
+        """Remove os tracks mais antigos sem atualização quando o limite é excedido"""
+        excess = len(self.tracks) - self.max_tracks
+        if excess <= 0:
+            return []
+
+        candidates = sorted(self.tracks.values(), key=lambda t: (t.time_since_update, -t.hits), reverse=True)
+        removed = []
+        for track in candidates[:excess]:
+            track.state = TrackState.REMOVED
+            removed.append(self.tracks.pop(track.track_id))
+        return removed
+
+    def get_active_tracks(self, confirmed_only: bool = True) -> List[Track]:
+        """Retorna os tracks ativos, opcionalmente apenas os confirmados"""
+        return [t for t in self.tracks.values() if t.is_confirmed or not confirmed_only]
+
+    def get_state(self) -> Dict[str, Any]:
+        """Exporta o estado do rastreador (serializável com pickle) para checkpoints"""
+        return {
+            'tracks': dict(self.tracks),
+            'next_track_id': self.next_track_id,
+            'frame_number': self.frame_number
+        }
+
+    def set_state(self, state: Dict[str, Any]):
+        """Restaura o estado exportado por get_state"""
+        self.tracks = dict(state['tracks'])
+        self.next_track_id = state['next_track_id']
+        self.frame_number = state['frame_number']
+
+    def reset(self):
+        """Limpa o estado do rastreador"""
+        self.tracks.clear()
+        self.next_track_id = 0
+        self.frame_number = None
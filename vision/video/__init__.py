@@ -0,0 +1,36 @@
+from .writer import AnnotatedVideoWriter, VideoOutputMode
+from .chunked import VideoChunk, plan_chunks, run_video_chunks, stitch_chunk_tracks
+from .checkpoint import VideoCheckpointer, video_fingerprint, config_fingerprint
+from .sources import (
+    FrameSource, VideoCaptureSource, GeneratorSource, StreamReader, StreamFrame,
+    LatencyStats, is_live_uri
+)
+from .scheduler import StreamScheduler, StreamResult
+from .ffmpeg_decoder import FFmpegVideoCapture, FFMPEG_AVAILABLE, probe_video
+from .result_cache import VideoResultCache, file_content_hash
+
+__all__ = [
+    'AnnotatedVideoWriter',
+    'VideoOutputMode',
+    'VideoChunk',
+    'plan_chunks',
+    'run_video_chunks',
+    'stitch_chunk_tracks',
+    'VideoCheckpointer',
+    'video_fingerprint',
+    'config_fingerprint',
+    'FrameSource',
+    'VideoCaptureSource',
+    'GeneratorSource',
+    'StreamReader',
+    'StreamFrame',
+    'LatencyStats',
+    'is_live_uri',
+    'StreamScheduler',
+    'StreamResult',
+    'FFmpegVideoCapture',
+    'FFMPEG_AVAILABLE',
+    'probe_video',
+    'VideoResultCache',
+    'file_content_hash'
+]
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Checkpoints de Análise de Vídeo
+===============================
+
+Persistência periódica e atômica do estado de uma análise de vídeo longa,
+permitindo retomar o processamento após uma falha ou reinício do worker.
+"""
+
+import os
+import json
+import time
+import pickle
+import hashlib
+import logging
+import tempfile
+from typing import Dict, Any, Optional
+from pathlib import Path
+
+CHECKPOINT_VERSION = 1
+FINGERPRINT_BLOCK_SIZE = 1024 * 1024
+
+def video_fingerprint(video_path: str) -> str:
+    """Identifica o arquivo pelo tamanho e pelo conteúdo do início e do fim"""
+    path = Path(video_path)
+    size = path.stat().st_size
+    digest = hashlib.sha1(str(size).encode())
+
+    with open(path, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_BLOCK_SIZE))
+        if size > FINGERPRINT_BLOCK_SIZE:
+            f.seek(max(size - FINGERPRINT_BLOCK_SIZE, FINGERPRINT_BLOCK_SIZE))
+            digest.update(f.read(FINGERPRINT_BLOCK_SIZE))
+
+    return digest.hexdigest()
+
+def config_fingerprint(config: Dict[str, Any]) -> str:
+    """Hash estável da configuração do detector"""
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+class VideoCheckpointer:
+    """Grava e recupera checkpoints de uma análise de vídeo"""
+
+    def __init__(self, directory: str, video_path: str, config: Dict[str, Any],
+                 interval_seconds: float = 60.0):
+        self.directory = Path(directory)
+        self.interval_seconds = interval_seconds
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.key = f"{video_fingerprint(video_path)[:16]}_{config_fingerprint(config)[:16]}"
+        self.path = self.directory / f"checkpoint_{self.key}.pkl"
+        self._last_save = time.time()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Carrega o último checkpoint deste vídeo + configuração, se existir"""
+        if not self.path.exists():
+            return None
+
+        try:
+            with open(self.path, 'rb') as f:
+                state = pickle.load(f)
+        except Exception as e:
+            self.logger.warning(f"Checkpoint inválido ignorado ({self.path}): {e}")
+            return None
+
+        if state.get('version') != CHECKPOINT_VERSION or state.get('key') != self.key:
+            self.logger.warning(f"Checkpoint incompatível ignorado: {self.path}")
+            return None
+
+        self.logger.info(f"Checkpoint encontrado: retomando do frame {state.get('next_frame')}")
+        return state
+
+    def due(self) -> bool:
+        """Indica se o intervalo desde o último checkpoint foi atingido"""
+        return time.time() - self._last_save >= self.interval_seconds
+
+    def save(self, state: Dict[str, Any]):
+        """Grava o checkpoint de forma atômica (arquivo temporário + rename)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        state = dict(state, version=CHECKPOINT_VERSION, key=self.key, saved_at=time.time())
+
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{self.path.name}.", dir=str(self.directory))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        self._last_save = time.time()
+        self.logger.info(f"Checkpoint salvo no frame {state.get('next_frame')}: {self.path}")
+
+    def clear(self):
+        """Remove o checkpoint após a conclusão da análise"""
+        if self.path.exists():
+            self.path.unlink()
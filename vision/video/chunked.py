@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Processamento de Vídeo em Blocos
+================================
+
+Divide um vídeo em blocos temporais com sobreposição, processa cada bloco
+em um processo separado e costura os tracks nas fronteiras dos blocos.
+"""
+
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple, Hashable
+import logging
+from dataclasses import dataclass
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ..tracking.tracker import iou_matrix, solve_assignment
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class VideoChunk:
+    """Bloco de vídeo processado por um worker"""
+    index: int
+    start_frame: int
+    end_frame: int
+    warmup_start_frame: int
+    tail_start_frame: int
+
+    @property
+    def frame_count(self) -> int:
+        return self.end_frame - self.start_frame
+
+def plan_chunks(total_frames: int, fps: float, chunk_seconds: float,
+                overlap_seconds: float, max_frames: Optional[int] = None,
+                start_frame: int = 0) -> List[VideoChunk]:
+    """Divide [start_frame, total_frames) em blocos com sobreposição de aquecimento"""
+    if max_frames:
+        total_frames = min(total_frames, start_frame + max_frames)
+    range_start = start_frame
+
+    chunk_frames = max(int(round(chunk_seconds * fps)), 1)
+    overlap_frames = max(int(round(overlap_seconds * fps)), 0)
+
+    chunks = []
+    for index, start_frame in enumerate(range(range_start, total_frames, chunk_frames)):
+        end_frame = min(start_frame + chunk_frames, total_frames)
+        chunks.append(VideoChunk(
+            index=index,
+            start_frame=start_frame,
+            end_frame=end_frame,
+            warmup_start_frame=max(start_frame - overlap_frames, range_start),
+            tail_start_frame=max(end_frame - overlap_frames, start_frame)
+        ))
+
+    return chunks
+
+def _run_chunk(detector_cls, config: Dict[str, Any], video_path: str, chunk: VideoChunk) -> Dict[str, Any]:
+    """Executa um bloco em um processo worker com sua própria instância do detector"""
+    detector = detector_cls(config)
+    try:
+        return detector.process_video_chunk(video_path, chunk)
+    finally:
+        detector.cleanup()
+
+def run_video_chunks(detector_cls, config: Dict[str, Any], video_path: str, chunks: List[VideoChunk],
+                     max_workers: Optional[int] = None, start_method: str = 'spawn') -> List[Dict[str, Any]]:
+    """Processa os blocos em paralelo e retorna os resultados na ordem dos blocos"""
+    if not chunks:
+        return []
+
+    max_workers = min(max_workers or multiprocessing.cpu_count(), len(chunks))
+    logger.info(f"Processando {len(chunks)} blocos de vídeo com {max_workers} workers")
+
+    results: Dict[int, Dict[str, Any]] = {}
+    context = multiprocessing.get_context(start_method)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = {
+            executor.submit(_run_chunk, detector_cls, config, video_path, chunk): chunk.index
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            logger.info(f"Bloco {index + 1}/{len(chunks)} concluído")
+
+    return [results[chunk.index] for chunk in chunks]
+
+def _mean_boundary_iou(boxes_a: Dict[int, Tuple[int, int, int, int]],
+                       boxes_b: Dict[int, Tuple[int, int, int, int]]) -> float:
+    common_frames = sorted(set(boxes_a) & set(boxes_b))
+    if not common_frames:
+        return 0.0
+
+    ious = iou_matrix([boxes_a[f] for f in common_frames], [boxes_b[f] for f in common_frames])
+    return float(np.mean(np.diag(ious)))
+
+def stitch_chunk_tracks(boundaries: List[Dict[str, Dict[int, Dict[int, Tuple[int, int, int, int]]]]],
+                        iou_threshold: float) -> Dict[Hashable, Hashable]:
+    """Une tracks de blocos consecutivos que coincidem na região de sobreposição
+
+    Cada fronteira contém 'head' (caixas por track nos frames de aquecimento) e
+    'tail' (caixas por track nos frames finais). Retorna o mapeamento
+    (índice_do_bloco, track_id) -> representante do grupo costurado.
+    """
+    parents: Dict[Hashable, Hashable] = {}
+
+    def find(key):
+        parents.setdefault(key, key)
+        while parents[key] != key:
+            parents[key] = parents[parents[key]]
+            key = parents[key]
+        return key
+
+    for index in range(1, len(boundaries)):
+        tails = boundaries[index - 1].get('tail', {})
+        heads = boundaries[index].get('head', {})
+        if not tails or not heads:
+            continue
+
+        tail_ids = list(tails.keys())
+        head_ids = list(heads.keys())
+        cost = np.ones((len(tail_ids), len(head_ids)), dtype=np.float32)
+        for row, tail_id in enumerate(tail_ids):
+            for col, head_id in enumerate(head_ids):
+                cost[row, col] = 1.0 - _mean_boundary_iou(tails[tail_id], heads[head_id])
+
+        matches, _, _ = solve_assignment(cost, 1.0 - iou_threshold)
+        for row, col in matches:
+            parents[find((index, head_ids[col]))] = find((index - 1, tail_ids[row]))
+
+    return {key: find(key) for key in list(parents)}
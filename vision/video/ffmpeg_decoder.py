@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Decodificador FFmpeg
+====================
+
+Backend alternativo ao cv2.VideoCapture que lê frames brutos de um processo
+ffmpeg. Redimensionamento, redução de taxa de quadros (filtro fps) e
+conversão de formato de pixel são feitos dentro do ffmpeg, e os frames são
+lidos diretamente em buffers NumPy pré-alocados.
+"""
+
+import cv2
+import numpy as np
+from typing import Dict, Any, Optional, Tuple, List
+import logging
+import json
+import shutil
+import subprocess
+
+FFMPEG_BINARY = shutil.which('ffmpeg')
+FFPROBE_BINARY = shutil.which('ffprobe')
+FFMPEG_AVAILABLE = FFMPEG_BINARY is not None and FFPROBE_BINARY is not None
+
+def probe_video(video_path: str) -> Dict[str, Any]:
+    """Lê largura, altura, fps e número de frames do primeiro stream de vídeo com ffprobe"""
+    command = [
+        FFPROBE_BINARY, '-v', 'error', '-select_streams', 'v:0',
+        '-show_entries', 'stream=width,height,avg_frame_rate,r_frame_rate,nb_frames,duration',
+        '-show_entries', 'format=duration', '-of', 'json', str(video_path)
+    ]
+    output = subprocess.run(command, capture_output=True, check=True).stdout
+    info = json.loads(output)
+    stream = info['streams'][0]
+
+    def parse_rate(rate: str) -> float:
+        numerator, _, denominator = (rate or '0/1').partition('/')
+        return float(numerator) / float(denominator or 1) if float(denominator or 1) else 0.0
+
+    fps = parse_rate(stream.get('avg_frame_rate')) or parse_rate(stream.get('r_frame_rate')) or 30.0
+    duration = float(stream.get('duration') or info.get('format', {}).get('duration') or 0.0)
+    total_frames = int(stream.get('nb_frames') or 0) or int(round(duration * fps))
+
+    return {
+        'width': int(stream['width']),
+        'height': int(stream['height']),
+        'fps': fps,
+        'duration': duration,
+        'total_frames': total_frames
+    }
+
+def probe_keyframes(video_path: str, fps: float) -> List[int]:
+    """Índices dos quadros-chave (I-frames), lendo apenas os quadros-chave com ffprobe"""
+    command = [
+        FFPROBE_BINARY, '-v', 'error', '-select_streams', 'v:0', '-skip_frame', 'nokey',
+        '-show_entries', 'frame=best_effort_timestamp_time', '-of', 'csv=p=0', str(video_path)
+    ]
+    output = subprocess.run(command, capture_output=True, check=True).stdout.decode()
+    times = [float(line.strip().rstrip(',')) for line in output.splitlines() if line.strip().rstrip(',')]
+    return sorted({int(round(t * fps)) for t in times})
+
+class FFmpegVideoCapture:
+    """Substituto de cv2.VideoCapture que decodifica com ffmpeg
+
+    Suporta read(), isOpened(), get()/set() para as propriedades usadas pelo
+    pipeline (CAP_PROP_FPS, CAP_PROP_FRAME_COUNT, CAP_PROP_FRAME_WIDTH,
+    CAP_PROP_FRAME_HEIGHT, CAP_PROP_POS_FRAMES) e release(). Os frames
+    retornados são buffers de um anel pré-alocado de buffer_count posições:
+    quem consome não deve reter mais que buffer_count - 1 frames ao mesmo
+    tempo. Com output_fps, as propriedades e a numeração dos frames referem-se
+    ao stream já decimado.
+
+    Com keyframes_only=True apenas os quadros-chave são decodificados
+    (-skip_frame nokey); last_frame_number informa o índice do frame lido
+    no vídeo original.
+    """
+
+    def __init__(self, video_path: str, scale: Optional[float] = None, width: Optional[int] = None,
+                 output_fps: Optional[float] = None, buffer_count: int = 4,
+                 hwaccel: Optional[str] = None, threads: Optional[int] = None,
+                 keyframes_only: bool = False):
+        if not FFMPEG_AVAILABLE:
+            raise RuntimeError("ffmpeg/ffprobe não encontrados no PATH")
+
+        self.video_path = str(video_path)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.hwaccel = hwaccel
+        self.threads = threads
+        self.keyframes_only = keyframes_only
+
+        self.source_info = probe_video(self.video_path)
+        source_width, source_height = self.source_info['width'], self.source_info['height']
+
+        if width:
+            scale = width / source_width
+        scale = scale or 1.0
+        # Dimensões pares são exigidas pela maioria dos filtros/codecs
+        self.width = max(int(round(source_width * scale / 2)) * 2, 2)
+        self.height = max(int(round(source_height * scale / 2)) * 2, 2)
+
+        source_fps = self.source_info['fps']
+        if keyframes_only:
+            output_fps = None
+        self.fps = min(output_fps, source_fps) if output_fps else source_fps
+        self.total_frames = int(round(self.source_info['total_frames'] * self.fps / source_fps)) if source_fps else 0
+        self._decimate = bool(output_fps and output_fps < source_fps)
+
+        self._buffers: List[np.ndarray] = [
+            np.empty((self.height, self.width, 3), dtype=np.uint8) for _ in range(max(int(buffer_count), 2))
+        ]
+        self._buffer_index = 0
+        self._frame_bytes = self.width * self.height * 3
+
+        self._keyframes = probe_keyframes(self.video_path, source_fps) if keyframes_only else []
+        self._keyframe_index = 0
+        self.last_frame_number = -1
+
+        self._process: Optional[subprocess.Popen] = None
+        self._position = 0
+        self._start(0)
+
+    def _command(self, start_frame: int) -> List[str]:
+        command = [FFMPEG_BINARY, '-nostdin', '-hide_banner', '-loglevel', 'error']
+        if self.hwaccel:
+            command += ['-hwaccel', self.hwaccel]
+        if self.keyframes_only:
+            command += ['-skip_frame', 'nokey']
+        if start_frame > 0:
+            command += ['-ss', f"{start_frame / self.fps:.6f}"]
+        command += ['-i', self.video_path]
+        if self.threads:
+            command += ['-threads', str(self.threads)]
+
+        filters = []
+        if self._decimate:
+            filters.append(f"fps={self.fps}")
+        if (self.width, self.height) != (self.source_info['width'], self.source_info['height']):
+            filters.append(f"scale={self.width}:{self.height}:flags=area")
+        if filters:
+            command += ['-vf', ','.join(filters)]
+
+        if self.keyframes_only:
+            command += ['-vsync', 'passthrough']
+        command += ['-an', '-sn', '-pix_fmt', 'bgr24', '-f', 'rawvideo', 'pipe:1']
+        return command
+
+    def _start(self, start_frame: int):
+        self._stop()
+        self._process = subprocess.Popen(
+            self._command(start_frame), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            bufsize=self._frame_bytes
+        )
+        self._position = start_frame
+        if self.keyframes_only:
+            self._keyframe_index = next(
+                (i for i, frame_number in enumerate(self._keyframes) if frame_number >= start_frame),
+                len(self._keyframes)
+            )
+
+    def _stop(self):
+        if self._process is not None:
+            if self._process.stdout:
+                self._process.stdout.close()
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+            self._process = None
+
+    def isOpened(self) -> bool:
+        return self._process is not None
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self._process is None:
+            return False, None
+
+        buffer = self._buffers[self._buffer_index]
+        view = memoryview(buffer.reshape(-1))
+        received = 0
+        while received < self._frame_bytes:
+            count = self._process.stdout.readinto(view[received:])
+            if not count:
+                return False, None
+            received += count
+
+        self._buffer_index = (self._buffer_index + 1) % len(self._buffers)
+        if self.keyframes_only and self._keyframe_index < len(self._keyframes):
+            self._position = self._keyframes[self._keyframe_index]
+            self._keyframe_index += 1
+        self.last_frame_number = self._position
+        self._position += 1
+        return True, buffer
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.total_frames)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self._position)
+        return 0.0
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self._start(int(value))
+            return True
+        return False
+
+    def release(self):
+        self._stop()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Cache de Resultados de Análise de Vídeo
+=======================================
+
+Cache persistente de relatórios de análise de vídeo, indexado pelo hash do
+conteúdo do arquivo, pelo hash da configuração e pela identificação do
+arquivo do modelo (tamanho e data de modificação). Cada entrada guarda o
+relatório e os arquivos gerados (vídeo anotado, relatório JSON), com
+remoção por idade e por tamanho total.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+from typing import Dict, Any, Optional, List
+from pathlib import Path
+
+from .checkpoint import config_fingerprint
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+def file_content_hash(path: str) -> str:
+    """SHA-256 do conteúdo completo do arquivo, lido em blocos"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def model_fingerprint(path: str) -> str:
+    """Identificação barata do arquivo do modelo (tamanho e data de modificação); muda quando o modelo é trocado"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 'missing'
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+def _directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+class VideoResultCache:
+    """Cache em disco de relatórios de vídeo com remoção por idade e tamanho"""
+
+    def __init__(self, directory: str, max_size_bytes: int = 5 * 1024 ** 3,
+                 max_age_seconds: float = 7 * 24 * 3600):
+        self.directory = Path(directory)
+        self.max_size_bytes = max_size_bytes
+        self.max_age_seconds = max_age_seconds
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(content_hash: str, config: Dict[str, Any], model_path: Optional[str] = None) -> str:
+        """Chave da entrada: hash do conteúdo + hash da configuração (e do arquivo do modelo, se informado)"""
+        if model_path is not None:
+            config = {'config': config, 'model': model_fingerprint(model_path)}
+        return f"{content_hash[:32]}_{config_fingerprint(config)[:16]}"
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.directory / key
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retorna {'report', 'files', 'created_at'} ou None se ausente, expirada ou incompleta"""
+        entry_dir = self._entry_dir(key)
+        metadata_path = entry_dir / 'entry.json'
+
+        try:
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        expired = self.max_age_seconds and time.time() - entry.get('created_at', 0) > self.max_age_seconds
+        missing_files = [path for path in entry.get('files', {}).values() if path and not Path(path).exists()]
+        if expired or missing_files:
+            self._remove_entry(entry_dir)
+            self.misses += 1
+            return None
+
+        # Atualizar o horário de acesso (usado na remoção por tamanho)
+        os.utime(metadata_path)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, report: Dict[str, Any], files: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Armazena o relatório e uma cópia (hard link, se possível) dos arquivos gerados"""
+        entry_dir = self._entry_dir(key)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+
+        cached_files = {}
+        for name, source in (files or {}).items():
+            if not source or not Path(source).exists():
+                continue
+            target = entry_dir / f"{name}{Path(source).suffix}"
+            if target.exists():
+                target.unlink()
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+            cached_files[name] = str(target)
+
+        entry = {'key': key, 'created_at': time.time(), 'report': report, 'files': cached_files}
+
+        fd, tmp_path = tempfile.mkstemp(prefix='.entry.', dir=str(entry_dir))
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, entry_dir / 'entry.json')
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        self.evict()
+        return entry
+
+    def evict(self) -> List[str]:
+        """Remove entradas expiradas e, depois, as menos acessadas até caber em max_size_bytes"""
+        if not self.directory.exists():
+            return []
+
+        now = time.time()
+        entries = []
+        removed = []
+        for entry_dir in self.directory.iterdir():
+            if not entry_dir.is_dir():
+                continue
+            metadata_path = entry_dir / 'entry.json'
+            if not metadata_path.exists():
+                continue
+            try:
+                with open(metadata_path, 'r', encoding='utf-8') as f:
+                    created_at = json.load(f).get('created_at', 0)
+            except (OSError, ValueError):
+                created_at = 0
+            if self.max_age_seconds and now - created_at > self.max_age_seconds:
+                self._remove_entry(entry_dir)
+                removed.append(entry_dir.name)
+                continue
+            entries.append((metadata_path.stat().st_mtime, _directory_size(entry_dir), entry_dir))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in sorted(entries, key=lambda item: item[0]):
+            if total_size <= self.max_size_bytes:
+                break
+            self._remove_entry(entry_dir)
+            removed.append(entry_dir.name)
+            total_size -= size
+
+        if removed:
+            self.logger.info(f"Cache de vídeo: {len(removed)} entradas removidas")
+        return removed
+
+    def _remove_entry(self, entry_dir: Path):
+        shutil.rmtree(entry_dir, ignore_errors=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de acertos e ocupação do cache"""
+        entries = [d for d in self.directory.iterdir() if d.is_dir()] if self.directory.exists() else []
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(entries),
+            'size_bytes': sum(_directory_size(d) for d in entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Agendador Multi-Stream
+======================
+
+Processa vários streams de vídeo simultaneamente com um único detector:
+os frames prontos de cada stream são reunidos em lotes (round-robin, no
+máximo um frame por stream a cada rodada), a inferência é feita em lote e
+cada stream mantém o seu próprio rastreador.
+"""
+
+import numpy as np
+from typing import Dict, List, Any, Optional, Callable
+import logging
+import time
+from dataclasses import dataclass, field
+
+from ..tracking.tracker import MultiObjectTracker, TrackingUpdate
+from .sources import FrameSource, StreamReader, StreamFrame, LatencyStats
+
+@dataclass
+class StreamResult:
+    """Resultado do processamento de um frame de um stream"""
+    stream_id: str
+    frame_number: int
+    timestamp: float
+    frame: np.ndarray
+    detections: List[Any]
+    tracking: TrackingUpdate
+    latency: float
+    frame_lag: int = 0
+
+@dataclass
+class _StreamState:
+    reader: StreamReader
+    tracker: MultiObjectTracker
+    frames_processed: int = 0
+    latency: LatencyStats = field(default_factory=LatencyStats)
+    max_frame_lag: int = 0
+    last_frame_number: Optional[int] = None
+    tracks_seen: set = field(default_factory=set)
+
+class StreamScheduler:
+    """Agenda a inferência em lote de múltiplos streams sobre um detector compartilhado
+
+    O detector precisa expor detect_batch(images) -> List[List[detecção]],
+    com detecções que tenham 'bbox' e 'confidence'.
+    """
+
+    def __init__(self, detector, config: Dict[str, Any] = None):
+        self.detector = detector
+        self.config = config or {}
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.batch_size = max(int(self.config.get('batch_size', 8)), 1)
+        self.queue_size = self.config.get('queue_size', 4)
+        self.poll_interval = self.config.get('poll_interval', 0.005)
+        self.tracker_config = self.config.get('tracking', {})
+
+        self.streams: Dict[str, _StreamState] = {}
+        self._round_robin_offset = 0
+        self._running = False
+        self._stopped = False
+
+        self.batches_processed = 0
+        self.batch_frames = 0
+        self.inference_time = 0.0
+
+    def add_stream(self, stream_id: str, source: FrameSource, target_fps: Optional[float] = None,
+                   tracker_config: Optional[Dict[str, Any]] = None, latest_only: Optional[bool] = None):
+        """Registra um stream; pode ser chamado com o agendador em execução
+
+        latest_only (padrão: config 'latest_frame_only', ativo para fontes ao
+        vivo) processa sempre o frame mais recente, descartando os obsoletos.
+        """
+        if stream_id in self.streams:
+            raise ValueError(f"Stream já registrado: {stream_id}")
+
+        if latest_only is None:
+            latest_only = source.is_live and self.config.get('latest_frame_only', True)
+
+        reader = StreamReader(stream_id, source, queue_size=self.queue_size,
+                              target_fps=target_fps, latest_only=latest_only)
+        tracker = MultiObjectTracker(tracker_config if tracker_config is not None else self.tracker_config)
+        self.streams[stream_id] = _StreamState(reader=reader, tracker=tracker)
+
+        if self._running:
+            reader.start()
+        self.logger.info(f"Stream adicionado: {stream_id} (target_fps={target_fps})")
+
+    def remove_stream(self, stream_id: str):
+        """Encerra e remove um stream"""
+        state = self.streams.pop(stream_id, None)
+        if state is not None:
+            state.reader.stop()
+
+    def start(self):
+        """Inicia a leitura de todos os streams registrados"""
+        self._running = True
+        self._stopped = False
+        for state in self.streams.values():
+            state.reader.start()
+
+    def stop(self):
+        """Interrompe o loop de execução e a leitura dos streams"""
+        self._stopped = True
+        self._running = False
+        for state in self.streams.values():
+            state.reader.stop()
+
+    @property
+    def finished(self) -> bool:
+        """Todos os streams encerrados e sem frames pendentes"""
+        return all(state.reader.finished for state in self.streams.values())
+
+    def _collect_batch(self) -> List[StreamFrame]:
+        stream_ids = list(self.streams.keys())
+        if not stream_ids:
+            return []
+
+        # Rotacionar o ponto de partida para que nenhum stream seja sempre o primeiro
+        offset = self._round_robin_offset % len(stream_ids)
+        stream_ids = stream_ids[offset:] + stream_ids[:offset]
+        self._round_robin_offset += 1
+
+        batch: List[StreamFrame] = []
+        while len(batch) < self.batch_size:
+            collected = 0
+            for stream_id in stream_ids:
+                if len(batch) >= self.batch_size:
+                    break
+                item = self.streams[stream_id].reader.get()
+                if item is not None:
+                    batch.append(item)
+                    collected += 1
+            if collected == 0:
+                break
+
+        return batch
+
+    def step(self) -> List[StreamResult]:
+        """Processa um lote com os frames disponíveis; retorna lista vazia se não houver frames"""
+        batch = self._collect_batch()
+        if not batch:
+            return []
+
+        start_time = time.time()
+        batch_detections = self.detector.detect_batch([item.frame for item in batch])
+        self.inference_time += time.time() - start_time
+        self.batches_processed += 1
+        self.batch_frames += len(batch)
+
+        results = []
+        for item, detections in zip(batch, batch_detections):
+            state = self.streams.get(item.stream_id)
+            if state is None:
+                continue
+
+            tracking = state.tracker.update_detections(detections, item.frame_number)
+            latency = time.time() - item.captured_at
+            frame_lag = max((state.reader.last_frame_number or 0) - item.frame_number, 0)
+
+            state.frames_processed += 1
+            state.latency.add(latency)
+            state.max_frame_lag = max(state.max_frame_lag, frame_lag)
+            state.last_frame_number = item.frame_number
+            state.tracks_seen.update(track.track_id for _, track in tracking.new_tracks)
+
+            results.append(StreamResult(
+                stream_id=item.stream_id,
+                frame_number=item.frame_number,
+                timestamp=item.timestamp,
+                frame=item.frame,
+                detections=detections,
+                tracking=tracking,
+                latency=latency,
+                frame_lag=frame_lag
+            ))
+
+        return results
+
+    def run(self, callback: Optional[Callable[[StreamResult], None]] = None,
+            max_batches: Optional[int] = None) -> Dict[str, Any]:
+        """Executa até todos os streams terminarem, stop() ou max_batches; retorna as estatísticas"""
+        self.start()
+        try:
+            batches = 0
+            while not self._stopped:
+                results = self.step()
+                if not results:
+                    if self.finished:
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+
+                if callback is not None:
+                    for result in results:
+                        callback(result)
+
+                batches += 1
+                if max_batches is not None and batches >= max_batches:
+                    break
+        finally:
+            self.stop()
+
+        return self.get_stats()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas por stream (lidos, pulados, descartados, processados, atraso) e globais"""
+        streams = {}
+        for stream_id, state in self.streams.items():
+            stats = state.reader.get_stats()
+            stats.update({
+                'frames_processed': state.frames_processed,
+                'latency': state.latency.to_dict(),
+                'max_frame_lag': state.max_frame_lag,
+                'drop_rate': stats['frames_dropped'] / stats['frames_read'] if stats['frames_read'] else 0.0,
+                'last_frame_number': state.last_frame_number,
+                'active_tracks': len(state.tracker.get_active_tracks()),
+                'total_tracks': len(state.tracks_seen)
+            })
+            streams[stream_id] = stats
+
+        return {
+            'streams': streams,
+            'batches_processed': self.batches_processed,
+            'average_batch_size': self.batch_frames / self.batches_processed if self.batches_processed else 0.0,
+            'inference_time': self.inference_time,
+            'frames_processed': self.batch_frames
+        }
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Fontes de Frames
+================
+
+Fontes de vídeo usadas pelo agendador multi-stream: arquivos, câmeras e
+streams RTSP via OpenCV, além de um gerador sintético para testes. Cada
+fonte é lida por uma thread própria (StreamReader) com buffer limitado.
+"""
+
+import cv2
+import numpy as np
+from typing import Dict, Any, Optional, Tuple, Callable, Iterable, Union
+import logging
+import time
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+
+LIVE_URI_PREFIXES = ('rtsp://', 'rtsps://', 'rtmp://', 'http://', 'https://', 'udp://', 'tcp://')
+
+def is_live_uri(uri: Union[str, int]) -> bool:
+    """Câmeras locais (índice) e URIs de rede são tratadas como fontes ao vivo"""
+    return isinstance(uri, int) or str(uri).isdigit() or str(uri).lower().startswith(LIVE_URI_PREFIXES)
+
+@dataclass
+class StreamFrame:
+    """Frame lido de uma fonte, com tempo de mídia e instante de captura"""
+    stream_id: str
+    frame_number: int
+    frame: np.ndarray
+    timestamp: float
+    captured_at: float
+
+class LatencyStats:
+    """Média, máximo e percentil 95 de latências (janela limitada de amostras)"""
+
+    def __init__(self, window: int = 1000):
+        self._samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        self._samples.append(value)
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def p95(self) -> float:
+        return float(np.percentile(self._samples, 95)) if self._samples else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {'average': self.average, 'p95': self.p95, 'max': self.max}
+
+class FrameSource(ABC):
+    """Interface comum das fontes de frames"""
+
+    is_live: bool = False
+    fps: float = 30.0
+
+    @abstractmethod
+    def open(self) -> bool:
+        """Abre a fonte; retorna False se não for possível"""
+
+    @abstractmethod
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Lê o próximo frame no formato de cv2.VideoCapture.read()"""
+
+    def close(self):
+        """Libera os recursos da fonte"""
+
+class VideoCaptureSource(FrameSource):
+    """Arquivo de vídeo, câmera local ou stream RTSP lido com OpenCV"""
+
+    def __init__(self, uri: Union[str, int], fps: Optional[float] = None):
+        self.uri = uri
+        self.is_live = is_live_uri(uri)
+        self.fps = fps or 30.0
+        self._fps_override = fps
+        self._cap = None
+
+    def open(self) -> bool:
+        uri = int(self.uri) if str(self.uri).isdigit() else self.uri
+        self._cap = cv2.VideoCapture(uri)
+        if not self._cap.isOpened():
+            return False
+
+        if not self._fps_override:
+            self.fps = self._cap.get(cv2.CAP_PROP_FPS) or self.fps
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self._cap is None:
+            return False, None
+        return self._cap.read()
+
+    def close(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+class StrideCapture:
+    """Envolve um cv2.VideoCapture lendo apenas um frame a cada 'stride'
+
+    Os frames intermediários são descartados com grab(), sem conversão de
+    cor. last_frame_number informa o índice do último frame retornado.
+    """
+
+    def __init__(self, cap, stride: int):
+        self.cap = cap
+        self.stride = max(int(stride), 1)
+        self.last_frame_number = -1
+        self._position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        remainder = self._position % self.stride
+        target = self._position if remainder == 0 else self._position + self.stride - remainder
+        while self._position < target:
+            if not self.cap.grab():
+                return False, None
+            self._position += 1
+
+        ret, frame = self.cap.read()
+        if ret:
+            self.last_frame_number = self._position
+            self._position += 1
+        return ret, frame
+
+    def get(self, prop: int) -> float:
+        return self.cap.get(prop)
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self._position = int(value)
+        return self.cap.set(prop, value)
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+class GeneratorSource(FrameSource):
+    """Fonte sintética: função frame_index -> frame (ou None para encerrar) ou iterável de frames
+
+    Com realtime=True os frames são entregues no ritmo do fps, simulando
+    uma câmera ao vivo.
+    """
+
+    def __init__(self, frames: Union[Callable[[int], Optional[np.ndarray]], Iterable[np.ndarray]],
+                 fps: float = 30.0, realtime: bool = False, max_frames: Optional[int] = None):
+        self.frames = frames
+        self.fps = fps
+        self.is_live = realtime
+        self.max_frames = max_frames
+        self._iterator = None
+        self._index = 0
+        self._next_frame_time = 0.0
+
+    def open(self) -> bool:
+        self._index = 0
+        self._iterator = None if callable(self.frames) else iter(self.frames)
+        self._next_frame_time = time.time()
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.max_frames is not None and self._index >= self.max_frames:
+            return False, None
+
+        if self.is_live:
+            delay = self._next_frame_time - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_frame_time += 1.0 / self.fps
+
+        if self._iterator is None:
+            frame = self.frames(self._index)
+        else:
+            frame = next(self._iterator, None)
+
+        if frame is None:
+            return False, None
+
+        self._index += 1
+        return True, frame
+
+class StreamReader:
+    """Lê uma fonte em thread dedicada e mantém um buffer limitado de frames
+
+    Fontes ao vivo descartam o frame mais antigo quando o buffer está cheio
+    (contabilizado como 'dropped'); arquivos bloqueiam a leitura até haver
+    espaço. Com target_fps, frames excedentes são pulados na leitura
+    (contabilizados como 'skipped'), usando o tempo de mídia para arquivos e
+    o relógio de parede para fontes ao vivo.
+
+    Com latest_only=True o buffer tem uma única posição sempre sobrescrita
+    ("o frame mais recente vence"): o consumidor processa apenas o frame
+    mais novo e os frames obsoletos são descartados, mesmo para arquivos.
+    """
+
+    def __init__(self, stream_id: str, source: FrameSource, queue_size: int = 4,
+                 target_fps: Optional[float] = None, latest_only: bool = False):
+        self.stream_id = stream_id
+        self.source = source
+        self.latest_only = latest_only
+        self.queue_size = 1 if latest_only else max(int(queue_size), 1)
+        self.target_fps = target_fps
+        self.logger = logging.getLogger(f"{self.__class__.__name__}[{stream_id}]")
+
+        self._buffer = deque()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._ended = False
+
+        self.frames_read = 0
+        self.frames_skipped = 0
+        self.frames_dropped = 0
+        self.last_frame_number: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def start(self):
+        """Abre a fonte e inicia a thread de leitura"""
+        if self._thread is not None:
+            return
+
+        if not self.source.open():
+            self.error = "Não foi possível abrir a fonte"
+            self.logger.error(self.error)
+            self._ended = True
+            return
+
+        self._thread = threading.Thread(target=self._run, name=f"StreamReader-{self.stream_id}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Interrompe a leitura e libera a fonte"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def get(self) -> Optional[StreamFrame]:
+        """Retira o próximo frame do buffer sem bloquear"""
+        with self._condition:
+            if not self._buffer:
+                return None
+            item = self._buffer.popleft()
+            self._condition.notify_all()
+            return item
+
+    @property
+    def finished(self) -> bool:
+        """Fonte encerrada e buffer vazio"""
+        with self._condition:
+            return self._ended and not self._buffer
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._buffer)
+
+    def _run(self):
+        fps = self.source.fps or 30.0
+        min_interval = 1.0 / self.target_fps if self.target_fps else 0.0
+        next_emit_time = None
+        frame_number = 0
+
+        try:
+            while not self._stopped:
+                ret, frame = self.source.read()
+                if not ret:
+                    break
+
+                captured_at = time.time()
+                timestamp = frame_number / fps
+                current_frame = frame_number
+                frame_number += 1
+                self.frames_read += 1
+                self.last_frame_number = current_frame
+
+                if min_interval:
+                    clock = captured_at if self.source.is_live else timestamp
+                    if next_emit_time is not None and clock < next_emit_time:
+                        self.frames_skipped += 1
+                        continue
+                    next_emit_time = clock + min_interval if next_emit_time is None else max(next_emit_time + min_interval, clock)
+
+                self._put(StreamFrame(self.stream_id, current_frame, frame, timestamp, captured_at))
+        except Exception as e:
+            self.error = str(e)
+            self.logger.error(f"Erro na leitura da fonte: {e}")
+        finally:
+            self.source.close()
+            with self._condition:
+                self._ended = True
+                self._condition.notify_all()
+
+    def _put(self, item: StreamFrame):
+        with self._condition:
+            if self.latest_only or self.source.is_live:
+                if len(self._buffer) >= self.queue_size:
+                    self._buffer.popleft()
+                    self.frames_dropped += 1
+            else:
+                while len(self._buffer) >= self.queue_size and not self._stopped:
+                    self._condition.wait()
+            self._buffer.append(item)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de leitura da fonte"""
+        return {
+            'frames_read': self.frames_read,
+            'frames_skipped': self.frames_skipped,
+            'frames_dropped': self.frames_dropped,
+            'queue_depth': self.queue_depth,
+            'is_live': self.source.is_live,
+            'latest_only': self.latest_only,
+            'error': self.error
+        }
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Escritor de Vídeo Anotado
+=========================
+
+Escrita de vídeo anotado em thread dedicada, com fila limitada, modo de
+clipes de eventos e modo sem saída.
+"""
+
+import cv2
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple, Callable
+import logging
+from pathlib import Path
+import threading
+import queue
+from collections import deque
+
+class VideoOutputMode:
+    """Modos de saída de vídeo suportados"""
+    FULL = "full"
+    EVENTS = "events"
+    NONE = "none"
+
+    ALL = (FULL, EVENTS, NONE)
+
+class AnnotatedVideoWriter:
+    """Anota e codifica frames fora da thread de inferência"""
+
+    def __init__(self, output_path: str, fps: float, frame_size: Tuple[int, int],
+                 annotate: Callable[[np.ndarray, Any], np.ndarray],
+                 mode: str = VideoOutputMode.FULL, queue_size: int = 32,
+                 pre_event_frames: int = 0, post_event_frames: int = 0,
+                 fourcc: str = 'mp4v'):
+        if mode not in VideoOutputMode.ALL:
+            raise ValueError(f"Modo de saída de vídeo inválido: {mode}")
+
+        self.output_path = Path(output_path)
+        self.fps = fps
+        self.frame_size = frame_size
+        self.annotate = annotate
+        self.mode = mode
+        self.pre_event_frames = max(int(pre_event_frames), 0)
+        self.post_event_frames = max(int(post_event_frames), 0)
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._queue = queue.Queue(maxsize=max(int(queue_size), 1))
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[Exception] = None
+
+        self._writer = None
+        self._pre_roll = deque(maxlen=self.pre_event_frames or None)
+        self._frames_since_event = 0
+        self._clips: List[Dict[str, Any]] = []
+        self._frames_written = 0
+
+    def start(self):
+        """Inicia a thread de escrita"""
+        if self.mode == VideoOutputMode.NONE or self._thread is not None:
+            return
+
+        if self.mode == VideoOutputMode.FULL:
+            self._writer = self._open_writer(self.output_path)
+
+        self._thread = threading.Thread(target=self._run, name="AnnotatedVideoWriter", daemon=True)
+        self._thread.start()
+
+    def write(self, frame_number: int, frame: np.ndarray, payload: Any = None, has_event: bool = False):
+        """Enfileira um frame; bloqueia quando a fila está cheia (backpressure)"""
+        if self.mode == VideoOutputMode.NONE:
+            return
+
+        if self._thread is None:
+            self.start()
+
+        self._queue.put((frame_number, frame, payload, has_event))
+
+    def close(self) -> Dict[str, Any]:
+        """Aguarda a fila esvaziar, fecha os arquivos e retorna o resumo da saída"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+        self._close_writer()
+
+        summary = {
+            'mode': self.mode,
+            'frames_written': self._frames_written,
+            'output_path': str(self.output_path) if self.mode == VideoOutputMode.FULL else None,
+            'clips': list(self._clips)
+        }
+        if self._error is not None:
+            summary['error'] = str(self._error)
+
+        return summary
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            if self._error is not None:
+                # Continuar consumindo para não bloquear o produtor
+                continue
+
+            frame_number, frame, payload, has_event = item
+            try:
+                if self.mode == VideoOutputMode.FULL:
+                    self._write_annotated(frame, payload)
+                else:
+                    self._handle_event_frame(frame_number, frame, payload, has_event)
+            except Exception as e:
+                self._error = e
+                self.logger.error(f"Erro na escrita do vídeo anotado: {e}")
+
+    def _handle_event_frame(self, frame_number: int, frame: np.ndarray, payload: Any, has_event: bool):
+        if has_event:
+            if self._writer is None:
+                self._open_clip(frame_number)
+            self._write_annotated(frame, payload)
+            self._clips[-1]['end_frame'] = frame_number
+            self._frames_since_event = 0
+            return
+
+        if self._writer is not None:
+            if self._frames_since_event < self.post_event_frames:
+                self._write_annotated(frame, payload)
+                self._clips[-1]['end_frame'] = frame_number
+                self._frames_since_event += 1
+                return
+            self._close_writer()
+
+        if self.pre_event_frames:
+            # Cópia: o frame pode ser um buffer reutilizado pelo decodificador (anel do ffmpeg)
+            self._pre_roll.append((frame_number, frame.copy(), payload))
+
+    def _open_clip(self, frame_number: int):
+        clip_index = len(self._clips)
+        clip_path = self.output_path.with_name(f"{self.output_path.stem}_clip_{clip_index:03d}{self.output_path.suffix}")
+        self._writer = self._open_writer(clip_path)
+
+        start_frame = self._pre_roll[0][0] if self._pre_roll else frame_number
+        self._clips.append({'path': str(clip_path), 'start_frame': start_frame, 'end_frame': frame_number})
+
+        while self._pre_roll:
+            _, pre_frame, pre_payload = self._pre_roll.popleft()
+            self._write_annotated(pre_frame, pre_payload)
+
+    def _open_writer(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        writer = cv2.VideoWriter(str(path), self.fourcc, self.fps, self.frame_size)
+        if not writer.isOpened():
+            raise RuntimeError(f"Não foi possível abrir o vídeo de saída: {path}")
+        return writer
+
+    def _close_writer(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+    def _write_annotated(self, frame: np.ndarray, payload: Any):
+        annotated = self.annotate(frame, payload) if self.annotate else frame
+        self._writer.write(annotated)
+        self._frames_written += 1